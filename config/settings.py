@@ -1,5 +1,6 @@
 """Django settings for the aerodicionario project."""
 
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -66,6 +67,36 @@ DATABASES = {
     }
 }
 
+
+def cache_from_url(url: str) -> dict:
+    """Backend de cache a partir de ``CACHE_URL``.
+
+    redis://host:6379/1     (requer o pacote ``redis``)
+    memcached://host:11211  (requer o pacote ``pymemcache``)
+    db                      (tabela no banco; rode ``manage.py createcachetable``)
+    file:///caminho         (diretório compartilhado pelos workers da mesma máquina)
+    vazio                   LocMemCache: um cache por processo, só para desenvolvimento
+    """
+    if url.startswith(("redis://", "rediss://")):
+        return {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": url}
+    if url.startswith("memcached://"):
+        return {"BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache", "LOCATION": url[len("memcached://") :]}
+    if url == "db":
+        return {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "glossario_cache"}
+    if url.startswith("file://"):
+        return {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": url[len("file://") :]}
+    if url:
+        raise ValueError(f"CACHE_URL não suportada: {url}")
+    return {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+
+
+# As versões (configurações do site, índice do autocomplete, páginas de termo)
+# avisam os demais processos pelo cache: com vários workers ele precisa ser
+# compartilhado (ver glossario.checks).
+CACHES = {"default": cache_from_url(os.environ.get("CACHE_URL", ""))}
+# servidor com um único processo: dispensa o cache compartilhado
+GLOSSARIO_SINGLE_PROCESS = os.environ.get("GLOSSARIO_SINGLE_PROCESS", "") == "1"
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -89,5 +120,7 @@ USE_TZ = True
 STATIC_URL = "static/"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# CSVs enviados para importação (fora de MEDIA_ROOT: não são servidos)
+GLOSSARIO_IMPORT_ROOT = os.environ.get("GLOSSARIO_IMPORT_ROOT", str(BASE_DIR / "private" / "importacoes"))
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -4,7 +4,8 @@ from django.contrib import admin
 from django.urls import include, path
 from glossario import views as gviews
 from django.contrib.sitemaps.views import sitemap
-from glossario.sitemaps import TermoSitemap, StaticSitemap
+from django.views.decorators.http import condition
+from glossario.sitemaps import TermoSitemap, StaticSitemap, sitemap_etag
 from django.views.generic import TemplateView
 from django.conf import settings
 from django.conf.urls.static import static
@@ -15,7 +16,12 @@ urlpatterns = [
     path("accounts/login/", gviews.login_view, name="login"),
     path("accounts/logout/", gviews.logout_view, name="logout"),
     path("accounts/", include("django.contrib.auth.urls")),
-    path("sitemap.xml", sitemap, {"sitemaps": {"termos": TermoSitemap, "static": StaticSitemap}}, name="sitemap"),
+    path(
+        "sitemap.xml",
+        condition(etag_func=sitemap_etag)(sitemap),
+        {"sitemaps": {"termos": TermoSitemap, "static": StaticSitemap}},
+        name="sitemap",
+    ),
     path("robots.txt", TemplateView.as_view(template_name="robots.txt", content_type="text/plain")),
     path("", include("glossario.urls")),
 ]
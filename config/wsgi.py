@@ -7,3 +7,14 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
 application = get_wsgi_application()
+
+# gunicorn/uvicorn sobem vários processos: sem cache compartilhado as
+# invalidações ficariam presas no worker que gravou
+from glossario.checks import require_shared_cache  # noqa: E402
+
+require_shared_cache()
+
+# o índice do autocomplete fica pronto antes da primeira requisição
+from glossario.autocomplete import index  # noqa: E402
+
+index.warm()
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db.models import Exists, OuterRef
 from .models import (
     Termo,
     TermoImage,
@@ -12,22 +13,21 @@ from .models import (
     SuggestionApplicationLog,
     TermoHistory,
     SiteSetting,
+    ImageVariantJob,
+    CSVImportJob,
+    RebuildJob,
 )
-from django.core.files.base import File
-from django.db import transaction
-import os
+from . import csv_export, import_jobs, moderation
 from django import forms
-from django.utils.text import slugify
 from django.contrib import messages
 from django.template.response import TemplateResponse
 from django.urls import path, reverse
-from django.http import HttpResponseRedirect
-from django.http import HttpResponse
+from django.core.exceptions import BadRequest
+from django.http import Http404, HttpResponseRedirect, JsonResponse
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from django.utils.html import format_html
-from django.utils.html import strip_tags
-import csv
-import re
-import io
 
 
 class TermoImageInline(admin.StackedInline):
@@ -90,7 +90,7 @@ class TermoAdmin(admin.ModelAdmin):
         def queryset(self, request, queryset):
             v = self.value()
             if v:
-                return queryset.filter(titulo__istartswith=v)
+                return queryset.filter(inicial=v)
             return queryset
 
     class HasImagemFilter(admin.SimpleListFilter):
@@ -118,12 +118,12 @@ class TermoAdmin(admin.ModelAdmin):
         if request.method == "POST":
             form = self.CSVImportForm(request.POST, request.FILES)
             if form.is_valid():
-                uploaded = form.cleaned_data["arquivo"]
-                content = uploaded.read().decode("utf-8-sig", errors="ignore")
-                report = self._process_csv_content(content)
-                self.message_user(request, report, level=messages.SUCCESS)
-                changelist_url = reverse(f"admin:{opts.app_label}_{opts.model_name}_changelist")
-                return HttpResponseRedirect(changelist_url)
+                # a importação roda no worker (process_import_jobs); aqui só enfileiramos
+                job = CSVImportJob.objects.create(
+                    arquivo=form.cleaned_data["arquivo"],
+                    created_by=request.user if request.user.is_authenticated else None,
+                )
+                return HttpResponseRedirect(reverse("admin:glossario_termo_import_progress", args=[job.pk]))
         else:
             form = self.CSVImportForm()
 
@@ -135,109 +135,31 @@ class TermoAdmin(admin.ModelAdmin):
         }
         return TemplateResponse(request, "admin/glossario/termo/import_csv.html", context)
 
-    # Auxiliar: processa conteúdo CSV e retorna relatório de importação
-    def _process_csv_content(self, content: str) -> str:
-        created = updated = link_count = video_count = 0
-        duplicates_in_file = 0
-        seen_slugs: set[str] = set()
-
-        def split_multi(val: str) -> list[str]:
-            if not val:
-                return []
-            parts = re.split(r"[\s;,]+", val.strip())
-            return [p for p in parts if p]
-
-        def normalize_url(u: str) -> str:
-            if not u:
-                return ""
-            if not re.match(r"^https?://", u, re.I):
-                return "https://" + u
-            return u
-
-        # Divide em linhas, encontra o cabeçalho e reconstroi um fluxo a partir dele
-        lines = content.splitlines()
-        header_idx = None
-        for i, line in enumerate(lines[:200]):
-            if "sigla ou palavra" in line.lower():
-                header_idx = i
-                break
-        if header_idx is None:
-            return "Cabeçalho não encontrado no CSV. Garanta que exista a coluna 'SIGLA OU PALAVRA'."
-
-        sliced = "\n".join(lines[header_idx:])
-        reader = csv.DictReader(io.StringIO(sliced))
-        field_map = { (k or "").lower().strip(): (k or "") for k in (reader.fieldnames or []) }
-
-        def get(row, key):
-            # Busca a coluna por nome normalizado
-            k = field_map.get(key.lower())
-            if k:
-                return row.get(k, "")
-            # fallback por variações
-            for cand in [key, key.lower(), key.upper()]:
-                if cand in row:
-                    return row[cand]
-            return ""
-
-        for row in reader:
-            titulo = (get(row, "SIGLA OU PALAVRA") or "").strip()
-            if not titulo:
-                continue
-            slug = slugify(titulo)
-            if slug in seen_slugs:
-                duplicates_in_file += 1
-            seen_slugs.add(slug)
-
-            dec_en = (get(row, "DECODIFICAÇÃO EM INGLÊS") or "").strip()
-            dec_pt = (get(row, "DECODIFICAÇÃO EM PORTUGUÊS") or "").strip()
-            explic = (get(row, "EXPLICAÇÃO") or "").strip()
-            raw_videos = split_multi(get(row, "VÍDEOS") or get(row, "VIDEOS"))
-            raw_links = split_multi(get(row, "LINKS"))
-
-            termo, was_created = Termo.objects.get_or_create(slug=slug, defaults={
-                "titulo": titulo,
-                "decod_en": dec_en,
-                "decod_pt": dec_pt,
-                "explicacao": explic,
-            })
-
-            if was_created:
-                created += 1
+    def import_progress_view(self, request, job_id):
+        job = get_object_or_404(CSVImportJob, pk=job_id)
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": f"Importação de CSV #{job.pk}",
+            "job": job,
+            "status": import_jobs.status(job.pk),
+        }
+        return TemplateResponse(request, "admin/glossario/termo/import_progress.html", context)
+
+    def import_status_view(self, request, job_id):
+        data = import_jobs.status(job_id)
+        if data is None:
+            raise Http404
+        return JsonResponse(data)
+
+    def import_retry_view(self, request, job_id):
+        job = get_object_or_404(CSVImportJob, pk=job_id)
+        if request.method == "POST":
+            if import_jobs.retry(job):
+                self.message_user(request, "Os blocos com erro foram reenfileirados.", level=messages.SUCCESS)
             else:
-                changed = False
-                if titulo and termo.titulo != titulo:
-                    termo.titulo = titulo; changed = True
-                if dec_en and termo.decod_en != dec_en:
-                    termo.decod_en = dec_en; changed = True
-                if dec_pt and termo.decod_pt != dec_pt:
-                    termo.decod_pt = dec_pt; changed = True
-                if explic and termo.explicacao != explic:
-                    termo.explicacao = explic; changed = True
-                if changed:
-                    termo.save(); updated += 1
-
-            for link in raw_links:
-                url = normalize_url(link)
-                if not url:
-                    continue
-                TermoLink.objects.get_or_create(termo=termo, url=url)
-                link_count += 1
-
-            for v in raw_videos:
-                url = normalize_url(v)
-                if not url:
-                    continue
-                try:
-                    TermoVideo.objects.get_or_create(termo=termo, youtube_url=url)
-                    video_count += 1
-                except Exception:
-                    continue
-
-        return (
-            f"Importação concluída. Criados: {created}, Atualizados: {updated}, "
-            f"Links adicionados: {link_count}, Vídeos adicionados: {video_count}. "
-            f"Duplicatas no CSV: {duplicates_in_file}."
-        )
+                self.message_user(request, "Só importações concluídas com erros podem ser reprocessadas.", level=messages.WARNING)
+        return HttpResponseRedirect(reverse("admin:glossario_termo_import_progress", args=[job.pk]))
 
     # Link para visualizar no site
     def preview_site(self, obj):
@@ -251,16 +173,14 @@ class TermoAdmin(admin.ModelAdmin):
     preview_site.short_description = "Preview"
     preview_site.allow_tags = True
 
-    # Exportação CSV com colunas básicas
+    # Exportação CSV (mesmo formato da importação), gerada em fluxo
     actions = ["exportar_csv"]
 
     def exportar_csv(self, request, queryset):
-        response = HttpResponse(content_type="text/csv; charset=utf-8")
+        response = StreamingHttpResponse(
+            csv_export.iter_csv(queryset.order_by("titulo", "pk")), content_type="text/csv; charset=utf-8"
+        )
         response["Content-Disposition"] = "attachment; filename=termos.csv"
-        writer = csv.writer(response)
-        writer.writerow(["SIGLA OU PALAVRA", "DECODIFICAÇÃO EM INGLÊS", "DECODIFICAÇÃO EM PORTUGUÊS", "EXPLICAÇÃO"]) 
-        for t in queryset:
-            writer.writerow([t.titulo, t.decod_en, t.decod_pt, t.explicacao])
         return response
 
     exportar_csv.short_description = "Exportar termos selecionados (CSV)"
@@ -291,6 +211,21 @@ class TermoAdmin(admin.ModelAdmin):
                 self.admin_site.admin_view(self.import_csv_view),
                 name="glossario_termo_import_csv",
             ),
+            path(
+                "importar-csv/<int:job_id>/",
+                self.admin_site.admin_view(self.import_progress_view),
+                name="glossario_termo_import_progress",
+            ),
+            path(
+                "importar-csv/<int:job_id>/status/",
+                self.admin_site.admin_view(self.import_status_view),
+                name="glossario_termo_import_status",
+            ),
+            path(
+                "importar-csv/<int:job_id>/reprocessar/",
+                self.admin_site.admin_view(self.import_retry_view),
+                name="glossario_termo_import_retry",
+            ),
             path(
                 '<path:object_id>/revert-last/',
                 self.admin_site.admin_view(self.revert_last),
@@ -360,6 +295,21 @@ class SuggestionAdmin(admin.ModelAdmin):
     inlines = [SuggestionImageInline, SuggestionLinkInline, SuggestionVideoInline]
     actions = ["aprovar", "rejeitar", "aplicar_ao_termo"]
     change_form_template = "admin/glossario/suggestion/change_form.html"
+    list_select_related = ("user", "termo")
+    MODERACAO_MENSAGENS = {
+        "approved": ("Sugestão aprovada e aplicada.", messages.SUCCESS),
+        "rejected": ("Sugestão rejeitada.", messages.SUCCESS),
+        "no_target": ("Sugestão sem termo e sem título: nada a aplicar.", messages.WARNING),
+        "unavailable": ("Sugestão já decidida ou em moderação por outra pessoa.", messages.WARNING),
+    }
+
+    def get_queryset(self, request):
+        # o badge de impacto lê só estas anotações: nenhuma consulta por linha
+        return super().get_queryset(request).annotate(
+            tem_imagens=Exists(SuggestionImage.objects.filter(suggestion=OuterRef("pk"))),
+            tem_links=Exists(SuggestionLink.objects.filter(suggestion=OuterRef("pk"))),
+            tem_videos=Exists(SuggestionVideo.objects.filter(suggestion=OuterRef("pk"))),
+        )
 
     def get_urls(self):
         urls = super().get_urls()
@@ -368,59 +318,80 @@ class SuggestionAdmin(admin.ModelAdmin):
         ]
         return custom + urls
 
+    @staticmethod
+    def _suggestion_id(raw):
+        if raw is None or raw == "":
+            return None
+        try:
+            return int(raw)
+        except (TypeError, ValueError):
+            raise BadRequest("Sugestão inválida.")
+
     def moderar_view(self, request):
-        # fila simples: pega o próximo id pendente ou o id especificado via GET
-        from django.shortcuts import get_object_or_404, redirect
-        sid = request.GET.get("id")
-        act = request.GET.get("action")
-        if sid:
-            sug = get_object_or_404(Suggestion, pk=sid)
-        else:
-            sug = Suggestion.objects.filter(status="pending").order_by("created_at").first()
-            if not sug:
-                self.message_user(request, "Não há sugestões pendentes.")
-                return HttpResponseRedirect(reverse("admin:glossario_suggestion_changelist"))
-
-        # Aprovação via GET action (para botões inline)
-        if act in {"approve", "reject"}:
-            self._request_user = request.user
-            if act == "approve":
-                self._aplicar(sug)
-                self.message_user(request, "Sugestão aprovada e aplicada.")
-            else:
-                sug.status = "rejected"; sug.save(update_fields=["status", "updated_at"])
-                self.message_user(request, "Sugestão rejeitada.")
-            return HttpResponseRedirect(reverse("admin:glossario_suggestion_changelist"))
+        # fila com reserva: cada moderador trabalha no seu lote (ver glossario.moderation)
+        from django.shortcuts import redirect
+        changelist = reverse("admin:glossario_suggestion_changelist")
 
+        # decisões só por POST (com CSRF): formulário da fila ou botões da listagem
         if request.method == "POST":
-            action = request.POST.get("action")
-            self._request_user = request.user
-            if action == "approve":
-                self._aplicar(sug)
-                self.message_user(request, "Sugestão aprovada e aplicada.")
-            elif action == "reject":
-                sug.status = "rejected"; sug.save(update_fields=["status", "updated_at"])
-                self.message_user(request, "Sugestão rejeitada.")
-            # pega próxima
-            nxt = Suggestion.objects.filter(status="pending").exclude(pk=sug.pk).order_by("created_at").first()
-            if nxt:
-                return HttpResponseRedirect(reverse("admin:glossario_suggestion_moderar") + f"?id={nxt.pk}")
-            return HttpResponseRedirect(reverse("admin:glossario_suggestion_changelist"))
+            act = request.POST.get("action")
+            sid = request.POST.get("id")
+            origem = "admin:glossario_suggestion_moderar"
+            if "decisao" in request.POST:  # botões da listagem, "approve:<id>"
+                act, _, sid = request.POST["decisao"].partition(":")
+                origem = changelist
+            if act == "release":
+                moderation.release(request.user)
+                self.message_user(request, "Suas sugestões reservadas voltaram para a fila.")
+                return redirect(changelist)
+            pk = self._suggestion_id(sid)
+            if pk is None or act not in {"approve", "reject"}:
+                raise BadRequest("Ação de moderação inválida.")
+            outcome = moderation.decide(request.user, pk, act)
+            msg, level = self.MODERACAO_MENSAGENS[outcome]
+            self.message_user(request, msg, level=level)
+            return redirect(origem)
+
+        pk = self._suggestion_id(request.GET.get("id"))
+        bloqueada_por = None
+        if pk is not None:
+            # sugestão aberta pela listagem: reserva só ela, sem tirar outro lote da fila
+            sug = get_object_or_404(Suggestion.objects.select_related("user", "termo", "claimed_by"), pk=pk)
+            if sug.status == "pending" and not moderation.take(request.user, sug.pk):
+                bloqueada_por = sug.claimed_by
+            fila = moderation.reserved(request.user)
+        else:
+            fila = moderation.next_batch(request.user)
+            if not fila:
+                self.message_user(request, "Não há sugestões pendentes.")
+                return redirect(changelist)
+            sug = fila[0]
 
         ctx = {
             **self.admin_site.each_context(request),
             "title": "Moderar sugestões",
             "sug": sug,
+            "fila": fila,
+            "bloqueada_por": bloqueada_por,
+            "reserva_ate": min((s.claimed_until for s in fila), default=None),
             "opts": Suggestion._meta,
         }
         return TemplateResponse(request, "admin/glossario/suggestion/moderar.html", ctx)
 
-    # Ações inline na listagem
+    # Ações inline na listagem: botões do próprio formulário da changelist
+    # (POST com o token CSRF dele), enviados para a view de moderação
     def acoes(self, obj):
+        if obj.status != "pending":
+            return "—"
         url = reverse("admin:glossario_suggestion_moderar")
-        approve = f"{url}?id={obj.pk}&action=approve"
-        reject = f"{url}?id={obj.pk}&action=reject"
-        return format_html("<a class='button' href='{}'>Aprovar</a> <a class='button' href='{}'>Rejeitar</a>", approve, reject)
+        return format_html(
+            "<button type='submit' class='button' form='changelist-form' formaction='{0}' name='decisao' "
+            "value='approve:{1}'>Aprovar</button> "
+            "<button type='submit' class='button' form='changelist-form' formaction='{0}' name='decisao' "
+            "value='reject:{1}'>Rejeitar</button>",
+            url,
+            obj.pk,
+        )
     acoes.short_description = "Ações"
 
     def impacto(self, obj):
@@ -434,7 +405,7 @@ class SuggestionAdmin(admin.ModelAdmin):
             diff(obj.decod_pt, t.decod_pt),
             diff(obj.explicacao, t.explicacao),
         ])
-        media = obj.imagens.exists() or obj.links.exists() or obj.videos.exists()
+        media = obj.tem_imagens or obj.tem_links or obj.tem_videos
         if content and media:
             return format_html("<span class='badge-status badge-approved'>Conteúdo + mídia</span>")
         if content:
@@ -444,164 +415,67 @@ class SuggestionAdmin(admin.ModelAdmin):
         return format_html("<span class='badge-status badge-rejected'>Sem efeito</span>")
     impacto.short_description = "Impacto"
 
-    # Utilitário central que aplica a sugestão ao Termo
-    def _aplicar(self, s: Suggestion, request=None) -> bool:
-        with transaction.atomic():
-            applied = False
-            termo = s.termo
-            if not termo:
-                if not s.titulo:
-                    return False
-                slug = slugify(s.titulo)
-                termo, _ = Termo.objects.get_or_create(slug=slug, defaults={"titulo": s.titulo})
-            changed = False
-            changed_fields = []
-            # Helpers
-            def _clean_text(v):
-                return strip_tags(v).strip() if v else ""
-            def _normalize_url(u: str) -> str:
-                if not u:
-                    return ""
-                if not re.match(r"^https?://", u, re.I):
-                    return "https://" + u
-                return u
-            from .models import YOUTUBE_REGEX
-            def _yt_id(url: str):
-                m = YOUTUBE_REGEX.search(url or "")
-                return m.group(1) if m else None
-            # Prepare changes (compare primeiro, para evitar aprovar sem efeito)
-            en_val = _clean_text(s.decod_en)
-            pt_val = _clean_text(s.decod_pt)
-            exp_val = _clean_text(s.explicacao)
-            if en_val and en_val != (termo.decod_en or ""):
-                termo.decod_en = en_val; changed = True; changed_fields.append("decod_en")
-            if pt_val and pt_val != (termo.decod_pt or ""):
-                termo.decod_pt = pt_val; changed = True; changed_fields.append("decod_pt")
-            if exp_val and exp_val != (termo.explicacao or ""):
-                termo.explicacao = exp_val; changed = True; changed_fields.append("explicacao")
-            if changed:
-                termo.save(); applied = True
-
-            # copiar mídias/links/vídeos
-            media_added = links_added = videos_added = 0
-            # Seleciona somente imagens que não existam com mesmo nome base
-            existing_basenames = {os.path.basename(ti.imagem.name) for ti in termo.imagens.all()}
-            for img in s.imagens.all():
-                try:
-                    basename = os.path.basename(img.imagem.name)
-                    if basename in existing_basenames:
-                        continue
-                    termo_img = TermoImage(
-                        termo=termo,
-                        alt_text=img.alt_text,
-                        title=img.title,
-                        caption=img.caption,
-                    )
-                    img.imagem.open("rb")
-                    termo_img.imagem.save(basename, File(img.imagem.file), save=True)
-                    applied = True; media_added += 1
-                finally:
-                    try:
-                        img.imagem.close()
-                    except Exception:
-                        pass
-                # remove arquivo da sugestão e o registro, pois foi migrado
-                try:
-                    storage = img.imagem.storage
-                    path = img.imagem.name
-                    img.delete()
-                    if storage.exists(path):
-                        storage.delete(path)
-                except Exception:
-                    pass
-            for l in s.links.all():
-                url = _normalize_url(l.url)
-                if TermoLink.objects.filter(termo=termo, url__iexact=url).exists():
-                    created = False
-                else:
-                    TermoLink.objects.create(termo=termo, url=url, defaults={"rotulo": l.rotulo})
-                    created = True
-                if created:
-                    links_added += 1
-                applied = applied or created
-            for v in s.videos.all():
-                try:
-                    vid = _yt_id(v.youtube_url)
-                    if not vid:
-                        continue
-                    if TermoVideo.objects.filter(termo=termo, youtube_id=vid).exists():
-                        created = False
-                    else:
-                        tv = TermoVideo(termo=termo, youtube_url=v.youtube_url)
-                        tv.save()
-                        created = True
-                    if created:
-                        videos_added += 1
-                    applied = applied or created
-                except Exception:
-                    pass
-
-            if not applied and request is not None:
-                self.message_user(request, "Nenhuma mudança efetiva a aplicar (conteúdo igual e sem novas mídias/links/vídeos).", level=messages.WARNING)
-                return False
-
-            s.status = "approved"
-            s.termo = termo
-            s.save(update_fields=["status", "termo", "updated_at"])
-            # registra log
-            try:
-                from .models import SuggestionApplicationLog
-                SuggestionApplicationLog.objects.create(
-                    suggestion=s,
-                    termo=termo,
-                    approver=getattr(self, "_request_user", None),
-                    fields_changed=changed_fields,
-                    media_added=media_added,
-                    links_added=links_added,
-                    videos_added=videos_added,
-                    notes=s.justification or "",
-                )
-            except Exception:
-                pass
-            return applied
+    def _decidir_lote(self, request, queryset, action) -> int:
+        # só as pendentes que este moderador consegue reservar (ver glossario.moderation)
+        lote = moderation.decide_many(request.user, queryset.values_list("pk", flat=True), action)
+        if lote.result is not None:
+            self._avisar_sem_efeito(request, lote.result)
+        if lote.skipped:
+            self.message_user(
+                request,
+                f"{lote.skipped} sugestão(ões) ignorada(s): já decidida(s) ou em moderação por outra pessoa.",
+                level=messages.WARNING,
+            )
+        return lote.decided
+
+    def _avisar_sem_efeito(self, request, result) -> None:
+        if not result.no_effect:
+            return
+        if len(result.no_effect) == 1 and not result.applied:
+            msg = "Nenhuma mudança efetiva a aplicar (conteúdo igual e sem novas mídias/links/vídeos)."
+        else:
+            msg = f"{len(result.no_effect)} sugestão(ões) sem mudança efetiva a aplicar (conteúdo igual e sem novas mídias/links/vídeos)."
+        self.message_user(request, msg, level=messages.WARNING)
 
     @admin.action(description="Aprovar selecionadas")
     def aprovar(self, request, queryset):
-        # guarda o usuário para log
-        self._request_user = request.user
-        total = 0
-        for s in queryset:
-            if self._aplicar(s, request=request):
-                total += 1
+        total = self._decidir_lote(request, queryset, "approve")
         self.message_user(request, f"Aprovadas e aplicadas {total} sugestão(ões).")
 
     @admin.action(description="Rejeitar selecionadas")
     def rejeitar(self, request, queryset):
-        queryset.update(status="rejected")
-        self.message_user(request, f"{queryset.count()} sugestão(ões) rejeitadas.")
+        total = self._decidir_lote(request, queryset, "reject")
+        self.message_user(request, f"{total} sugestão(ões) rejeitadas.")
 
     @admin.action(description="Aplicar ao termo (criar/atualizar)")
     def aplicar_ao_termo(self, request, queryset):
-        self._request_user = request.user
-        applied = 0
-        for s in queryset:
-            if self._aplicar(s, request=request):
-                applied += 1
+        applied = self._decidir_lote(request, queryset, "approve")
         self.message_user(request, f"Aplicadas {applied} sugestão(ões) ao(s) termo(s).")
 
-    # Se o admin editar uma sugestão e mudar o status para "approved",
-    # aplica automaticamente.
+    # O status não é gravado pelo formulário: aprovar/rejeitar passa pela fila
+    # (transição condicional de "pending", respeitando a reserva de outro
+    # moderador) e a aprovação aplica a sugestão ao termo.
     def save_model(self, request, obj, form, change):
-        previous_status = None
+        novo = obj.status
         if change:
-            try:
-                previous_status = Suggestion.objects.get(pk=obj.pk).status
-            except Suggestion.DoesNotExist:
-                previous_status = None
-        super().save_model(request, obj, form, change)
-        if obj.status == "approved" and previous_status != "approved":
-            self._request_user = request.user
-            self._aplicar(obj, request=request)
+            atual = Suggestion.objects.filter(pk=obj.pk).values_list("status", flat=True).first()
+            campos = [name for name in form.fields if name != "status"]
+            obj.save(update_fields=[*campos, "updated_at"])
+        else:
+            atual = obj.status = "pending"
+            super().save_model(request, obj, form, change)
+        if novo == atual:
+            return
+        if atual == "pending":
+            outcome = moderation.decide(request.user, obj.pk, "approve" if novo == "approved" else "reject")
+            msg, level = self.MODERACAO_MENSAGENS[outcome]
+            self.message_user(request, msg, level=level)
+        elif novo == "pending":
+            # reabrir uma sugestão decidida (se ninguém a mudou nesse meio-tempo)
+            Suggestion.objects.filter(pk=obj.pk, status=atual).update(status="pending", updated_at=timezone.now())
+        else:
+            self.message_user(request, "Status não alterado: a sugestão já tinha sido decidida.", level=messages.WARNING)
+        obj.status = Suggestion.objects.filter(pk=obj.pk).values_list("status", flat=True).first()
 
 
 @admin.register(SuggestionApplicationLog)
@@ -643,6 +517,70 @@ class TermoHistoryAdmin(admin.ModelAdmin):
         self.message_user(request, f"Revertidos {count} registro(s) de termo.")
 
 
+@admin.register(ImageVariantJob)
+class ImageVariantJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "object_id", "status", "attempts", "max_attempts", "run_after", "updated_at", "last_error")
+    list_filter = ("status", "kind")
+    readonly_fields = ("kind", "object_id", "attempts", "locked_at", "last_error", "created_at", "updated_at")
+    actions = ["reenfileirar"]
+
+    @admin.action(description="Reenfileirar jobs selecionados")
+    def reenfileirar(self, request, queryset):
+        from django.utils import timezone
+
+        count = queryset.exclude(status="running").update(
+            status="pending", attempts=0, run_after=timezone.now(), locked_at=None, last_error=""
+        )
+        self.message_user(request, f"{count} job(s) reenfileirado(s).")
+
+
+@admin.register(RebuildJob)
+class RebuildJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "status", "attempts", "run_after", "updated_at", "last_error")
+    list_filter = ("status", "kind")
+    readonly_fields = ("kind", "attempts", "locked_at", "last_error", "created_at", "updated_at")
+    actions = ["reenfileirar"]
+
+    @admin.action(description="Reenfileirar jobs selecionados")
+    def reenfileirar(self, request, queryset):
+        count = queryset.exclude(status="running").update(
+            status="pending", attempts=0, run_after=timezone.now(), locked_at=None, last_error=""
+        )
+        self.message_user(request, f"{count} job(s) reenfileirado(s).")
+
+
+@admin.register(CSVImportJob)
+class CSVImportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "arquivo_nome", "status", "progresso", "failed_chunks", "created_by", "created_at", "finished_at")
+    list_filter = ("status",)
+    readonly_fields = (
+        "arquivo_nome", "status", "chunk_size", "total_rows", "report", "failed_chunks", "last_error",
+        "created_by", "locked_at", "created_at", "updated_at", "finished_at",
+    )
+    exclude = ("arquivo",)
+    actions = ["reprocessar"]
+
+    def has_add_permission(self, request):
+        # novas importações entram pela tela "Importar CSV" dos termos
+        return False
+
+    @admin.display(description="Arquivo CSV")
+    def arquivo_nome(self, obj):
+        # sem link: o CSV fica fora da mídia pública
+        return obj.arquivo.name
+
+    @admin.display(description="Progresso")
+    def progresso(self, obj):
+        url = reverse("admin:glossario_termo_import_progress", args=[obj.pk])
+        rows = (obj.report or {}).get("rows", 0)
+        return format_html("<a href='{}'>{} / {}</a>", url, rows, obj.total_rows if obj.total_rows is not None else "?")
+
+    @admin.action(description="Reprocessar blocos com erro")
+    def reprocessar(self, request, queryset):
+        count = sum(import_jobs.retry(job) for job in queryset.filter(status="failed"))
+        self.message_user(request, f"{count} importação(ões) reenfileirada(s).")
+
+
 admin.site.site_header = "Aerodicionário Superadmin"
 admin.site.site_title = "Aerodicionário Superadmin"
 admin.site.index_title = "Gerenciamento do Aerodicionário"
@@ -654,7 +592,7 @@ class SiteSettingAdmin(admin.ModelAdmin):
         ("Identidade", {"fields": ("site_name", "site_logo", "favicon", "primary_color", "secondary_color")}),
         ("SEO padrão", {"fields": ("default_meta_description", "meta_keywords", "meta_title_suffix", "default_og_image", "enable_indexing", "robots_txt")}),
         ("Homepage", {"fields": ("hero_eyebrow", "hero_title", "hero_subtitle", "hero_badge_text", "search_placeholder")}),
-        ("Busca e listagem", {"fields": ("items_per_page", "enable_autocomplete", "autocomplete_throttle_ms")}),
+        ("Busca e listagem", {"fields": ("items_per_page", "enable_autocomplete", "autocomplete_cache_seconds")}),
         ("Sugestões", {"fields": ("suggestions_enabled", "suggestions_require_source", "suggestions_min_justification", "suggestion_max_image_mb", "suggestion_rate_limit_seconds")}),
         ("Social", {"fields": ("social_twitter", "social_instagram", "social_youtube", "social_linkedin")}),
         ("Rodapé", {"fields": ("footer_text",)}),
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate, pre_migrate
 
 
 class GlossarioConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "glossario"
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
+        from .search import ensure_installed, prepare_migrate
+
+        pre_migrate.connect(prepare_migrate, sender=self)
+        post_migrate.connect(ensure_installed, sender=self)
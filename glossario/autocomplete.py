@@ -0,0 +1,261 @@
+"""Índice de prefixos em memória usado pelo autocomplete.
+
+Cada processo mantém uma lista ordenada de chaves ``(texto, termo_id)``
+construída a partir das chaves normalizadas (sem acento, minúsculas) de
+``titulo``, ``decod_en``, ``decod_pt`` e dos sinônimos: todos os sufixos de
+cada texto, truncados em ``MAX_KEY_LEN``, então a busca casa também no meio
+das palavras ("nstrum" acha "Instrument"). Alterações locais são aplicadas
+de forma incremental pelos signals: as chaves novas vão para uma lista
+pequena à parte e as antigas do termo passam a ser ignoradas, até que essa
+lista cresça e as duas sejam fundidas (sem custo O(n) a cada save). Os
+demais workers percebem a
+mudança pela versão gravada no cache compartilhado (``CACHE_URL``) e
+reconstroem o índice na próxima consulta. A construção inicial acontece na
+subida do worker (``config.wsgi``/``config.asgi``), não na primeira busca. A
+mesma versão é a geração do cache de resultados (``cached_search``),
+compartilhado por todos os usuários.
+"""
+
+import hashlib
+import heapq
+import logging
+import threading
+from bisect import bisect_left
+from typing import NamedTuple
+
+from django.core.cache import cache
+from django.db import DatabaseError
+
+from .models import normalizar_busca
+from .versioning import bump_version as _bump, get_version
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "glossario:ac_index:version"
+RESULT_TIMEOUT = 60 * 30
+# Chaves mais longas que isso são truncadas; o filtro final confere o texto completo.
+MAX_KEY_LEN = 24
+# as alterações incrementais são fundidas à lista principal quando passam disso
+# (ou de 1/8 dela)
+MERGE_MIN = 5000
+
+
+class Doc(NamedTuple):
+    titulo: str
+    slug: str
+    decod_en: str
+    decod_pt: str
+    title_key: str
+    en_key: str
+    pt_key: str
+    syn_keys: tuple
+    syns_key: str
+
+
+def rank(ql: str, title: str, en: str, pt: str, syns: str) -> int:
+    """Mesma pontuação usada historicamente pelo AutocompleteAPI (menor = melhor)."""
+    score = 0
+    if title.startswith(ql): score -= 100
+    if ql in title: score -= 50
+    if syns.startswith(ql): score -= 40
+    if ql in syns: score -= 30
+    if en.startswith(ql) or pt.startswith(ql): score -= 20
+    if ql in en or ql in pt: score -= 10
+    return score
+
+
+def make_doc(titulo, slug, decod_en, decod_pt, title_key, en_key, pt_key, syn_keys) -> Doc:
+    syn_keys = tuple(syn_keys)
+    return Doc(
+        titulo or "", slug, decod_en or "", decod_pt or "",
+        title_key or "", en_key or "", pt_key or "",
+        syn_keys, " ".join(syn_keys),
+    )
+
+
+class AutocompleteIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries: list[tuple[str, int]] = []
+        # alterações desde a última fusão: chaves novas (ordenadas) e termos
+        # cujas chaves em ``_entries`` não valem mais
+        self._recent: list[tuple[str, int]] = []
+        self._stale: set[int] = set()
+        self._docs: dict[int, Doc] = {}
+        self._version = None
+        self._ready = False
+
+    # --- construção -----------------------------------------------------
+    @staticmethod
+    def _keys(doc: Doc) -> set[str]:
+        keys = set()
+        for text in (doc.title_key, doc.en_key, doc.pt_key, *doc.syn_keys):
+            for pos in range(len(text)):
+                if text[pos] != " ":
+                    keys.add(text[pos:pos + MAX_KEY_LEN])
+        return keys
+
+    def rebuild(self):
+        from .models import Termo, TermoSinonimo
+
+        version = current_version()
+        sinonimos: dict[int, list[str]] = {}
+        for termo_id, nome in TermoSinonimo.objects.order_by("pk").values_list("termo_id", "nome_busca"):
+            sinonimos.setdefault(termo_id, []).append(nome)
+        docs = {}
+        entries = []
+        rows = Termo.objects.values_list(
+            "pk", "titulo", "slug", "decod_en", "decod_pt", "titulo_busca", "decod_en_busca", "decod_pt_busca"
+        )
+        for pk, *fields in rows.iterator(chunk_size=2000):
+            doc = make_doc(*fields, sinonimos.get(pk, ()))
+            docs[pk] = doc
+            entries.extend((key, pk) for key in self._keys(doc))
+        entries.sort()
+        with self._lock:
+            self._docs = docs
+            self._entries = entries
+            self._recent = []
+            self._stale = set()
+            self._version = version
+            self._ready = True
+
+    def warm(self):
+        """Constrói o índice na subida do worker (WSGI/ASGI), antes da primeira consulta."""
+        try:
+            self.rebuild()
+        except DatabaseError:
+            # banco ainda sem migrations: a primeira consulta tenta de novo
+            logger.warning("Índice do autocomplete não construído na subida", exc_info=True)
+
+    def ensure_current(self):
+        version = current_version()
+        if not self._ready or version != self._version:
+            self.rebuild()
+
+    # --- atualização incremental (signals) -------------------------------
+    def _remove(self, pk: int):
+        if self._docs.pop(pk, None) is None:
+            return
+        self._stale.add(pk)
+        self._recent = [entry for entry in self._recent if entry[1] != pk]
+
+    def _add(self, pk: int, doc: Doc):
+        self._docs[pk] = doc
+        # as duas listas já vêm ordenadas: fusão linear no tamanho de ``_recent``
+        self._recent = list(heapq.merge(self._recent, sorted((key, pk) for key in self._keys(doc))))
+        if len(self._recent) > max(MERGE_MIN, len(self._entries) // 8):
+            self._merge()
+
+    def _merge(self):
+        stale = self._stale
+        self._entries = sorted([e for e in self._entries if e[1] not in stale] + self._recent)
+        self._recent = []
+        self._stale = set()
+
+    def _sync_version(self):
+        previous = self._version
+        new = bump_version()
+        # só seguimos "em dia" se ninguém mais alterou o índice entre as versões
+        self._version = new if previous is not None and new == previous + 1 else None
+
+    def update_termo(self, termo):
+        with self._lock:
+            if not self._ready:
+                bump_version()
+                return
+            old = self._docs.get(termo.pk)
+            self._remove(termo.pk)
+            doc = make_doc(
+                termo.titulo, termo.slug, termo.decod_en, termo.decod_pt,
+                termo.titulo_busca, termo.decod_en_busca, termo.decod_pt_busca,
+                old.syn_keys if old else (),
+            )
+            self._add(termo.pk, doc)
+            self._sync_version()
+
+    def update_sinonimos(self, termo_id: int):
+        from .models import TermoSinonimo
+
+        with self._lock:
+            if not self._ready or termo_id not in self._docs:
+                bump_version()
+                return
+            nomes = list(
+                TermoSinonimo.objects.filter(termo_id=termo_id).order_by("pk").values_list("nome_busca", flat=True)
+            )
+            doc = self._docs[termo_id]
+            self._remove(termo_id)
+            self._add(termo_id, doc._replace(syn_keys=tuple(nomes), syns_key=" ".join(nomes)))
+            self._sync_version()
+
+    def invalidate(self):
+        with self._lock:
+            bump_version()
+            self._version = None
+
+    def remove_termo(self, pk: int):
+        with self._lock:
+            if self._ready:
+                self._remove(pk)
+                self._sync_version()
+            else:
+                bump_version()
+
+    # --- consulta ----------------------------------------------------------
+    def cached_search(self, q: str, limit: int = 8) -> list[dict]:
+        """``search`` com cache compartilhado entre usuários e workers.
+
+        A chave é a busca normalizada ("Ção" e "cao " caem na mesma) mais a
+        versão do índice: qualquer mudança nos termos troca a geração e as
+        entradas antigas simplesmente deixam de ser lidas.
+        """
+        ql = normalizar_busca(q)
+        if not ql:
+            return []
+        digest = hashlib.md5(ql.encode("utf-8")).hexdigest()
+        key = f"glossario:ac_result:{current_version()}:{limit}:{digest}"
+        items = cache.get(key)
+        if items is None:
+            items = self.search(ql, limit)
+            cache.set(key, items, RESULT_TIMEOUT)
+        return items
+
+    def search(self, q: str, limit: int = 8) -> list[dict]:
+        ql = normalizar_busca(q)
+        if not ql:
+            return []
+        self.ensure_current()
+        with self._lock:
+            docs = self._docs
+            prefix = ql[:MAX_KEY_LEN]
+            found = set()
+            for entries, skip in ((self._entries, self._stale), (self._recent, ())):
+                i = bisect_left(entries, (prefix,))
+                while i < len(entries) and entries[i][0].startswith(prefix):
+                    if entries[i][1] not in skip:
+                        found.add(entries[i][1])
+                    i += 1
+            scored = []
+            for pk in found:
+                doc = docs[pk]
+                score = rank(ql, doc.title_key, doc.en_key, doc.pt_key, doc.syns_key)
+                if score == 0:
+                    continue  # chave truncada que não contém a busca completa
+                scored.append((score, doc.titulo, pk, doc))
+        best = heapq.nsmallest(limit, scored, key=lambda item: item[:3])
+        return [
+            {"label": doc.titulo, "slug": doc.slug, "decod": doc.decod_pt or doc.decod_en or ""}
+            for _score, _titulo, _pk, doc in best
+        ]
+
+
+def current_version():
+    return get_version(VERSION_KEY)
+
+
+def bump_version() -> int:
+    return _bump(VERSION_KEY)
+
+
+index = AutocompleteIndex()
@@ -0,0 +1,25 @@
+"""Escritas em lote compartilhadas pela importação de CSV e pela aprovação de sugestões."""
+
+from django.db import connection
+
+
+def bulk_update(model, objs, field_names) -> None:
+    """UPDATE por chave primária via ``executemany``.
+
+    ``QuerySet.bulk_update`` monta um ``CASE WHEN`` por campo e por linha e
+    gasta alguns ms de CPU por objeto; aqui é uma única instrução preparada.
+    Como o ``bulk_update``, não chama ``save()`` nem dispara signals.
+    """
+    fields = [model._meta.get_field(name) for name in field_names]
+    qn = connection.ops.quote_name
+    sql = "UPDATE {} SET {} WHERE {} = %s".format(
+        qn(model._meta.db_table),
+        ", ".join(f"{qn(f.column)} = %s" for f in fields),
+        qn(model._meta.pk.column),
+    )
+    params = [
+        [f.get_db_prep_save(getattr(obj, f.attname), connection) for f in fields] + [obj.pk]
+        for obj in objs
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
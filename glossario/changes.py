@@ -0,0 +1,98 @@
+"""Feed de mudanças dos termos para sincronização incremental.
+
+``TermoChange`` guarda só a última mudança de cada termo: registrar uma
+mudança regrava a linha do termo (upsert pela chave ``termo_pk``) com um
+``seq`` maior. Assim ``seq > since`` devolve cada termo alterado uma única
+vez, e um cliente que guarda o maior ``seq`` visto só baixa o que mudou
+depois. Termos apagados viram lápides (``deleted``).
+
+Cobre o termo e os filhos que aparecem na API (sinônimos, imagens e
+variantes, links, vídeos). As linhas são gravadas na mesma transação da
+escrita (uma queda entre o commit e o registro não perde a mudança), e o
+``seq`` vem do contador ``TermoChangeSeq``, cuja linha fica travada até o
+commit de quem alocou: uma transação só aloca depois que a anterior
+terminou, então os ``seq`` ficam visíveis em ordem e um cursor nunca passa
+por cima de um ``seq`` menor ainda não commitado.
+
+Para não haver deadlock entre o contador e as linhas dos termos, quem
+escreve trava o contador antes de tocar nos termos (``lock``; os signals
+``pre_save``/``pre_delete`` fazem isso nas escritas pelo ORM).
+"""
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from .models import Termo, TermoChange, TermoChangeSeq
+
+BATCH_SIZE = 500
+
+
+def lock() -> None:
+    """Trava o contador até o fim da transação atual (antes das linhas dos termos).
+
+    Fora de uma transação, ou em bancos sem ``SELECT ... FOR UPDATE`` (o
+    SQLite já serializa as escritas), não faz nada.
+    """
+    if connection.in_atomic_block and connection.features.has_select_for_update:
+        list(TermoChangeSeq.objects.select_for_update().filter(pk=1).values_list("pk"))
+
+
+def _allocate(n: int) -> int:
+    """Reserva ``n`` seqs consecutivos e devolve o primeiro (chamar dentro de uma transação)."""
+    # o UPDATE trava a linha do contador até o fim da transação
+    if not TermoChangeSeq.objects.filter(pk=1).update(last=F("last") + n):
+        # contador ausente (banco limpo por fora das migrations): continua do maior seq
+        try:
+            with transaction.atomic():
+                last = TermoChange.objects.aggregate(seq=Max("seq"))["seq"] or 0
+                TermoChangeSeq.objects.create(pk=1, last=last)
+        except IntegrityError:
+            pass  # criado por outro processo
+        TermoChangeSeq.objects.filter(pk=1).update(last=F("last") + n)
+    return TermoChangeSeq.objects.values_list("last", flat=True).get(pk=1) - n + 1
+
+
+def _replace(rows) -> None:
+    """Regrava as linhas ``(pk, slug, deleted)`` dos termos com seqs novos (uma transação por lote)."""
+    for start in range(0, len(rows), BATCH_SIZE):
+        batch = rows[start : start + BATCH_SIZE]
+        now = timezone.now()
+        with transaction.atomic():
+            first = _allocate(len(batch))
+            TermoChange.objects.bulk_create(
+                [
+                    TermoChange(termo_pk=pk, seq=first + i, slug=slug, deleted=deleted, created_at=now)
+                    for i, (pk, slug, deleted) in enumerate(batch)
+                ],
+                update_conflicts=True,
+                unique_fields=["termo_pk"],
+                update_fields=["seq", "slug", "deleted", "created_at"],
+            )
+
+
+def record(termo_pks) -> None:
+    """Registra mudanças nos termos ``termo_pks`` (os que não existem mais são ignorados).
+
+    Chamar dentro da transação que alterou os termos.
+    """
+    pks = sorted(set(termo_pks))
+    rows = []
+    for start in range(0, len(pks), BATCH_SIZE):
+        rows += [
+            (pk, slug, False)
+            for pk, slug in Termo.objects.filter(pk__in=pks[start : start + BATCH_SIZE]).values_list("pk", "slug")
+        ]
+    _replace(rows)
+
+
+def record_slugs(slugs) -> None:
+    slugs = sorted(set(slugs))
+    pks = []
+    for start in range(0, len(slugs), BATCH_SIZE):
+        pks += Termo.objects.filter(slug__in=slugs[start : start + BATCH_SIZE]).values_list("pk", flat=True)
+    record(pks)
+
+
+def tombstone(termo_pk: int, slug: str) -> None:
+    _replace([(termo_pk, slug, True)])
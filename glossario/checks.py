@@ -0,0 +1,57 @@
+"""Verificações de configuração do glossário.
+
+Configurações do site, índice do autocomplete, cache de resultados e páginas
+de termo mantêm cópias por processo e usam contadores no cache para avisar
+os demais workers (``glossario.versioning``). Com um cache local de processo
+(LocMemCache) o aviso não sai do worker que gravou e os outros servem dados
+velhos indefinidamente.
+
+Em desenvolvimento isso é só um aviso (``glossario.W001``); com ``--deploy``
+é um erro (``glossario.E001``), e os pontos de entrada WSGI/ASGI recusam subir.
+"""
+
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+from django.core.exceptions import ImproperlyConfigured
+
+PROCESS_LOCAL_BACKENDS = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+def process_local_cache() -> str | None:
+    """O backend do cache padrão, se ele não for compartilhado entre processos."""
+    if getattr(settings, "GLOSSARIO_SINGLE_PROCESS", False):
+        return None
+    backend = settings.CACHES.get("default", {}).get("BACKEND", "")
+    return backend if backend in PROCESS_LOCAL_BACKENDS else None
+
+
+def _error(backend: str, level=Error, check_id: str = "glossario.E001"):
+    return level(
+        f"O cache padrão ({backend}) é local de cada processo; com vários workers as "
+        "invalidações não chegam aos demais.",
+        hint="Defina CACHE_URL (redis://, memcached://, db ou file://) ou, com um único processo, "
+        "GLOSSARIO_SINGLE_PROCESS=1.",
+        id=check_id,
+    )
+
+
+@register(Tags.caches)
+def shared_cache_warning(app_configs, **kwargs):
+    backend = process_local_cache()
+    return [_error(backend, Warning, "glossario.W001")] if backend else []
+
+
+@register(Tags.caches, deploy=True)
+def shared_cache_check(app_configs, **kwargs):
+    backend = process_local_cache()
+    return [_error(backend)] if backend else []
+
+
+def require_shared_cache() -> None:
+    """Chamado pelos pontos de entrada WSGI/ASGI: em produção, recusa subir sem cache compartilhado."""
+    backend = process_local_cache()
+    if backend and not settings.DEBUG:
+        raise ImproperlyConfigured(_error(backend).msg + " " + _error(backend).hint)
@@ -0,0 +1,140 @@
+"""Índice de busca do autocomplete para o navegador.
+
+O job ``search_index`` (``glossario.rebuilds``), enfileirado após o commit
+de qualquer mudança que altere o autocomplete, grava no storage de mídia um
+JSON compactado (gzip) com título, decodificação, slug e as chaves
+normalizadas (título, decodificações, sinônimos) de todos os termos. O nome
+do arquivo leva o hash do conteúdo, então pode ser servido com cache
+"eterno" pelo CDN/proxy. O ``autocomplete.js`` baixa o índice uma vez e
+ranqueia no próprio navegador com as mesmas regras de
+``glossario.autocomplete`` (os testes comparam as duas implementações); sem
+índice (ou sem suporte a ``DecompressionStream``) ele continua usando
+``/api/autocomplete/``.
+
+O índice só é refeito se o feed de mudanças avançou desde o atual (contador
+``TermoChangeSeq``, que só avança na ordem dos commits); o comando
+``build_search_index`` gera um na hora. O manifesto do índice atual fica no
+cache compartilhado e num arquivo ``atual.json`` ao lado dos índices,
+trocado de uma vez (arquivo temporário + ``os.replace``).
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from .models import Termo, TermoChangeSeq, TermoSinonimo
+
+FORMAT = 1
+DIRECTORY = "autocomplete"
+POINTER = f"{DIRECTORY}/atual.json"
+CACHE_KEY = "glossario:ac_static:manifest"
+CACHE_TIMEOUT = 300
+# sem índice publicado: volta a procurar o arquivo logo
+MISSING_TIMEOUT = 30
+# índices anteriores mantidos para páginas abertas (ou em cache) que ainda apontam para eles
+KEEP = 3
+# ordem das colunas de cada termo no JSON
+FIELDS = ("pk", "titulo", "slug", "decod", "title_key", "en_key", "pt_key", "syn_keys")
+
+
+def rows() -> list[list]:
+    """Uma linha por termo, na ordem de ``FIELDS`` (2 consultas)."""
+    sinonimos: dict[int, list[str]] = {}
+    for termo_id, nome in TermoSinonimo.objects.order_by("pk").values_list("termo_id", "nome_busca"):
+        sinonimos.setdefault(termo_id, []).append(nome)
+    campos = ("pk", "titulo", "slug", "decod_en", "decod_pt", "titulo_busca", "decod_en_busca", "decod_pt_busca")
+    return [
+        [pk, titulo, slug, decod_pt or decod_en, tk, ek, ptk, sinonimos.get(pk, [])]
+        for pk, titulo, slug, decod_en, decod_pt, tk, ek, ptk in (
+            Termo.objects.order_by("pk").values_list(*campos).iterator(chunk_size=2000)
+        )
+    ]
+
+
+def current() -> dict | None:
+    """Manifesto do índice publicado (``url``, ``seq``, ``hash``...), ou None."""
+    manifest = cache.get(CACHE_KEY)
+    if manifest is None:
+        try:
+            with default_storage.open(POINTER) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}  # sem índice: não procura o arquivo a cada request
+        # o build atualiza a chave; o prazo cobre caches locais de outro processo
+        cache.set(CACHE_KEY, manifest, CACHE_TIMEOUT if manifest else MISSING_TIMEOUT)
+    return manifest or None
+
+
+def latest_seq() -> int:
+    """Último ``seq`` do feed já commitado (os menores também estão)."""
+    return TermoChangeSeq.objects.filter(pk=1).values_list("last", flat=True).first() or 0
+
+
+def _write_pointer(manifest: dict) -> None:
+    """Grava ``atual.json`` sem janela em que ele falte ou esteja pela metade."""
+    data = json.dumps(manifest).encode("utf-8")
+    try:
+        path = default_storage.path(POINTER)
+    except NotImplementedError:
+        # storages remotos (S3...) gravam o objeto inteiro de uma vez: sobrescreve
+        # quando o storage permite, senão o save escolheria outro nome
+        if default_storage.get_available_name(POINTER) != POINTER:
+            default_storage.delete(POINTER)
+        default_storage.save(POINTER, ContentFile(data))
+        return
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".atual-", suffix=".json")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, default_storage.file_permissions_mode or 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def build(force: bool = False) -> dict | None:
+    """Publica um índice novo se houve mudança desde o atual; devolve o manifesto (ou None)."""
+    seq = latest_seq()  # lido antes dos termos: o que mudar durante a geração entra na próxima
+    atual = current()
+    if not force and atual and atual.get("seq") == seq and atual.get("format") == FORMAT:
+        return None
+    raw = json.dumps(
+        {"format": FORMAT, "fields": FIELDS, "termos": rows()}, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+    digest = hashlib.sha256(raw).hexdigest()[:16]
+    name = f"{DIRECTORY}/indice-{digest}.json.gz"
+    if not default_storage.exists(name):
+        # mtime fixo: o mesmo conteúdo gera sempre os mesmos bytes
+        name = default_storage.save(name, ContentFile(gzip.compress(raw, compresslevel=9, mtime=0)))
+    manifest = {
+        "format": FORMAT,
+        "seq": seq,
+        "hash": digest,
+        "name": name,
+        "url": default_storage.url(name),
+        "bytes": default_storage.size(name),
+    }
+    _write_pointer(manifest)
+    cache.set(CACHE_KEY, manifest, CACHE_TIMEOUT)
+    _prune(name)
+    return manifest
+
+
+def _prune(atual: str) -> None:
+    try:
+        _dirs, files = default_storage.listdir(DIRECTORY)
+    except (OSError, NotImplementedError):
+        return
+    nomes = [f"{DIRECTORY}/{f}" for f in files if f.startswith("indice-") and f.endswith(".json.gz")]
+    antigos = sorted((n for n in nomes if n != atual), key=default_storage.get_modified_time, reverse=True)
+    for name in antigos[KEEP - 1 :]:
+        default_storage.delete(name)
@@ -0,0 +1,50 @@
+"""GET condicional (ETag forte e Last-Modified) a partir de ``Termo.updated_at``.
+
+As views calculam os validadores antes de montar a resposta; se o cliente já
+tem a versão atual, devolvem 304 sem renderizar nem serializar nada.
+"""
+
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .models import SiteSetting
+
+
+def make_etag(*parts) -> str:
+    """ETag forte (entre aspas) a partir de tudo o que muda o corpo da resposta."""
+    return '"%s"' % hashlib.md5("\x1f".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+
+
+def collection_state(queryset) -> tuple:
+    """``(total, último updated_at)`` de um queryset de termos, numa consulta."""
+    state = queryset.order_by().aggregate(total=Count("pk"), ultimo=Max("updated_at"))
+    return state["total"], state["ultimo"]
+
+
+def site_settings_digest() -> str:
+    """Resumo das configurações do site (o layout das páginas depende delas)."""
+    config = SiteSetting.get_solo()
+    digest = getattr(config, "_etag_digest", None)
+    if digest is None:
+        values = [getattr(config, f.attname) for f in config._meta.concrete_fields]
+        digest = config._etag_digest = hashlib.md5(repr(values).encode("utf-8")).hexdigest()
+    return digest
+
+
+def add_validators(response, etag: str, last_modified=None):
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
+
+
+def not_modified(request, etag: str, last_modified=None):
+    """304 (ou 412) se as condições do request já batem; senão None."""
+    timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        add_validators(response, etag, last_modified)
+    return response
@@ -1,8 +1,10 @@
+from . import client_index
 from .models import SiteSetting
 
 
 def site_settings(request):
     return {
         "site_settings": SiteSetting.get_solo(),
+        # índice do autocomplete no navegador (None: o script usa a API)
+        "autocomplete_index": client_index.current(),
     }
-
@@ -0,0 +1,88 @@
+"""Exportação de termos em CSV, em fluxo.
+
+Gera o mesmo formato lido por ``glossario.csv_import`` (inclusive sinônimos,
+links e vídeos), então o arquivo exportado pode ser reimportado sem perdas:
+as listas vão um valor por linha dentro da célula (o ``csv`` põe a célula
+entre aspas), então vírgulas, ";" e espaços nos valores não são separadores.
+Os termos são lidos com ``iterator(chunk_size)`` e os filhos são buscados por
+bloco via ``prefetch_related``: memória constante e 3 consultas por bloco
+(sinônimos, links, vídeos), independente do número de filhos.
+"""
+
+import csv
+
+from django.db.models import Prefetch
+
+from .csv_import import split_multi, split_sinonimos
+from .models import Termo, TermoLink, TermoSinonimo, TermoVideo
+
+HEADER = [
+    "SIGLA OU PALAVRA",
+    "DECODIFICAÇÃO EM INGLÊS",
+    "DECODIFICAÇÃO EM PORTUGUÊS",
+    "EXPLICAÇÃO",
+    "SINÔNIMOS",
+    "LINKS",
+    "VÍDEOS",
+]
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class _Echo:
+    """"Arquivo" cujo ``write`` devolve a linha, para o ``csv.writer`` alimentar um gerador."""
+
+    def write(self, value):
+        return value
+
+
+def list_cell(values, split) -> str:
+    """Um valor por linha (lido por ``csv_import.split_cell``).
+
+    Um valor sozinho só ganha a quebra de linha final se ``split`` (a leitura
+    das listas escritas à mão) o partiria: ``"a;b"`` ou uma URL com espaço.
+    """
+    values = [v.strip() for v in values if v.strip()]
+    cell = "\n".join(values)
+    if len(values) == 1 and split(cell) != values:
+        cell += "\n"
+    return cell
+
+
+def export_queryset(queryset=None):
+    queryset = Termo.objects.all() if queryset is None else queryset
+    return queryset.only("titulo", "decod_en", "decod_pt", "explicacao").prefetch_related(
+        Prefetch("sinonimos", queryset=TermoSinonimo.objects.only("termo_id", "nome").order_by("pk")),
+        Prefetch("links_relacionados", queryset=TermoLink.objects.only("termo_id", "url").order_by("pk")),
+        Prefetch("videos", queryset=TermoVideo.objects.only("termo_id", "youtube_url").order_by("pk")),
+    )
+
+
+def iter_rows(queryset=None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    yield HEADER
+    for t in export_queryset(queryset).iterator(chunk_size=chunk_size):
+        yield [
+            t.titulo,
+            t.decod_en,
+            t.decod_pt,
+            t.explicacao,
+            list_cell((s.nome for s in t.sinonimos.all()), split_sinonimos),
+            list_cell((link.url for link in t.links_relacionados.all()), split_multi),
+            list_cell((v.youtube_url for v in t.videos.all()), split_multi),
+        ]
+
+
+def iter_csv(queryset=None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Gera o CSV linha a linha (para ``StreamingHttpResponse``)."""
+    writer = csv.writer(_Echo())
+    for row in iter_rows(queryset, chunk_size):
+        yield writer.writerow(row)
+
+
+def write_csv(fileobj, queryset=None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Escreve o CSV em ``fileobj``; devolve quantos termos foram exportados."""
+    writer = csv.writer(fileobj)
+    total = -1  # cabeçalho
+    for row in iter_rows(queryset, chunk_size):
+        writer.writerow(row)
+        total += 1
+    return total
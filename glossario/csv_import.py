@@ -0,0 +1,401 @@
+"""Importação de termos a partir de CSV, em fluxo e em lotes.
+
+O arquivo é lido linha a linha (nunca inteiro em memória) e processado em
+blocos de ``chunk_size`` linhas. Cada bloco roda numa transação própria e faz
+um número fixo de consultas (nenhuma, se nada mudou): busca dos termos do bloco,
+``bulk_create`` dos novos, um UPDATE em lote dos alterados e ``bulk_create``
+de links e vídeos que ainda não existem.
+
+As regras são as mesmas da importação original do admin: a linha é
+identificada pelo ``slugify`` da sigla, valores vazios não sobrescrevem os
+existentes e links/vídeos/sinônimos só são acrescentados.
+
+Reimportação incremental: cada termo guarda a impressão digital
+(``fingerprint``) da última linha aplicada a ele, e qualquer edição fora da
+importação a apaga (ver ``Termo.save`` e ``glossario.signals``). Linhas cuja
+impressão digital coincide com a do termo são contadas como inalteradas sem
+nenhuma consulta ao banco.
+"""
+
+import csv
+import hashlib
+import io
+import itertools
+import re
+from dataclasses import asdict, dataclass, fields
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from . import changes
+from .bulk import bulk_update
+from .models import YOUTUBE_REGEX, Termo, TermoLink, TermoSinonimo, TermoVideo, normalizar_busca
+
+HEADER_MARKER = "sigla ou palavra"
+HEADER_SCAN_LINES = 200
+DEFAULT_CHUNK_SIZE = 500
+TERMO_FIELDS = ("titulo", "decod_en", "decod_pt", "explicacao")
+UPDATE_FIELDS = TERMO_FIELDS + tuple(
+    d for f in TERMO_FIELDS for d in Termo.DERIVED_FIELDS.get(f, ())
+)
+
+
+class CSVHeaderNotFound(ValueError):
+    def __init__(self):
+        super().__init__(
+            "Cabeçalho não encontrado no CSV. Garanta que exista a coluna 'SIGLA OU PALAVRA'."
+        )
+
+
+@dataclass
+class ImportReport:
+    created: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    vanished: int = 0
+    links: int = 0
+    videos: int = 0
+    sinonimos: int = 0
+    duplicates: int = 0
+    rows: int = 0
+
+    def __str__(self) -> str:
+        sinonimos = f", Sinônimos adicionados: {self.sinonimos}" if self.sinonimos else ""
+        return (
+            f"Importação concluída. Criados: {self.created}, Alterados: {self.changed}, "
+            f"Inalterados: {self.unchanged}, Ausentes no CSV: {self.vanished}. "
+            f"Links adicionados: {self.links}, Vídeos adicionados: {self.videos}{sinonimos}. "
+            f"Duplicatas no CSV: {self.duplicates}."
+        )
+
+    def __add__(self, other: "ImportReport") -> "ImportReport":
+        return ImportReport(**{f.name: getattr(self, f.name) + getattr(other, f.name) for f in fields(self)})
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict | None) -> "ImportReport":
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in (data or {}).items() if k in names})
+
+
+@dataclass
+class Row:
+    titulo: str
+    slug: str
+    decod_en: str
+    decod_pt: str
+    explicacao: str
+    links: list
+    videos: list
+    sinonimos: list
+
+
+SCHEME = re.compile(r"^[a-z][a-z0-9+.-]*://", re.I)
+# vírgula/ponto e vírgula que sempre separam: no fim da célula ou antes de outra URL
+URL_BREAK = re.compile(r"[;,]+(?=$|https?://|www\.)", re.I)
+
+
+def split_multi(val: str) -> list[str]:
+    """URLs separadas por espaço, ";" ou ",".
+
+    No caminho ou na consulta de uma URL (depois do primeiro "/", "?" ou "#")
+    vírgula e ponto e vírgula fazem parte dela, salvo no fim ou antes de outra
+    URL: ".../a,b;c" continua inteira e "a.com,b.com" são duas.
+    """
+    urls = []
+    for token in (val or "").split():
+        start = 0
+        for m in re.finditer(r"[;,]+", token):
+            atual = SCHEME.sub("", token[start : m.start()])
+            if not re.search(r"[/?#]", atual) or URL_BREAK.match(token, m.start()):
+                urls.append(token[start : m.start()])
+                start = m.end()
+        urls.append(token[start:])
+    return [u for u in urls if u]
+
+
+def split_sinonimos(val: str) -> list[str]:
+    # sinônimos podem ter espaços: separados só por ";"
+    return [p.strip() for p in (val or "").split(";") if p.strip()]
+
+
+def split_cell(val: str, split) -> list[str]:
+    """Valores de uma célula com lista (sinônimos, links, vídeos).
+
+    Com quebra de linha (formato de ``glossario.csv_export``) é um valor por
+    linha, sem outro separador: vírgulas, ";" e espaços ficam no valor. Sem
+    quebra de linha, ``split`` trata as listas escritas à mão.
+    """
+    if "\n" in (val or ""):
+        return [v.strip() for v in val.splitlines() if v.strip()]
+    return split(val)
+
+
+def normalize_url(u: str) -> str:
+    if not u:
+        return ""
+    if not re.match(r"^https?://", u, re.I):
+        return "https://" + u
+    return u
+
+
+def open_text(binary) -> io.TextIOWrapper:
+    """Envolve um arquivo binário (upload ou ``open(..., "rb")``) para leitura em fluxo."""
+    return io.TextIOWrapper(binary, encoding="utf-8-sig", errors="ignore", newline="")
+
+
+def _reader(lines) -> csv.DictReader:
+    lines = iter(lines)
+    for line in itertools.islice(lines, HEADER_SCAN_LINES):
+        if HEADER_MARKER in line.lower():
+            return csv.DictReader(itertools.chain([line], lines))
+    raise CSVHeaderNotFound()
+
+
+def fingerprint(row: Row) -> str:
+    """Impressão digital da linha, gravada em ``Termo.content_hash`` ao importá-la.
+
+    Links, vídeos e sinônimos só são acrescentados, então entram ordenados e
+    sem repetição: a ordem na planilha não muda o resultado.
+    """
+    parts = [row.titulo, row.decod_en, row.decod_pt, row.explicacao] + [
+        "\x1e".join(sorted(set(values))) for values in (row.links, row.videos, row.sinonimos)
+    ]
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def iter_chunks(rows, size: int):
+    """Agrupa as linhas em listas de ``size`` (a última pode ser menor)."""
+    while True:
+        chunk = list(itertools.islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parse_rows(lines):
+    """Gera as linhas do CSV já normalizadas (a partir do cabeçalho)."""
+    reader = _reader(lines)
+    field_map = {(k or "").lower().strip(): (k or "") for k in (reader.fieldnames or [])}
+
+    def get(row, key):
+        k = field_map.get(key.lower())
+        if k:
+            return row.get(k) or ""
+        for cand in (key, key.lower(), key.upper()):
+            if cand in row:
+                return row[cand] or ""
+        return ""
+
+    for row in reader:
+        titulo = get(row, "SIGLA OU PALAVRA").strip()
+        if not titulo:
+            continue
+        yield Row(
+            titulo=titulo,
+            slug=slugify(titulo),
+            decod_en=get(row, "DECODIFICAÇÃO EM INGLÊS").strip(),
+            decod_pt=get(row, "DECODIFICAÇÃO EM PORTUGUÊS").strip(),
+            explicacao=get(row, "EXPLICAÇÃO").strip(),
+            links=[normalize_url(u) for u in split_cell(get(row, "LINKS"), split_multi)],
+            videos=[normalize_url(u) for u in split_cell(get(row, "VÍDEOS") or get(row, "VIDEOS"), split_multi)],
+            sinonimos=split_cell(get(row, "SINÔNIMOS") or get(row, "SINONIMOS"), split_sinonimos),
+        )
+
+
+class TermoImporter:
+    """Aplica as linhas do CSV ao banco em blocos; acumula um ``ImportReport``."""
+
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.report = ImportReport()
+        self.seen_slugs: set[str] = set()
+        # gravados em transações já confirmadas, para invalidar só as páginas deles
+        self.alterados: set[str] = set()
+        # slug -> (pk, impressão digital) de todos os termos do banco e dos criados agora
+        self.known = {
+            slug: (pk, content_hash)
+            for slug, pk, content_hash in Termo.objects.values_list("slug", "pk", "content_hash").iterator(
+                chunk_size=5000
+            )
+        }
+
+    def run(self, lines, on_chunk=None) -> ImportReport:
+        from .signals import termos_alterados
+
+        try:
+            for chunk in iter_chunks(parse_rows(lines), self.chunk_size):
+                self.report += self.import_chunk(chunk)
+                if on_chunk:
+                    on_chunk(self.report)
+            self.report.vanished = self.vanished()
+        finally:
+            # escritas em lote não disparam signals
+            if self.report.created or self.report.changed:
+                termos_alterados(self.alterados)
+        return self.report
+
+    def vanished(self) -> int:
+        """Termos do banco que não apareceram no CSV (só contados, nunca apagados)."""
+        return sum(1 for slug in self.known if slug not in self.seen_slugs)
+
+    def skip_chunk(self, chunk: list[Row]) -> None:
+        """Bloco já importado antes (retomada): só registra os slugs vistos."""
+        self.seen_slugs.update(r.slug for r in chunk)
+
+    def import_chunk(self, chunk: list[Row], on_success=None) -> ImportReport:
+        """Importa um bloco numa transação e devolve as contagens dele.
+
+        ``on_success(report)`` roda dentro da mesma transação (ex.: para
+        registrar o progresso junto com os dados). O estado em memória do
+        importador só é atualizado se a transação for confirmada.
+        """
+        report, pending = self._classify(chunk)
+        if not pending and not on_success:
+            self.seen_slugs.update(r.slug for r in chunk)
+            return report
+        with transaction.atomic():
+            changes.lock()
+            applied = self._apply(pending, report)
+            changes.record(pk for pk, _ in applied.values())
+            if on_success:
+                on_success(report)
+        self.known.update(applied)
+        self.alterados.update(applied)
+        self.seen_slugs.update(r.slug for r in chunk)
+        return report
+
+    def _classify(self, chunk: list[Row]) -> tuple[ImportReport, list]:
+        """Separa as linhas cuja impressão digital já bate com a do termo."""
+        report = ImportReport(rows=len(chunk))
+        seen = set()
+        pending = []  # (linha, impressão digital) que precisam ir ao banco
+        for row in chunk:
+            if row.slug in self.seen_slugs or row.slug in seen:
+                report.duplicates += 1
+            seen.add(row.slug)
+            digest = fingerprint(row)
+            known = self.known.get(row.slug)
+            if known and known[1] == digest:
+                report.unchanged += 1  # mesma linha da última importação: nada a fazer
+            else:
+                pending.append((row, digest))
+        return report, pending
+
+    def _apply(self, pending: list, report: ImportReport) -> dict:
+        if not pending:
+            return {}
+        pks = {self.known[row.slug][0] for row, _ in pending if row.slug in self.known}
+        termos = {t.slug: t for t in Termo.objects.filter(pk__in=pks)}
+        to_create: dict[str, Termo] = {}
+        to_update: dict[str, Termo] = {}
+        outcome = []  # por linha pendente: "created", "changed" ou None
+        links, videos, sinonimos = [], [], []
+
+        for i, (row, digest) in enumerate(pending):
+            termo = termos.get(row.slug)
+            if termo is None:
+                termo = Termo(slug=row.slug, **{f: getattr(row, f) for f in TERMO_FIELDS})
+                termos[row.slug] = to_create[row.slug] = termo
+                outcome.append("created")
+            else:
+                changed = False
+                for field in TERMO_FIELDS:
+                    value = getattr(row, field)
+                    if value and getattr(termo, field) != value:
+                        setattr(termo, field, value)
+                        changed = True
+                if changed and termo.pk is not None:
+                    to_update[row.slug] = termo
+                outcome.append("changed" if changed else None)
+            termo.content_hash = digest
+            links.extend((i, url) for url in row.links if url)
+            videos.extend((i, url) for url in row.videos if url)
+            sinonimos.extend((i, nome) for nome in row.sinonimos)
+
+        now = timezone.now()
+        for termo in itertools.chain(to_create.values(), to_update.values()):
+            termo.refresh_derived_fields()
+            termo.updated_at = now
+        if to_create:
+            Termo.objects.bulk_create(to_create.values(), batch_size=self.chunk_size)
+            if any(t.pk is None for t in to_create.values()):
+                # bancos sem RETURNING no bulk_create
+                created_pks = dict(Termo.objects.filter(slug__in=to_create).values_list("slug", "pk"))
+                for slug, termo in to_create.items():
+                    termo.pk = created_pks[slug]
+        if to_update:
+            bulk_update(Termo, to_update.values(), UPDATE_FIELDS + ("content_hash", "updated_at"))
+        # termos sem mudança de texto: só grava a nova impressão digital
+        hash_only = [
+            t for slug, t in termos.items()
+            if slug not in to_create and slug not in to_update and self.known[slug][1] != t.content_hash
+        ]
+        if hash_only:
+            bulk_update(Termo, hash_only, ("content_hash",))
+
+        rows = [row for row, _ in pending]
+        report.links, touched_links = self._add_children(
+            TermoLink, "url", termos, rows, links, lambda pk, url: TermoLink(termo_id=pk, url=url)
+        )
+        report.videos, touched_videos = self._add_children(
+            TermoVideo, "youtube_url", termos, rows, videos, _build_video
+        )
+        report.sinonimos, touched_sinonimos = self._add_children(
+            TermoSinonimo, "nome", termos, rows, sinonimos,
+            lambda pk, nome: TermoSinonimo(termo_id=pk, nome=nome, nome_busca=normalizar_busca(nome)),
+        )
+        touched = touched_links | touched_videos | touched_sinonimos
+        # termos que só ganharam filhos também mudaram (ETag/Last-Modified)
+        only_children = {rows[i].slug for i in touched} - to_create.keys() - to_update.keys()
+        if only_children:
+            Termo.objects.filter(pk__in=[termos[slug].pk for slug in only_children]).update(updated_at=now)
+        for i, result in enumerate(outcome):
+            if result == "created":
+                report.created += 1
+            elif result == "changed" or i in touched:
+                report.changed += 1
+            else:
+                report.unchanged += 1
+        applied = {row.slug: (termos[row.slug].pk, termos[row.slug].content_hash) for row in rows}
+        return applied
+
+    def _add_children(self, model, field: str, termos: dict, rows: list, pairs: list, build) -> tuple[int, set]:
+        """Cria os filhos (links, vídeos, sinônimos) que ainda não existem.
+
+        ``pairs`` são ``(índice da linha, valor)``; devolve quantos foram criados
+        e os índices das linhas que acrescentaram algum.
+        """
+        if not pairs:
+            return 0, set()
+        ids = {termos[rows[i].slug].pk for i, _ in pairs}
+        existing = set(model.objects.filter(termo_id__in=ids).values_list("termo_id", field))
+        new, touched = [], set()
+        for i, value in pairs:
+            key = (termos[rows[i].slug].pk, value)
+            if key in existing:
+                continue
+            obj = build(*key)
+            if obj is None:
+                continue
+            existing.add(key)
+            new.append(obj)
+            touched.add(i)
+        model.objects.bulk_create(new, batch_size=self.chunk_size)
+        return len(new), touched
+
+
+def _build_video(termo_id: int, url: str):
+    # bulk_create não chama TermoVideo.clean(): URLs que não são do YouTube são ignoradas
+    match = YOUTUBE_REGEX.search(url)
+    if not match:
+        return None
+    return TermoVideo(termo_id=termo_id, youtube_url=url, youtube_id=match.group(1))
+
+
+def import_csv(lines, chunk_size: int = DEFAULT_CHUNK_SIZE, on_chunk=None) -> ImportReport:
+    """Importa um CSV a partir de um iterável de linhas (ex.: ``open_text(arquivo)``)."""
+    return TermoImporter(chunk_size=chunk_size).run(lines, on_chunk=on_chunk)
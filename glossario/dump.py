@@ -0,0 +1,68 @@
+"""Dump completo do dicionário em NDJSON (um termo por linha), em streaming.
+
+Os termos são lidos com ``iterator(chunk_size=...)`` (cursor no servidor
+onde o banco oferece) e os filhos pré-carregados bloco a bloco, então a
+memória do processo não cresce com o tamanho do dicionário. Cada linha tem
+o mesmo formato de ``/api/termos/<slug>/``. A compressão gzip, quando o
+cliente aceita, é feita durante o envio.
+"""
+
+import json
+import zlib
+
+from . import conditional, pages
+from .models import Termo
+from .serializers import TermoSerializer
+
+CHUNK_SIZE = 500
+BUFFER_SIZE = 64 * 1024
+
+
+def state() -> tuple:
+    """``(total, último updated_at)``: muda com qualquer criação, edição ou remoção."""
+    return conditional.collection_state(Termo.objects.all())
+
+
+def etag(total, ultimo, encoding: str) -> str:
+    # um ETag forte por codificação: os bytes enviados são outros
+    return conditional.make_etag("dump", total, ultimo and ultimo.isoformat(), encoding)
+
+
+def iter_lines(chunk_size: int = CHUNK_SIZE):
+    """Linhas NDJSON (bytes) de todos os termos, por ordem de id."""
+    chunk = []
+    for termo in pages.termo_queryset().order_by("pk").iterator(chunk_size=chunk_size):
+        chunk.append(termo)
+        if len(chunk) >= chunk_size:
+            yield from _serialize(chunk)
+            chunk = []
+    if chunk:
+        yield from _serialize(chunk)
+
+
+def _serialize(termos):
+    for data in TermoSerializer(termos, many=True).data:
+        yield json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def buffered(lines, size: int = BUFFER_SIZE):
+    """Junta as linhas em pedaços de ~``size`` bytes (menos escritas no socket)."""
+    buf = []
+    total = 0
+    for line in lines:
+        buf.append(line)
+        total += len(line)
+        if total >= size:
+            yield b"".join(buf)
+            buf, total = [], 0
+    if buf:
+        yield b"".join(buf)
+
+
+def gzip_stream(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # cabeçalho gzip
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,42 @@
+"""Contagem de termos por letra inicial (A–Z) para a navegação do dicionário."""
+
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import Termo
+from .versioning import bump_version, get_version
+
+ALFABETO = [chr(c) for c in range(ord("A"), ord("Z") + 1)]
+VERSION_KEY = "glossario:letter_facets:version"
+CACHE_TIMEOUT = 60 * 60
+
+
+def invalidate():
+    bump_version(VERSION_KEY)
+
+
+def letter_counts(termos=None, busca: str = "") -> dict[str, int]:
+    """Devolve ``{letra: total}`` usando uma única consulta agrupada por ``inicial``.
+
+    ``termos`` é o queryset já filtrado pela busca ativa; ``busca`` entra na
+    chave do cache para que cada consulta tenha sua própria contagem.
+    """
+    busca = (busca or "").strip().lower()
+    digest = hashlib.md5(busca.encode("utf-8")).hexdigest()
+    key = f"glossario:letter_facets:{get_version(VERSION_KEY)}:{digest}"
+    counts = cache.get(key)
+    if counts is not None:
+        return counts
+
+    qs = Termo.objects.all()
+    if termos is not None and busca:
+        qs = qs.filter(pk__in=termos.values("pk"))
+    rows = qs.order_by().values("inicial").annotate(total=Count("pk"))
+    counts = dict.fromkeys(ALFABETO, 0)
+    for row in rows:
+        if row["inicial"] in counts:
+            counts[row["inicial"]] = row["total"]
+    cache.set(key, counts, CACHE_TIMEOUT)
+    return counts
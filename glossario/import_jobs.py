@@ -0,0 +1,213 @@
+"""Importações de CSV como jobs persistidos.
+
+O admin só grava o arquivo e um ``CSVImportJob``; o comando
+``process_import_jobs`` reivindica o job e importa bloco a bloco com
+``glossario.csv_import``. Cada bloco é confirmado junto com o seu registro em
+``CSVImportChunk`` e com o relatório acumulado do job, de modo que:
+
+- a página de progresso vê as contagens avançarem a cada bloco;
+- um bloco que falha não interrompe os demais;
+- reprocessar o job (``retry``) pula os blocos já importados e tenta de novo
+  só os que falharam.
+
+O CSV fica num storage fora de ``MEDIA_ROOT`` (``GLOSSARIO_IMPORT_ROOT``) e é
+apagado quando a importação termina sem erros (ou quando o job é apagado).
+"""
+
+import logging
+import traceback
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import csv_import
+from .models import CSVImportChunk, CSVImportJob
+
+logger = logging.getLogger(__name__)
+
+# job "running" há mais tempo que isso sem progresso é considerado abandonado
+STALE_AFTER = timedelta(minutes=10)
+FINISHED = ("done", "failed")
+
+
+def _error_message(error: BaseException) -> str:
+    return "".join(traceback.format_exception_only(type(error), error)).strip()
+
+
+def claim_job():
+    """Reivindica o próximo job pronto (UPDATE condicional, seguro entre workers)."""
+    now = timezone.now()
+    ready = Q(status="pending") | Q(status="running", updated_at__lt=now - STALE_AFTER)
+    for pk, status in CSVImportJob.objects.filter(ready).order_by("created_at", "pk").values_list("pk", "status")[:10]:
+        claimed = CSVImportJob.objects.filter(pk=pk, status=status).filter(ready).update(
+            status="running", locked_at=now, updated_at=now
+        )
+        if claimed:
+            return CSVImportJob.objects.get(pk=pk)
+    return None
+
+
+def _rows(job):
+    return csv_import.parse_rows(csv_import.open_text(job.arquivo.open("rb")))
+
+
+class LeaseLost(Exception):
+    """O job foi dado como abandonado e reivindicado por outro worker."""
+
+
+def _touch(job, **values) -> None:
+    """Grava ``values`` no job e renova a reserva, se ela ainda for deste worker."""
+    updated = CSVImportJob.objects.filter(pk=job.pk, status="running", locked_at=job.locked_at).update(
+        updated_at=timezone.now(), **values
+    )
+    if not updated:
+        raise LeaseLost(f"A importação {job.pk} foi reivindicada por outro worker.")
+
+
+def run_job(job) -> None:
+    """Importa (ou retoma) um job já reivindicado.
+
+    Cada bloco confere a reserva (``locked_at``) dentro da própria transação:
+    se o job passou do ``STALE_AFTER`` e outro worker o reivindicou, o bloco
+    é desfeito e este worker para, sem importar nada em dobro.
+    """
+    from .signals import termos_alterados
+
+    total = csv_import.ImportReport.from_dict(job.report)
+    done = set(job.chunks.filter(status="done").values_list("index", flat=True))
+    importer = csv_import.TermoImporter(chunk_size=job.chunk_size)
+    imported = False
+    try:
+        if job.total_rows is None:
+            try:
+                job.total_rows = sum(1 for _ in _rows(job))
+            finally:
+                job.arquivo.close()
+            _touch(job, total_rows=job.total_rows)
+
+        start_row = 1
+        try:
+            for index, chunk in enumerate(csv_import.iter_chunks(_rows(job), job.chunk_size)):
+                first, start_row = start_row, start_row + len(chunk)
+                if index in done:
+                    importer.skip_chunk(chunk)
+                    continue
+
+                def record(report, index=index, first=first, rows=len(chunk)):
+                    _touch(job, report=(total + report).as_dict())
+                    _save_chunk(job, index, first, rows, status="done", report=report.as_dict(), error="")
+
+                try:
+                    total += importer.import_chunk(chunk, on_success=record)
+                    imported = True
+                except LeaseLost:
+                    raise
+                except Exception as exc:
+                    logger.exception("Importação %s: bloco %s falhou", job.pk, index)
+                    with transaction.atomic():
+                        _touch(job)
+                        _save_chunk(job, index, first, len(chunk), status="failed", report={}, error=_error_message(exc))
+        finally:
+            job.arquivo.close()
+        total.vanished = importer.vanished()
+        _touch(job, report=total.as_dict())
+    except LeaseLost:
+        logger.warning("Importação %s: reserva perdida, o job segue em outro worker", job.pk)
+    except Exception as exc:
+        # arquivo ilegível, cabeçalho ausente etc.: o job inteiro falha
+        logger.exception("Importação %s falhou", job.pk)
+        message = str(exc) if isinstance(exc, csv_import.CSVHeaderNotFound) else _error_message(exc)
+        _finish(job, last_error=message)
+    else:
+        _finish(job)
+    finally:
+        # as escritas em lote não disparam signals
+        if imported:
+            termos_alterados(importer.alterados)
+
+
+def _save_chunk(job, index, start_row, rows, **values) -> None:
+    chunk, created = CSVImportChunk.objects.get_or_create(
+        job=job, index=index, defaults={"start_row": start_row, "rows": rows, **values, "attempts": 1}
+    )
+    if not created:
+        for field, value in values.items():
+            setattr(chunk, field, value)
+        chunk.attempts += 1
+        chunk.save()
+
+
+def _finish(job, last_error: str = "") -> None:
+    failed = job.chunks.filter(status="failed").count()
+    status = "failed" if failed or last_error else "done"
+    finished = CSVImportJob.objects.filter(pk=job.pk, locked_at=job.locked_at).update(
+        status=status,
+        failed_chunks=failed,
+        last_error=last_error,
+        locked_at=None,
+        finished_at=timezone.now(),
+        updated_at=timezone.now(),
+    )
+    if finished and status == "done":
+        # o CSV só é guardado enquanto há blocos a reprocessar
+        job.arquivo.storage.delete(job.arquivo.name)
+
+
+def retry(job) -> bool:
+    """Recoloca na fila um job concluído com erros; só os blocos que falharam rodam de novo."""
+    return bool(
+        CSVImportJob.objects.filter(pk=job.pk, status="failed").update(
+            status="pending", last_error="", finished_at=None, updated_at=timezone.now()
+        )
+    )
+
+
+def run_pending(limit: int | None = None) -> int:
+    """Processa jobs até a fila esvaziar (ou ``limit``); devolve quantos rodaram."""
+    count = 0
+    while limit is None or count < limit:
+        job = claim_job()
+        if job is None:
+            break
+        run_job(job)
+        count += 1
+    return count
+
+
+def status(job_id: int) -> dict | None:
+    """Resumo do job para a página de progresso (2 consultas)."""
+    job = (
+        CSVImportJob.objects.filter(pk=job_id)
+        .values("status", "total_rows", "report", "failed_chunks", "last_error")
+        .first()
+    )
+    if job is None:
+        return None
+    failed = list(
+        CSVImportChunk.objects.filter(job_id=job_id, status="failed")
+        .order_by("index")
+        .values("index", "start_row", "rows", "error")
+    )
+    report = csv_import.ImportReport.from_dict(job["report"])
+    return {
+        "status": job["status"],
+        "status_display": dict(CSVImportJob.STATUS_CHOICES)[job["status"]],
+        "finished": job["status"] in FINISHED,
+        "total_rows": job["total_rows"],
+        "rows_done": report.rows,
+        "failed_rows": sum(c["rows"] for c in failed),
+        "created": report.created,
+        "changed": report.changed,
+        "unchanged": report.unchanged,
+        "vanished": report.vanished,
+        "links": report.links,
+        "videos": report.videos,
+        "sinonimos": report.sinonimos,
+        "duplicates": report.duplicates,
+        "errors": len(failed),
+        "failed_chunks": failed,
+        "last_error": job["last_error"],
+        "message": str(report) if job["status"] in FINISHED else "",
+    }
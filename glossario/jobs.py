@@ -0,0 +1,169 @@
+"""Fila (em banco) para geração das variantes de imagem.
+
+O request só grava um ``ImageVariantJob``; o comando ``process_image_jobs``
+reivindica os jobs pendentes, gera as variantes num pool de processos e
+registra sucesso, nova tentativa (com backoff) ou falha definitiva.
+"""
+
+import logging
+import multiprocessing
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .variants import ImageTooLarge
+
+# Os models são importados dentro das funções: este módulo também é carregado
+# pelos processos filhos do pool antes de django.setup().
+
+logger = logging.getLogger(__name__)
+
+MODELS = {
+    "termo": "TermoImage",
+    "suggestion": "SuggestionImage",
+}
+# job "running" há mais tempo que isso é considerado abandonado (worker caiu)
+STALE_AFTER = timedelta(minutes=10)
+RETRY_BASE_SECONDS = 30
+
+
+class VariantSourceMissing(Exception):
+    """A imagem do job não existe mais; não adianta tentar de novo."""
+
+
+def enqueue_variants(image):
+    from .models import ImageVariantJob
+
+    kind = image.VARIANT_JOB_KIND
+    pending = ImageVariantJob.objects.filter(kind=kind, object_id=image.pk, status="pending")
+    if pending.exists():
+        return None
+    return ImageVariantJob.objects.create(kind=kind, object_id=image.pk)
+
+
+def enqueue_missing() -> int:
+    """Enfileira as imagens que ainda não têm manifesto de variantes."""
+    from django.apps import apps
+
+    total = 0
+    for name in MODELS.values():
+        model = apps.get_model("glossario", name)
+        for image in model.objects.filter(variants=[]).exclude(imagem="").only("pk").iterator():
+            if enqueue_variants(image):
+                total += 1
+    return total
+
+
+def claim_jobs(limit: int) -> list:
+    """Reivindica até ``limit`` jobs prontos para execução.
+
+    A reivindicação é um UPDATE condicional por job, então dois workers
+    nunca processam o mesmo job (funciona em qualquer banco).
+    """
+    from .models import ImageVariantJob
+
+    now = timezone.now()
+    ready = Q(status="pending", run_after__lte=now) | Q(status="running", locked_at__lt=now - STALE_AFTER)
+    candidates = ImageVariantJob.objects.filter(ready).order_by("run_after", "pk").values_list("pk", "status")
+    claimed = []
+    for pk, status in candidates[: limit * 2]:
+        updated = ImageVariantJob.objects.filter(pk=pk, status=status).filter(ready).update(
+            status="running", locked_at=now, attempts=F("attempts") + 1, updated_at=now
+        )
+        if updated:
+            claimed.append(pk)
+        if len(claimed) >= limit:
+            break
+    return list(ImageVariantJob.objects.filter(pk__in=claimed).order_by("run_after", "pk"))
+
+
+def generate_variants(kind: str, object_id: int) -> None:
+    """Executado no processo filho: gera as variantes de uma imagem."""
+    from django.apps import apps
+
+    model = apps.get_model("glossario", MODELS[kind])
+    image = model.objects.filter(pk=object_id).first()
+    if image is None or not image.imagem:
+        raise VariantSourceMissing(f"{model.__name__} #{object_id} não existe mais.")
+    image._generate_variants()
+
+
+def mark_done(job) -> None:
+    from .models import ImageVariantJob
+
+    ImageVariantJob.objects.filter(pk=job.pk).update(
+        status="done", locked_at=None, last_error="", updated_at=timezone.now()
+    )
+
+
+def mark_failed(job, error: BaseException) -> None:
+    from .models import ImageVariantJob
+
+    now = timezone.now()
+    message = "".join(traceback.format_exception_only(type(error), error)).strip()
+    if isinstance(error, (VariantSourceMissing, ImageTooLarge)) or job.attempts >= job.max_attempts:
+        ImageVariantJob.objects.filter(pk=job.pk).update(
+            status="failed", locked_at=None, last_error=message, updated_at=now
+        )
+        logger.error("Job de variantes %s falhou: %s", job.pk, message)
+        return
+    delay = timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (job.attempts - 1))
+    ImageVariantJob.objects.filter(pk=job.pk).update(
+        status="pending", locked_at=None, last_error=message, run_after=now + delay, updated_at=now
+    )
+
+
+def _init_worker():
+    import django
+
+    django.setup()
+
+
+def make_pool(workers: int) -> ProcessPoolExecutor | None:
+    if workers <= 0:
+        return None
+    # "spawn" evita herdar conexões de banco abertas do processo pai
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    )
+
+
+def run_batch(pool: ProcessPoolExecutor | None, limit: int) -> int:
+    """Processa um lote; devolve quantos jobs foram reivindicados.
+
+    Levanta ``BrokenProcessPool`` (depois de registrar os jobs afetados) se um
+    processo filho morrer, para que o chamador recrie o pool.
+    """
+    jobs = claim_jobs(limit)
+    if pool is None:
+        for job in jobs:
+            try:
+                generate_variants(job.kind, job.object_id)
+            except Exception as exc:
+                mark_failed(job, exc)
+            else:
+                mark_done(job)
+        return len(jobs)
+
+    broken = None
+    futures = {pool.submit(generate_variants, job.kind, job.object_id): job for job in jobs}
+    for future in as_completed(futures):
+        job = futures[future]
+        try:
+            future.result()
+        except BrokenProcessPool as exc:
+            broken = exc
+            mark_failed(job, exc)
+        except Exception as exc:
+            mark_failed(job, exc)
+        else:
+            mark_done(job)
+    if broken is not None:
+        raise broken
+    return len(jobs)
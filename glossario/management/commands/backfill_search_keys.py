@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from glossario.models import Termo, TermoSinonimo, preencher_chaves_busca
+from glossario.signals import termos_alterados
+
+
+class Command(BaseCommand):
+    help = "Recalcula as chaves de busca normalizadas (sem acento/minúsculas) de termos e sinônimos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        termos, sinonimos = preencher_chaves_busca(Termo, TermoSinonimo, batch_size=options["batch_size"])
+        termos_alterados()
+        self.stdout.write(self.style.SUCCESS(f"Chaves atualizadas: {termos} termo(s), {sinonimos} sinônimo(s)."))
@@ -0,0 +1,127 @@
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image
+
+from glossario.variants import VariantSpec, render, supported_formats
+
+
+def _reset_peak_rss() -> None:
+    # Linux: zera o VmHWM; sem isso o pico herdado do processo pai (fork/exec) contamina a medida
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource  # só Unix
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss: KiB no Linux, bytes no macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _legacy(path: str, spec: VariantSpec) -> int:
+    """Implementação anterior: RGB em resolução cheia e cada largura a partir do original."""
+    total = 0
+    with open(path, "rb") as f:
+        img = Image.open(f).convert("RGB")
+        w, h = img.size
+        for target in spec.widths:
+            if w < target and h < target:
+                continue
+            resized = img.resize((target, int(h * target / float(w))), Image.LANCZOS)
+            for fmt in spec.formats:
+                buffer = BytesIO()
+                resized.save(buffer, format=fmt.upper(), quality=spec.quality_for(fmt))
+                total += buffer.tell()
+    return total
+
+
+def _engine(path: str, spec: VariantSpec) -> int:
+    with open(path, "rb") as f:
+        return sum(len(data) for _w, _fmt, data in render(f, spec))
+
+
+def _measure(mode: str, path: str, spec: VariantSpec) -> tuple[float, float, float]:
+    """Roda num processo novo: (segundos, pico de RSS em MB, RSS base em MB)."""
+    _reset_peak_rss()
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    (_legacy if mode == "legacy" else _engine)(path, spec)
+    return time.perf_counter() - start, _peak_rss_mb(), baseline
+
+
+def _synthetic_jpeg(path: str, megapixels: float) -> None:
+    width = int((megapixels * 1_000_000 * 4 / 3) ** 0.5)
+    height = width * 3 // 4
+    gradient = Image.linear_gradient("L")
+    img = Image.merge(
+        "RGB",
+        (
+            gradient.resize((width, height)),
+            gradient.rotate(90).resize((width, height)),
+            Image.effect_noise((width, height), 64),
+        ),
+    )
+    img.save(path, format="JPEG", quality=90)
+
+
+class Command(BaseCommand):
+    help = "Mede tempo por megapixel e pico de RSS da geração de variantes (atual x implementação anterior)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("imagens", nargs="*", help="Arquivos de imagem (padrão: JPEGs sintéticos).")
+        parser.add_argument("--megapixels", type=float, nargs="+", default=[4, 12, 24],
+                            help="Tamanhos dos JPEGs sintéticos.")
+        parser.add_argument("--formats", nargs="+", default=["webp"], help="Formatos de saída (webp, avif).")
+        parser.add_argument("--widths", type=int, nargs="+", default=[320, 640, 1280])
+        parser.add_argument("--repeat", type=int, default=3, help="Execuções por caso (vale a mediana).")
+        parser.add_argument("--no-legacy", action="store_true", help="Não mede a implementação anterior.")
+
+    def handle(self, *args, **options):
+        formats = supported_formats(options["formats"])
+        if not formats:
+            raise CommandError("Nenhum dos formatos pedidos é suportado por este Pillow.")
+        spec = VariantSpec(widths=tuple(options["widths"]), formats=formats)
+        modes = ["engine"] if options["no_legacy"] else ["legacy", "engine"]
+        # cada medição num processo novo: o pico de RSS é do processo inteiro
+        ctx = multiprocessing.get_context("spawn")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = list(options["imagens"])
+            if not paths:
+                for mp in options["megapixels"]:
+                    path = os.path.join(tmp, f"sintetica_{mp:g}mp.jpg")
+                    _synthetic_jpeg(path, mp)
+                    paths.append(path)
+
+            self.stdout.write(f"{'imagem':<28} {'modo':<7} {'MP':>6} {'s':>7} {'s/MP':>7} {'pico MB':>8} {'+MB':>7}")
+            for path in paths:
+                with Image.open(path) as img:
+                    megapixels = img.size[0] * img.size[1] / 1_000_000
+                for mode in modes:
+                    runs = []
+                    for _ in range(options["repeat"]):
+                        with ctx.Pool(1) as pool:
+                            runs.append(pool.apply(_measure, (mode, path, spec)))
+                    runs.sort()
+                    seconds, peak, baseline = runs[len(runs) // 2]
+                    self.stdout.write(
+                        f"{os.path.basename(path)[:28]:<28} {mode:<7} {megapixels:>6.1f} {seconds:>7.3f} "
+                        f"{seconds / megapixels:>7.3f} {peak:>8.1f} {peak - baseline:>7.1f}"
+                    )
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from glossario import related
+
+
+class Command(BaseCommand):
+    help = (
+        "Calcula os termos relacionados (TF-IDF) dos termos alterados desde a última execução. "
+        "As mudanças do dia a dia já enfileiram o recálculo (process_rebuild_jobs)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Recalcula todos os termos (não só os alterados).")
+        parser.add_argument("--top", type=int, default=related.TOP, help="Vizinhos guardados por termo.")
+        parser.add_argument("--block-size", type=int, default=related.BLOCK_SIZE, help="Termos por bloco de cálculo.")
+
+    def handle(self, *args, **options):
+        inicio = time.monotonic()
+        termos, vizinhos = related.build(full=options["full"], top=options["top"], block_size=options["block_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{termos} termo(s) recalculado(s), {vizinhos} vizinho(s) em {time.monotonic() - inicio:.1f}s."
+            )
+        )
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from glossario import client_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera o índice de busca do autocomplete para o navegador. "
+        "As mudanças nos termos já enfileiram a geração (process_rebuild_jobs)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Gera mesmo sem mudanças desde o último índice.")
+
+    def handle(self, *args, **options):
+        manifest = client_index.build(force=options["force"])
+        if manifest:
+            self.stdout.write(self.style.SUCCESS(f"Índice publicado: {manifest['url']} ({manifest['bytes']} bytes)."))
+        else:
+            self.stdout.write("Índice já atualizado.")
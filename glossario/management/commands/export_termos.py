@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from glossario import csv_export
+from glossario.models import Termo
+
+
+class Command(BaseCommand):
+    help = "Exporta todos os termos (com sinônimos, links e vídeos) em CSV compatível com o import_termos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("-o", "--output", help="Arquivo de saída (padrão: stdout).")
+        parser.add_argument("--chunk-size", type=int, default=csv_export.DEFAULT_CHUNK_SIZE,
+                            help="Termos lidos por consulta.")
+
+    def handle(self, *args, **options):
+        queryset = Termo.objects.order_by("titulo", "pk")
+        if not options["output"]:
+            csv_export.write_csv(self.stdout, queryset, options["chunk_size"])
+            return
+        with open(options["output"], "w", encoding="utf-8", newline="") as f:
+            total = csv_export.write_csv(f, queryset, options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"{total} termo(s) exportado(s) para {options['output']}."))
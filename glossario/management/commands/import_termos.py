@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from glossario import csv_import
+
+
+class Command(BaseCommand):
+    help = "Importa termos de um CSV (mesmo formato da importação do admin), em lotes e sem carregar o arquivo inteiro."
+
+    def add_arguments(self, parser):
+        parser.add_argument("arquivo", help="Caminho do CSV.")
+        parser.add_argument("--chunk-size", type=int, default=csv_import.DEFAULT_CHUNK_SIZE,
+                            help="Linhas por transação.")
+
+    def handle(self, *args, **options):
+        def progresso(report):
+            self.stdout.write(f"  {report.rows} linha(s) processada(s)...")
+
+        try:
+            with open(options["arquivo"], "rb") as f:
+                report = csv_import.import_csv(
+                    csv_import.open_text(f), chunk_size=options["chunk_size"], on_chunk=progresso
+                )
+        except OSError as exc:
+            raise CommandError(f"Não foi possível abrir o arquivo: {exc}")
+        except csv_import.CSVHeaderNotFound as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(str(report)))
@@ -0,0 +1,49 @@
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand
+
+from glossario import jobs
+
+
+class Command(BaseCommand):
+    help = "Processa a fila de geração de variantes de imagem (WebP) em um pool de processos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2, help="Processos no pool (0 = no próprio processo).")
+        parser.add_argument("--batch", type=int, default=20, help="Jobs reivindicados por rodada.")
+        parser.add_argument("--sleep", type=float, default=5.0, help="Espera (s) quando a fila está vazia.")
+        parser.add_argument("--once", action="store_true", help="Esvazia a fila e sai.")
+        parser.add_argument(
+            "--enqueue-missing",
+            action="store_true",
+            help="Antes de começar, enfileira as imagens sem manifesto de variantes.",
+        )
+
+    def handle(self, *args, **options):
+        if options["enqueue_missing"]:
+            queued = jobs.enqueue_missing()
+            self.stdout.write(f"{queued} imagem(ns) enfileirada(s) para gerar o manifesto.")
+        pool = jobs.make_pool(options["workers"])
+        total = 0
+        try:
+            while True:
+                try:
+                    processed = jobs.run_batch(pool, options["batch"])
+                except BrokenProcessPool:
+                    self.stderr.write("Um processo do pool morreu; recriando o pool.")
+                    pool.shutdown(wait=False)
+                    pool = jobs.make_pool(options["workers"])
+                    continue
+                total += processed
+                if processed:
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["sleep"])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+        self.stdout.write(self.style.SUCCESS(f"{total} job(s) processado(s)."))
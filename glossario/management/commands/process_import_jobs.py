@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from glossario import import_jobs
+
+
+class Command(BaseCommand):
+    help = "Processa a fila de importações de CSV enviadas pelo admin."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sleep", type=float, default=5.0, help="Espera (s) quando a fila está vazia.")
+        parser.add_argument("--once", action="store_true", help="Esvazia a fila e sai.")
+
+    def handle(self, *args, **options):
+        total = 0
+        try:
+            while True:
+                processed = import_jobs.run_pending()
+                total += processed
+                if options["once"]:
+                    break
+                if not processed:
+                    time.sleep(options["sleep"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"{total} importação(ões) processada(s)."))
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from glossario import rebuilds
+
+
+class Command(BaseCommand):
+    help = "Processa a fila de recálculos pedidos pelas mudanças nos termos (ex.: relacionados)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sleep", type=float, default=5.0, help="Espera (s) quando a fila está vazia.")
+        parser.add_argument("--once", action="store_true", help="Esvazia a fila e sai.")
+
+    def handle(self, *args, **options):
+        total = 0
+        try:
+            while True:
+                processed = rebuilds.run_pending()
+                total += processed
+                if processed:
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["sleep"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"{total} job(s) processado(s)."))
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:39
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def letra_inicial(texto):
+    """Cópia de ``glossario.models.letra_inicial`` nesta versão do esquema."""
+    base = unicodedata.normalize("NFKD", texto or "")
+    base = "".join(c for c in base if not unicodedata.combining(c))
+    return " ".join(base.casefold().split())[:1].upper()
+
+
+def preencher_inicial(apps, schema_editor):
+    Termo = apps.get_model("glossario", "Termo")
+    batch = []
+    for termo in Termo.objects.only("pk", "titulo").iterator(chunk_size=2000):
+        termo.inicial = letra_inicial(termo.titulo)
+        batch.append(termo)
+        if len(batch) >= 2000:
+            Termo.objects.bulk_update(batch, ["inicial"])
+            batch = []
+    if batch:
+        Termo.objects.bulk_update(batch, ["inicial"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('glossario', '0014_sitesetting_faq_html_sitesetting_faq_title_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='termo',
+            name='inicial',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=1, verbose_name='Letra inicial'),
+        ),
+        migrations.RunPython(preencher_inicial, reverse_code=migrations.RunPython.noop),
+    ]
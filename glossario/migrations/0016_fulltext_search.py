@@ -0,0 +1,85 @@
+from django.db import migrations
+
+# Esquema de busca desta versão (sem a dobra de acentos, que veio na 0017).
+# Fica copiado aqui para a migration não depender de glossario.search.
+PG_INSTALL = [
+    "ALTER TABLE glossario_termo ADD COLUMN IF NOT EXISTS search_vector tsvector;",
+    "CREATE INDEX IF NOT EXISTS glossario_termo_search_vector ON glossario_termo USING gin (search_vector);",
+    """
+    CREATE OR REPLACE FUNCTION glossario_termo_search_vector() RETURNS trigger AS $$
+    BEGIN
+      NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.titulo, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(
+          (SELECT string_agg(nome, ' ') FROM glossario_termosinonimo WHERE termo_id = NEW.id), '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.decod_en, '') || ' ' || coalesce(NEW.decod_pt, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(NEW.explicacao, '')), 'C');
+      RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION glossario_sinonimo_touch_termo() RETURNS trigger AS $$
+    BEGIN
+      IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE glossario_termo SET titulo = titulo WHERE id = OLD.termo_id;
+      END IF;
+      IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE glossario_termo SET titulo = titulo WHERE id = NEW.termo_id;
+      END IF;
+      RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql;
+    """,
+    "DROP TRIGGER IF EXISTS glossario_termo_search_vector_trg ON glossario_termo;",
+    """
+    CREATE TRIGGER glossario_termo_search_vector_trg
+      BEFORE INSERT OR UPDATE OF titulo, decod_en, decod_pt, explicacao ON glossario_termo
+      FOR EACH ROW EXECUTE FUNCTION glossario_termo_search_vector();
+    """,
+    "DROP TRIGGER IF EXISTS glossario_sinonimo_search_vector_trg ON glossario_termosinonimo;",
+    """
+    CREATE TRIGGER glossario_sinonimo_search_vector_trg
+      AFTER INSERT OR UPDATE OR DELETE ON glossario_termosinonimo
+      FOR EACH ROW EXECUTE FUNCTION glossario_sinonimo_touch_termo();
+    """,
+    # preenche o vetor das linhas existentes (dispara o trigger)
+    "UPDATE glossario_termo SET titulo = titulo;",
+]
+
+PG_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS glossario_sinonimo_search_vector_trg ON glossario_termosinonimo;",
+    "DROP TRIGGER IF EXISTS glossario_termo_search_vector_trg ON glossario_termo;",
+    "DROP FUNCTION IF EXISTS glossario_sinonimo_touch_termo();",
+    "DROP FUNCTION IF EXISTS glossario_termo_search_vector();",
+    "DROP INDEX IF EXISTS glossario_termo_search_vector;",
+    "ALTER TABLE glossario_termo DROP COLUMN IF EXISTS search_vector;",
+]
+
+
+def _run(schema_editor, statements):
+    # No SQLite a tabela FTS5 e os triggers ficam a cargo do pre/post_migrate
+    # (ver glossario.search), pois migrations posteriores recriam tabelas.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def create_search_schema(apps, schema_editor):
+    _run(schema_editor, PG_INSTALL)
+
+
+def drop_search_schema(apps, schema_editor):
+    _run(schema_editor, PG_UNINSTALL)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("glossario", "0015_termo_inicial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_schema, reverse_code=drop_search_schema),
+    ]
@@ -0,0 +1,137 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:43
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+# Cópias de glossario.models (normalizar_busca, letra_inicial) nesta versão do esquema.
+def normalizar_busca(texto):
+    base = unicodedata.normalize("NFKD", texto or "")
+    base = "".join(c for c in base if not unicodedata.combining(c))
+    return " ".join(base.casefold().split())
+
+
+def letra_inicial(texto):
+    return normalizar_busca(texto)[:1].upper()
+
+
+def _em_lotes(model, sources, targets, preencher, batch_size=2000):
+    batch = []
+    for obj in model.objects.only("pk", *sources).iterator(chunk_size=batch_size):
+        preencher(obj)
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            model.objects.bulk_update(batch, targets)
+            batch = []
+    if batch:
+        model.objects.bulk_update(batch, targets)
+
+
+def preencher_termo(obj):
+    obj.inicial = letra_inicial(obj.titulo)
+    obj.titulo_busca = normalizar_busca(obj.titulo)
+    obj.decod_en_busca = normalizar_busca(obj.decod_en)
+    obj.decod_pt_busca = normalizar_busca(obj.decod_pt)
+
+
+def preencher_sinonimo(obj):
+    obj.nome_busca = normalizar_busca(obj.nome)
+
+
+def preencher(apps, schema_editor):
+    _em_lotes(
+        apps.get_model("glossario", "Termo"),
+        ("titulo", "decod_en", "decod_pt"),
+        ("inicial", "titulo_busca", "decod_en_busca", "decod_pt_busca"),
+        preencher_termo,
+    )
+    _em_lotes(apps.get_model("glossario", "TermoSinonimo"), ("nome",), ("nome_busca",), preencher_sinonimo)
+
+
+# o tsvector passa a ser gerado sem acentos (a mesma dobra de normalizar_busca)
+PG_FOLD = [
+    """
+    CREATE OR REPLACE FUNCTION glossario_fold(texto text) RETURNS text AS $$
+      SELECT translate(lower(coalesce(texto, '')),
+        'áàâãäåéèêëíìîïóòôõöúùûüçñý', 'aaaaaaeeeeiiiiooooouuuucny');
+    $$ LANGUAGE sql IMMUTABLE;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION glossario_termo_search_vector() RETURNS trigger AS $$
+    BEGIN
+      NEW.search_vector :=
+        setweight(to_tsvector('simple', glossario_fold(NEW.titulo)), 'A') ||
+        setweight(to_tsvector('simple', glossario_fold(
+          (SELECT string_agg(nome, ' ') FROM glossario_termosinonimo WHERE termo_id = NEW.id))), 'A') ||
+        setweight(to_tsvector('simple', glossario_fold(NEW.decod_en || ' ' || NEW.decod_pt)), 'B') ||
+        setweight(to_tsvector('simple', glossario_fold(NEW.explicacao)), 'C');
+      RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    """,
+    "UPDATE glossario_termo SET titulo = titulo;",
+]
+
+# volta ao vetor da 0016
+PG_UNFOLD = [
+    """
+    CREATE OR REPLACE FUNCTION glossario_termo_search_vector() RETURNS trigger AS $$
+    BEGIN
+      NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.titulo, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(
+          (SELECT string_agg(nome, ' ') FROM glossario_termosinonimo WHERE termo_id = NEW.id), '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.decod_en, '') || ' ' || coalesce(NEW.decod_pt, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(NEW.explicacao, '')), 'C');
+      RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    """,
+    "DROP FUNCTION IF EXISTS glossario_fold(text);",
+    "UPDATE glossario_termo SET titulo = titulo;",
+]
+
+
+def _run_pg(statements):
+    def run(apps, schema_editor):
+        # no SQLite o índice FTS5 já remove acentos (ver glossario.search)
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        with schema_editor.connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('glossario', '0016_fulltext_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='termo',
+            name='decod_en_busca',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='termo',
+            name='decod_pt_busca',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='termo',
+            name='titulo_busca',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='termosinonimo',
+            name='nome_busca',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255),
+        ),
+        migrations.RunPython(preencher, reverse_code=migrations.RunPython.noop),
+        migrations.RunPython(_run_pg(PG_FOLD), reverse_code=_run_pg(PG_UNFOLD)),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:46
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('glossario', '0017_search_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageVariantJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('termo', 'Imagem de termo'), ('suggestion', 'Imagem de sugestão')], max_length=20, verbose_name='Tipo')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='ID da imagem')),
+                ('status', models.CharField(choices=[('pending', 'Pendente'), ('running', 'Processando'), ('done', 'Concluído'), ('failed', 'Falhou')], default='pending', max_length=16, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Tentativas')),
+                ('max_attempts', models.PositiveIntegerField(default=3, verbose_name='Máx. tentativas')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Executar a partir de')),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, verbose_name='Último erro')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Job de variantes de imagem',
+                'verbose_name_plural': 'Jobs de variantes de imagem',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='glossario_imgjob_queue_idx')],
+            },
+        ),
+    ]
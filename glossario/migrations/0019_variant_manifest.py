@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('glossario', '0018_imagevariantjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='suggestionimage',
+            name='variants',
+            field=models.JSONField(blank=True, default=list, editable=False, verbose_name='Variantes geradas'),
+        ),
+        migrations.AddField(
+            model_name='termoimage',
+            name='variants',
+            field=models.JSONField(blank=True, default=list, editable=False, verbose_name='Variantes geradas'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('glossario', '0019_variant_manifest'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CSVImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('arquivo', models.FileField(upload_to='importacoes/%Y/%m/', verbose_name='Arquivo CSV')),
+                ('status', models.CharField(choices=[('pending', 'Na fila'), ('running', 'Importando'), ('done', 'Concluída'), ('failed', 'Concluída com erros')], default='pending', max_length=16, verbose_name='Status')),
+                ('chunk_size', models.PositiveIntegerField(default=500, verbose_name='Linhas por bloco')),
+                ('total_rows', models.PositiveIntegerField(blank=True, null=True, verbose_name='Total de linhas')),
+                ('report', models.JSONField(blank=True, default=dict, verbose_name='Relatório')),
+                ('failed_chunks', models.PositiveIntegerField(default=0, verbose_name='Blocos com erro')),
+                ('last_error', models.TextField(blank=True, verbose_name='Último erro')),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Enviado por')),
+            ],
+            options={
+                'verbose_name': 'Importação de CSV',
+                'verbose_name_plural': 'Importações de CSV',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CSVImportChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.PositiveIntegerField(verbose_name='Bloco')),
+                ('start_row', models.PositiveIntegerField(verbose_name='Primeira linha')),
+                ('rows', models.PositiveIntegerField(verbose_name='Linhas')),
+                ('status', models.CharField(choices=[('done', 'Importado'), ('failed', 'Falhou')], max_length=16, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Tentativas')),
+                ('report', models.JSONField(blank=True, default=dict, verbose_name='Relatório')),
+                ('error', models.TextField(blank=True, verbose_name='Erro')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='glossario.csvimportjob')),
+            ],
+            options={
+                'verbose_name': 'Bloco de importação',
+                'verbose_name_plural': 'Blocos de importação',
+                'ordering': ['job', 'index'],
+                'constraints': [models.UniqueConstraint(fields=('job', 'index'), name='uniq_csv_import_chunk')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('glossario', '0020_csvimportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='termo',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=40),
+        ),
+    ]
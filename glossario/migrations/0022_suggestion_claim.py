@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('glossario', '0021_termo_content_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='suggestion',
+            name='claimed_by',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sugestoes_reservadas', to=settings.AUTH_USER_MODEL, verbose_name='Em moderação por'),
+        ),
+        migrations.AddField(
+            model_name='suggestion',
+            name='claimed_until',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Reservada até'),
+        ),
+        migrations.AddIndex(
+            model_name='suggestion',
+            index=models.Index(fields=['status', 'created_at'], name='suggestion_fila_idx'),
+        ),
+    ]
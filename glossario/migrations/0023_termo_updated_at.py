@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:11
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('glossario', '0022_suggestion_claim'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='termo',
+            name='updated_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, editable=False, verbose_name='Atualizado em'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('glossario', '0023_termo_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='termo',
+            name='relacionados_em',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='TermoRelacionado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('posicao', models.PositiveSmallIntegerField(verbose_name='Posição')),
+                ('score', models.FloatField(verbose_name='Similaridade')),
+                ('relacionado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='glossario.termo', verbose_name='Relacionado')),
+                ('termo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vizinhos', to='glossario.termo', verbose_name='Termo')),
+            ],
+            options={
+                'verbose_name': 'Termo relacionado',
+                'verbose_name_plural': 'Termos relacionados',
+                'ordering': ['termo', 'posicao'],
+                'constraints': [models.UniqueConstraint(fields=('termo', 'posicao'), name='uniq_termo_relacionado_posicao')],
+            },
+        ),
+    ]
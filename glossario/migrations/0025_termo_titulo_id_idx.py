@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('glossario', '0024_termo_relacionado'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='termo',
+            index=models.Index(fields=['titulo', 'id'], name='termo_titulo_id_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:21
+
+from django.db import migrations, models
+
+
+def registrar_existentes(apps, schema_editor):
+    """Uma mudança por termo existente: ``since=0`` devolve o dicionário inteiro."""
+    Termo = apps.get_model("glossario", "Termo")
+    TermoChange = apps.get_model("glossario", "TermoChange")
+    TermoChangeSeq = apps.get_model("glossario", "TermoChangeSeq")
+    seq = 0
+    batch = []
+    for pk, slug in Termo.objects.order_by("pk").values_list("pk", "slug").iterator(chunk_size=2000):
+        seq += 1
+        batch.append(TermoChange(termo_pk=pk, seq=seq, slug=slug))
+        if len(batch) >= 2000:
+            TermoChange.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        TermoChange.objects.bulk_create(batch)
+    TermoChangeSeq.objects.create(pk=1, last=seq)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('glossario', '0025_termo_titulo_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TermoChange',
+            fields=[
+                ('termo_pk', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='Termo')),
+                ('seq', models.BigIntegerField(unique=True)),
+                ('slug', models.SlugField(db_index=False)),
+                ('deleted', models.BooleanField(default=False, verbose_name='Removido')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Mudança de termo',
+                'verbose_name_plural': 'Mudanças de termos',
+                'ordering': ['seq'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TermoChangeSeq',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Sequência do feed de mudanças',
+            },
+        ),
+        migrations.RunPython(registrar_existentes, reverse_code=migrations.RunPython.noop),
+    ]
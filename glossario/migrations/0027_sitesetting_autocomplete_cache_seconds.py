@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:43
+
+from django.db import migrations, models
+
+
+def copiar_intervalo(apps, schema_editor):
+    """O intervalo em ms já era usado como max-age (em segundos, no mínimo 1)."""
+    SiteSetting = apps.get_model("glossario", "SiteSetting")
+    for setting in SiteSetting.objects.all():
+        setting.autocomplete_cache_seconds = max(1, (setting.autocomplete_throttle_ms or 1000) // 1000)
+        setting.save(update_fields=["autocomplete_cache_seconds"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('glossario', '0026_termo_change'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sitesetting',
+            name='autocomplete_cache_seconds',
+            field=models.PositiveIntegerField(default=1, help_text='Max-age das respostas de /api/autocomplete/ (navegador e CDN).'),
+        ),
+        migrations.RunPython(copiar_intervalo, reverse_code=migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='sitesetting',
+            name='autocomplete_throttle_ms',
+        ),
+    ]
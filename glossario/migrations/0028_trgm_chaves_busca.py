@@ -0,0 +1,51 @@
+from django.db import migrations
+
+# A busca por substring (glossario.search.contem) compara as chaves
+# normalizadas; os índices da 0009, nas colunas cruas, não eram usados.
+INDEXES = [
+    ("glossario_termo_trgm_titulo_busca", "glossario_termo", "titulo_busca"),
+    ("glossario_sinonimo_trgm_nome_busca", "glossario_termosinonimo", "nome_busca"),
+]
+OLD_INDEXES = [
+    ("glossario_termo_trgm_titulo", "glossario_termo", "titulo"),
+    ("glossario_termo_trgm_en", "glossario_termo", "decod_en"),
+    ("glossario_termo_trgm_pt", "glossario_termo", "decod_pt"),
+    ("glossario_sinonimo_trgm", "glossario_termosinonimo", "nome"),
+]
+
+
+def _create(cursor, indexes):
+    for name, table, column in indexes:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops);")
+
+
+def _drop(cursor, indexes):
+    for name, _, _ in indexes:
+        cursor.execute(f"DROP INDEX IF EXISTS {name};")
+
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+        _create(cursor, INDEXES)
+        _drop(cursor, OLD_INDEXES)
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        _create(cursor, OLD_INDEXES)
+        _drop(cursor, INDEXES)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("glossario", "0027_sitesetting_autocomplete_cache_seconds"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, reverse_code=backwards),
+    ]
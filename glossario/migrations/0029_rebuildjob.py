@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:08
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def enfileirar_relacionados(apps, schema_editor):
+    """Primeiro cálculo dos relacionados dos termos já existentes (feito pelo worker)."""
+    Termo = apps.get_model("glossario", "Termo")
+    RebuildJob = apps.get_model("glossario", "RebuildJob")
+    if Termo.objects.exists():
+        RebuildJob.objects.create(kind="related")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('glossario', '0028_trgm_chaves_busca'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RebuildJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('related', 'Termos relacionados')], max_length=20, verbose_name='Tipo')),
+                ('status', models.CharField(choices=[('pending', 'Pendente'), ('running', 'Processando'), ('done', 'Concluído'), ('failed', 'Falhou')], default='pending', max_length=16, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Tentativas')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Executar a partir de')),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, verbose_name='Último erro')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Job de recálculo',
+                'verbose_name_plural': 'Jobs de recálculo',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='glossario_rebuild_queue_idx')],
+            },
+        ),
+        migrations.RunPython(enfileirar_relacionados, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:11
+
+from django.db import migrations, models
+
+
+def enfileirar_indice(apps, schema_editor):
+    """Primeiro índice do navegador para um dicionário já existente (feito pelo worker)."""
+    Termo = apps.get_model("glossario", "Termo")
+    RebuildJob = apps.get_model("glossario", "RebuildJob")
+    if Termo.objects.exists():
+        RebuildJob.objects.create(kind="search_index")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('glossario', '0029_rebuildjob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='rebuildjob',
+            name='kind',
+            field=models.CharField(choices=[('related', 'Termos relacionados'), ('search_index', 'Índice do autocomplete no navegador')], max_length=20, verbose_name='Tipo'),
+        ),
+        migrations.RunPython(enfileirar_indice, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:13
+
+import os
+import shutil
+
+import glossario.models
+from django.conf import settings
+from django.db import migrations, models
+
+PREFIXO_ANTIGO = "importacoes/"
+
+
+def mover_arquivos(apps, schema_editor):
+    """Tira de MEDIA_ROOT os CSVs enviados antes; os de importações concluídas são apagados."""
+    CSVImportJob = apps.get_model("glossario", "CSVImportJob")
+    for job in CSVImportJob.objects.filter(arquivo__startswith=PREFIXO_ANTIGO).only("pk", "arquivo", "status"):
+        origem = os.path.join(settings.MEDIA_ROOT, job.arquivo.name)
+        if not os.path.exists(origem):
+            continue
+        if job.status == "done":
+            os.remove(origem)
+            continue
+        nome = job.arquivo.name[len(PREFIXO_ANTIGO):]
+        destino = os.path.join(settings.GLOSSARIO_IMPORT_ROOT, nome)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        shutil.move(origem, destino)
+        CSVImportJob.objects.filter(pk=job.pk).update(arquivo=nome)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('glossario', '0030_rebuildjob_search_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='csvimportjob',
+            name='arquivo',
+            field=models.FileField(storage=glossario.models.ImportStorage(), upload_to='%Y/%m/', verbose_name='Arquivo CSV'),
+        ),
+        migrations.RunPython(mover_arquivos, reverse_code=migrations.RunPython.noop),
+    ]
@@ -1,11 +1,61 @@
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
 import re
 from django.conf import settings
-from django.core.files.base import ContentFile
-from PIL import Image
-from io import BytesIO
-import os
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+from django.utils.functional import cached_property
+import time
+import unicodedata
+
+from .variants import MAX_PIXELS, VariantSpec, generate as generate_variants
+from .versioning import bump_version, get_version
+
+
+def normalizar_busca(texto: str) -> str:
+    """Chave de busca sem acentos e em minúsculas ("Aproximação" -> "aproximacao")."""
+    base = unicodedata.normalize("NFKD", texto or "")
+    base = "".join(c for c in base if not unicodedata.combining(c))
+    return " ".join(base.casefold().split())
+
+
+def letra_inicial(texto: str) -> str:
+    """Primeira letra sem acento e em maiúscula ("Ângulo" -> "A")."""
+    return normalizar_busca(texto)[:1].upper()
+
+
+def preencher_chaves_busca(termo_model, sinonimo_model, batch_size: int = 2000) -> tuple[int, int]:
+    """Recalcula as chaves normalizadas em lote (usado pelo comando ``backfill_search_keys``)."""
+
+    def termo(obj):
+        obj.inicial = letra_inicial(obj.titulo)
+        obj.titulo_busca = normalizar_busca(obj.titulo)
+        obj.decod_en_busca = normalizar_busca(obj.decod_en)
+        obj.decod_pt_busca = normalizar_busca(obj.decod_pt)
+
+    def sinonimo(obj):
+        obj.nome_busca = normalizar_busca(obj.nome)
+
+    specs = (
+        (termo_model, termo, ("titulo", "decod_en", "decod_pt"), ("inicial", "titulo_busca", "decod_en_busca", "decod_pt_busca")),
+        (sinonimo_model, sinonimo, ("nome",), ("nome_busca",)),
+    )
+    totals = []
+    for model, preencher, sources, targets in specs:
+        total = 0
+        batch = []
+        for obj in model.objects.only("pk", *sources).iterator(chunk_size=batch_size):
+            preencher(obj)
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                model.objects.bulk_update(batch, targets)
+                total += len(batch)
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, targets)
+            total += len(batch)
+        totals.append(total)
+    return totals[0], totals[1]
 
 
 class Termo(models.Model):
@@ -18,17 +68,66 @@ class Termo(models.Model):
         "Decodificação em português", max_length=255, blank=True
     )
     explicacao = models.TextField(blank=True)
+    inicial = models.CharField("Letra inicial", max_length=1, blank=True, editable=False, db_index=True)
+    # chaves de busca normalizadas (sem acento, minúsculas), mantidas no save()
+    titulo_busca = models.CharField(max_length=255, blank=True, editable=False, db_index=True)
+    decod_en_busca = models.CharField(max_length=255, blank=True, editable=False, db_index=True)
+    decod_pt_busca = models.CharField(max_length=255, blank=True, editable=False, db_index=True)
+    # impressão digital da última linha de CSV aplicada (glossario.csv_import.fingerprint);
+    # vazia quando o termo foi editado por outro caminho
+    content_hash = models.CharField(max_length=40, blank=True, editable=False)
+    # última mudança no termo ou nos filhos (imagens, links, vídeos, sinônimos);
+    # base do ETag/Last-Modified da página, da API e do sitemap
+    updated_at = models.DateTimeField("Atualizado em", default=timezone.now, editable=False, db_index=True)
+    # início do último cálculo dos relacionados que incluiu este termo
+    # (o job de recálculo dos relacionados refaz os que mudaram depois disso)
+    relacionados_em = models.DateTimeField(null=True, blank=True, editable=False)
+
+    # campo de origem -> campos derivados atualizados junto com ele
+    DERIVED_FIELDS = {
+        "titulo": ("inicial", "titulo_busca"),
+        "decod_en": ("decod_en_busca",),
+        "decod_pt": ("decod_pt_busca",),
+    }
 
     class Meta:
         ordering = ["titulo"]
+        indexes = [
+            # paginação por chave da API (glossario.pagination)
+            models.Index(fields=["titulo", "id"], name="termo_titulo_id_idx"),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover - simple representation
         return self.titulo
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        obj = super().from_db(db, field_names, values)
+        # slug/título de antes da edição: as páginas antigas também são invalidadas
+        obj._original = (obj.__dict__.get("slug"), obj.__dict__.get("titulo"))
+        return obj
+
+    def refresh_derived_fields(self):
+        self.inicial = letra_inicial(self.titulo)
+        self.titulo_busca = normalizar_busca(self.titulo)
+        self.decod_en_busca = normalizar_busca(self.decod_en)
+        self.decod_pt_busca = normalizar_busca(self.decod_pt)
+
+    def save(self, *args, **kwargs):
+        self.refresh_derived_fields()
+        self.content_hash = ""  # editado fora da importação: a próxima reimportação confere a linha
+        self.updated_at = timezone.now()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            extra = {d for f in update_fields for d in self.DERIVED_FIELDS.get(f, ())}
+            kwargs["update_fields"] = set(update_fields) | extra | {"content_hash", "updated_at"}
+        super().save(*args, **kwargs)
+
 
 class TermoSinonimo(models.Model):
     termo = models.ForeignKey(Termo, related_name="sinonimos", on_delete=models.CASCADE, verbose_name="Termo")
     nome = models.CharField("Sinônimo/variante", max_length=255)
+    nome_busca = models.CharField(max_length=255, blank=True, editable=False, db_index=True)
 
     class Meta:
         unique_together = ("termo", "nome")
@@ -38,12 +137,74 @@ class TermoSinonimo(models.Model):
     def __str__(self) -> str:  # pragma: no cover
         return self.nome
 
+    def save(self, *args, **kwargs):
+        self.nome_busca = normalizar_busca(self.nome)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "nome" in update_fields:
+            kwargs["update_fields"] = set(update_fields) | {"nome_busca"}
+        super().save(*args, **kwargs)
+
+
+class VariantImageMixin:
+    """Enfileira a geração das variantes quando o arquivo da imagem muda.
+
+    As variantes são produzidas fora do request, pelo comando
+    ``process_image_jobs`` (ver ``glossario.jobs``), conforme as larguras,
+    formatos e qualidades declarados em ``VARIANT_*`` (ver ``glossario.variants``).
+    """
+
+    VARIANT_JOB_KIND = ""
+    VARIANT_WIDTHS = (320, 640, 1280)
+    VARIANT_FORMATS = ("webp",)
+    VARIANT_QUALITY = {"webp": 85}
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        obj = super().from_db(db, field_names, values)
+        obj._imagem_original = obj.__dict__.get("imagem")
+        return obj
+
+    def save(self, *args, **kwargs):
+        original = getattr(self, "_imagem_original", None)
+        changed = self.imagem.name != original
+        if changed:
+            # o manifesto era do arquivo anterior (o template o usaria no srcset)
+            self.variants = []
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and "imagem" in update_fields:
+                kwargs["update_fields"] = set(update_fields) | {"variants"}
+        super().save(*args, **kwargs)
+        if self.imagem and changed:
+            from .jobs import enqueue_variants
+
+            transaction.on_commit(lambda: enqueue_variants(self))
+        self._imagem_original = self.imagem.name
+
+    @classmethod
+    def variant_spec(cls) -> VariantSpec:
+        return VariantSpec(
+            widths=cls.VARIANT_WIDTHS,
+            formats=cls.VARIANT_FORMATS,
+            quality=cls.VARIANT_QUALITY,
+            max_pixels=getattr(settings, "GLOSSARIO_VARIANT_MAX_PIXELS", MAX_PIXELS),
+        )
+
+    def _generate_variants(self):
+        if not self.imagem:
+            return
+        self._save_variants(generate_variants(self.imagem.storage, self.imagem.name, self.variant_spec()))
+
+    def _save_variants(self, manifest: list[dict]) -> None:
+        """Grava o manifesto de variantes (lido pelo template sem tocar no storage)."""
+        self.variants = sorted(manifest, key=lambda v: (v["format"], v["width"]))
+        self.save(update_fields=["variants"])
+
 
 def termo_image_upload_to(instance: "TermoImage", filename: str) -> str:
     return f"termos/{instance.termo.slug}/{filename}"
 
 
-class TermoImage(models.Model):
+class TermoImage(VariantImageMixin, models.Model):
     termo = models.ForeignKey(
         Termo, related_name="imagens", on_delete=models.CASCADE, verbose_name="Termo"
     )
@@ -52,47 +213,20 @@ class TermoImage(models.Model):
     title = models.CharField("Título da imagem (opcional)", max_length=255, blank=True)
     caption = models.CharField("Legenda (opcional)", max_length=255, blank=True)
     ordem = models.PositiveIntegerField(default=0, verbose_name="Ordem")
+    variants = models.JSONField("Variantes geradas", default=list, blank=True, editable=False)
 
     class Meta:
         ordering = ["ordem", "id"]
         verbose_name = "Imagem do termo"
         verbose_name_plural = "Imagens do termo"
 
+    VARIANT_JOB_KIND = "termo"
+    VARIANT_FORMATS = ("avif", "webp")
+    VARIANT_QUALITY = {"webp": 85, "avif": 60}
+
     def __str__(self) -> str:  # pragma: no cover
         return f"Imagem de {self.termo.titulo}"
 
-    def save(self, *args, **kwargs):  # gera variantes WebP após salvar
-        super().save(*args, **kwargs)
-        try:
-            self._generate_variants()
-        except Exception:
-            pass
-
-    def _variant_name(self, width: int) -> str:
-        root, ext = os.path.splitext(self.imagem.name)
-        return f"{root}_w{width}.webp"
-
-    def _generate_variants(self):
-        if not self.imagem:
-            return
-        path = self.imagem.name
-        storage = self.imagem.storage
-        with storage.open(path, "rb") as f:
-            img = Image.open(f).convert("RGB")
-            w, h = img.size
-            for target in (320, 640, 1280):
-                if w < target and h < target:
-                    continue
-                ratio = target / float(w)
-                new_size = (target, int(h * ratio))
-                resized = img.resize(new_size, Image.LANCZOS)
-                buffer = BytesIO()
-                resized.save(buffer, format="WEBP", quality=85)
-                content = ContentFile(buffer.getvalue())
-                variant_name = self._variant_name(target)
-                if not storage.exists(variant_name):
-                    storage.save(variant_name, content)
-
 
 class TermoLink(models.Model):
     termo = models.ForeignKey(
@@ -144,6 +278,60 @@ class TermoVideo(models.Model):
         return f"YouTube {self.youtube_id}"
 
 
+class TermoRelacionado(models.Model):
+    """Vizinho de um termo por similaridade de texto (ver ``glossario.related``)."""
+
+    termo = models.ForeignKey(Termo, related_name="vizinhos", on_delete=models.CASCADE, verbose_name="Termo")
+    relacionado = models.ForeignKey(Termo, related_name="+", on_delete=models.CASCADE, verbose_name="Relacionado")
+    posicao = models.PositiveSmallIntegerField("Posição")
+    score = models.FloatField("Similaridade")
+
+    class Meta:
+        ordering = ["termo", "posicao"]
+        verbose_name = "Termo relacionado"
+        verbose_name_plural = "Termos relacionados"
+        constraints = [
+            # também é o índice da leitura da página (termo, posicao)
+            models.UniqueConstraint(fields=["termo", "posicao"], name="uniq_termo_relacionado_posicao"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.termo_id} -> {self.relacionado_id} ({self.score:.3f})"
+
+
+class TermoChange(models.Model):
+    """Última mudança de cada termo, em ordem crescente de ``seq`` (ver ``glossario.changes``)."""
+
+    # sem FK: a linha de um termo apagado continua como lápide
+    termo_pk = models.BigIntegerField("Termo", primary_key=True)
+    # alocado por ``TermoChangeSeq`` na transação que grava a linha
+    seq = models.BigIntegerField(unique=True)
+    slug = models.SlugField(db_index=False)
+    deleted = models.BooleanField("Removido", default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["seq"]
+        verbose_name = "Mudança de termo"
+        verbose_name_plural = "Mudanças de termos"
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"#{self.seq} {self.slug}{' (removido)' if self.deleted else ''}"
+
+
+class TermoChangeSeq(models.Model):
+    """Último ``seq`` alocado no feed de mudanças (linha única).
+
+    Quem aloca trava a linha até o commit: os ``seq`` ficam visíveis na ordem
+    em que foram alocados.
+    """
+
+    last = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Sequência do feed de mudanças"
+
+
 class Suggestion(models.Model):
     STATUS_CHOICES = (
         ("pending", "Pendente"),
@@ -169,11 +357,23 @@ class Suggestion(models.Model):
     source_url = models.URLField("Fonte (URL)", blank=True)
     status = models.CharField("Status", max_length=16, choices=STATUS_CHOICES, default="pending")
     admin_notes = models.TextField("Notas do administrador", blank=True)
+    # reserva na fila de moderação (ver glossario.moderation)
+    claimed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="sugestoes_reservadas",
+        editable=False,
+        verbose_name="Em moderação por",
+    )
+    claimed_until = models.DateTimeField("Reservada até", null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [models.Index(fields=["status", "created_at"], name="suggestion_fila_idx")]
         verbose_name = "Sugestão"
         verbose_name_plural = "Sugestões"
 
@@ -188,49 +388,24 @@ def suggestion_image_upload_to(instance: "SuggestionImage", filename: str) -> st
     return f"sugestoes/{base}/{filename}"
 
 
-class SuggestionImage(models.Model):
+class SuggestionImage(VariantImageMixin, models.Model):
     suggestion = models.ForeignKey(Suggestion, related_name="imagens", on_delete=models.CASCADE, verbose_name="Sugestão")
     imagem = models.ImageField(upload_to=suggestion_image_upload_to, verbose_name="Imagem")
     alt_text = models.CharField("Texto alternativo (SEO)", max_length=255, blank=True)
     title = models.CharField("Título", max_length=255, blank=True)
     caption = models.CharField("Legenda", max_length=255, blank=True)
+    variants = models.JSONField("Variantes geradas", default=list, blank=True, editable=False)
 
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=["suggestion", "imagem"], name="uniq_suggestion_image_path"),
         ]
 
-    def save(self, *args, **kwargs):  # gera variantes WebP para preview ágil
-        super().save(*args, **kwargs)
-        try:
-            self._generate_variants()
-        except Exception:
-            pass
-
-    def _variant_name(self, width: int) -> str:
-        root, ext = os.path.splitext(self.imagem.name)
-        return f"{root}_w{width}.webp"
-
-    def _generate_variants(self):
-        if not self.imagem:
-            return
-        path = self.imagem.name
-        storage = self.imagem.storage
-        with storage.open(path, "rb") as f:
-            img = Image.open(f).convert("RGB")
-            w, h = img.size
-            for target in (320, 640):
-                if w < target and h < target:
-                    continue
-                ratio = target / float(w)
-                new_size = (target, int(h * ratio))
-                resized = img.resize(new_size, Image.LANCZOS)
-                buffer = BytesIO()
-                resized.save(buffer, format="WEBP", quality=80)
-                content = ContentFile(buffer.getvalue())
-                variant_name = self._variant_name(target)
-                if not storage.exists(variant_name):
-                    storage.save(variant_name, content)
+    VARIANT_JOB_KIND = "suggestion"
+    # prévia para a moderação: sem 1280 e sem AVIF; mesma qualidade do
+    # TermoImage para as variantes serem reaproveitadas na aprovação
+    VARIANT_WIDTHS = (320, 640)
+    VARIANT_QUALITY = {"webp": 85}
 
 
 class SuggestionLink(models.Model):
@@ -300,6 +475,151 @@ class TermoHistory(models.Model):
         return f"Histórico {self.termo.titulo} em {self.created_at:%Y-%m-%d %H:%M}"
 
 
+class ImageVariantJob(models.Model):
+    STATUS_CHOICES = (
+        ("pending", "Pendente"),
+        ("running", "Processando"),
+        ("done", "Concluído"),
+        ("failed", "Falhou"),
+    )
+    KIND_CHOICES = (
+        ("termo", "Imagem de termo"),
+        ("suggestion", "Imagem de sugestão"),
+    )
+
+    kind = models.CharField("Tipo", max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField("ID da imagem")
+    status = models.CharField("Status", max_length=16, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveIntegerField("Tentativas", default=0)
+    max_attempts = models.PositiveIntegerField("Máx. tentativas", default=3)
+    run_after = models.DateTimeField("Executar a partir de", default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField("Último erro", blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [models.Index(fields=["status", "run_after"], name="glossario_imgjob_queue_idx")]
+        verbose_name = "Job de variantes de imagem"
+        verbose_name_plural = "Jobs de variantes de imagem"
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.get_kind_display()} #{self.object_id} ({self.get_status_display()})"
+
+
+class ImportStorage(FileSystemStorage):
+    """CSVs enviados para importação: fora de ``MEDIA_ROOT`` e sem URL pública."""
+
+    def _clear_cached_properties(self, setting, **kwargs):
+        super()._clear_cached_properties(setting, **kwargs)
+        if setting == "GLOSSARIO_IMPORT_ROOT":
+            self.__dict__.pop("base_location", None)
+            self.__dict__.pop("location", None)
+
+    @cached_property
+    def base_location(self):
+        return self._value_or_setting(self._location, settings.GLOSSARIO_IMPORT_ROOT)
+
+    def url(self, name):
+        raise ValueError("Os CSVs de importação não são servidos.")
+
+
+import_storage = ImportStorage()
+
+
+class CSVImportJob(models.Model):
+    STATUS_CHOICES = (
+        ("pending", "Na fila"),
+        ("running", "Importando"),
+        ("done", "Concluída"),
+        ("failed", "Concluída com erros"),
+    )
+
+    # apagado quando a importação termina (mantido enquanto houver blocos a reprocessar)
+    arquivo = models.FileField("Arquivo CSV", upload_to="%Y/%m/", storage=import_storage)
+    status = models.CharField("Status", max_length=16, choices=STATUS_CHOICES, default="pending")
+    chunk_size = models.PositiveIntegerField("Linhas por bloco", default=500)
+    total_rows = models.PositiveIntegerField("Total de linhas", null=True, blank=True)
+    # contagens acumuladas (campos de glossario.csv_import.ImportReport)
+    report = models.JSONField("Relatório", default=dict, blank=True)
+    failed_chunks = models.PositiveIntegerField("Blocos com erro", default=0)
+    last_error = models.TextField("Último erro", blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Enviado por"
+    )
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Importação de CSV"
+        verbose_name_plural = "Importações de CSV"
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"Importação #{self.pk} ({self.get_status_display()})"
+
+
+class CSVImportChunk(models.Model):
+    STATUS_CHOICES = (
+        ("done", "Importado"),
+        ("failed", "Falhou"),
+    )
+
+    job = models.ForeignKey(CSVImportJob, related_name="chunks", on_delete=models.CASCADE)
+    index = models.PositiveIntegerField("Bloco")
+    start_row = models.PositiveIntegerField("Primeira linha")
+    rows = models.PositiveIntegerField("Linhas")
+    status = models.CharField("Status", max_length=16, choices=STATUS_CHOICES)
+    attempts = models.PositiveIntegerField("Tentativas", default=0)
+    report = models.JSONField("Relatório", default=dict, blank=True)
+    error = models.TextField("Erro", blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["job", "index"]
+        constraints = [
+            models.UniqueConstraint(fields=["job", "index"], name="uniq_csv_import_chunk"),
+        ]
+        verbose_name = "Bloco de importação"
+        verbose_name_plural = "Blocos de importação"
+
+
+class RebuildJob(models.Model):
+    """Recalcular um dado derivado dos termos (ver ``glossario.rebuilds``)."""
+
+    STATUS_CHOICES = (
+        ("pending", "Pendente"),
+        ("running", "Processando"),
+        ("done", "Concluído"),
+        ("failed", "Falhou"),
+    )
+    KIND_CHOICES = (
+        ("related", "Termos relacionados"),
+        ("search_index", "Índice do autocomplete no navegador"),
+    )
+
+    kind = models.CharField("Tipo", max_length=20, choices=KIND_CHOICES)
+    status = models.CharField("Status", max_length=16, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveIntegerField("Tentativas", default=0)
+    run_after = models.DateTimeField("Executar a partir de", default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField("Último erro", blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [models.Index(fields=["status", "run_after"], name="glossario_rebuild_queue_idx")]
+        verbose_name = "Job de recálculo"
+        verbose_name_plural = "Jobs de recálculo"
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.get_kind_display()} ({self.get_status_display()})"
+
+
 def settings_upload_to(instance: "SiteSetting", filename: str) -> str:
     return f"branding/{filename}"
 
@@ -327,7 +647,9 @@ class SiteSetting(models.Model):
     search_placeholder = models.CharField(max_length=160, blank=True, default="Buscar termos (ex.: IFR, NOTAM, APU)")
     items_per_page = models.PositiveIntegerField(default=12)
     enable_autocomplete = models.BooleanField(default=True)
-    autocomplete_throttle_ms = models.PositiveIntegerField(default=1000)
+    autocomplete_cache_seconds = models.PositiveIntegerField(
+        default=1, help_text="Max-age das respostas de /api/autocomplete/ (navegador e CDN)."
+    )
     robots_txt = models.TextField(blank=True, default="User-agent: *\nAllow: /\nSitemap: /sitemap.xml\n")
     social_twitter = models.URLField(blank=True)
     social_instagram = models.URLField(blank=True)
@@ -370,7 +692,36 @@ class SiteSetting(models.Model):
     def __str__(self) -> str:  # pragma: no cover
         return "Configurações do site"
 
+    # Cópia em memória por processo; a versão no cache compartilhado avisa os
+    # demais workers quando o admin salva uma nova configuração.
+    _solo = None
+    _solo_version = None
+    _solo_checked_at = 0.0
+    SOLO_VERSION_KEY = "glossario:site_settings:version"
+    SOLO_CHECK_INTERVAL = 1.0  # segundos entre consultas à versão compartilhada
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        transaction.on_commit(type(self).invalidate_solo)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        transaction.on_commit(type(self).invalidate_solo)
+        return result
+
+    @classmethod
+    def invalidate_solo(cls):
+        bump_version(cls.SOLO_VERSION_KEY)
+        cls._solo = None
+
     @classmethod
     def get_solo(cls):
-        obj, _ = cls.objects.get_or_create(pk=1)
-        return obj
+        now = time.monotonic()
+        if cls._solo is not None and now - cls._solo_checked_at < cls.SOLO_CHECK_INTERVAL:
+            return cls._solo
+        version = get_version(cls.SOLO_VERSION_KEY)
+        if cls._solo is None or version != cls._solo_version:
+            obj, _ = cls.objects.get_or_create(pk=1)
+            cls._solo, cls._solo_version = obj, version
+        cls._solo_checked_at = now
+        return cls._solo
@@ -0,0 +1,174 @@
+"""Fila de moderação de sugestões com vários moderadores.
+
+Cada moderador reserva um lote das sugestões pendentes mais antigas
+(``claim``). Os candidatos são escolhidos com
+``select_for_update(skip_locked=True)``: dois moderadores reservando ao mesmo
+tempo recebem lotes disjuntos, sem esperar um pelo outro. A reserva vale por
+``LEASE`` e é renovada a cada item atendido; reservas vencidas (moderador que
+fechou a aba) voltam para a fila sozinhas.
+
+Só a fila (sem sugestão escolhida) reserva um lote; abrir uma sugestão
+específica reserva apenas ela (``take``) e mostra o lote que o moderador já
+tem (``reserved``), sem tirar outras da fila.
+
+A decisão (``decide``, ou ``decide_many`` para as ações em lote do admin) é
+uma transição condicional de ``pending``, válida só para quem detém a reserva
+ou para sugestão livre, então a mesma sugestão nunca é aplicada duas vezes.
+Em bancos sem ``FOR UPDATE`` (SQLite) o UPDATE condicional da reserva garante
+o mesmo resultado.
+"""
+
+from datetime import timedelta
+from typing import NamedTuple
+
+from django.db import transaction
+from django.db.models import Prefetch, Q
+from django.utils import timezone
+
+from .models import Suggestion, SuggestionImage, SuggestionLink, SuggestionVideo
+
+LEASE = timedelta(minutes=15)
+BATCH_SIZE = 10
+
+
+class Lote(NamedTuple):
+    """Resultado de ``decide_many``."""
+
+    decided: int  # aprovadas (e aplicadas) ou rejeitadas
+    skipped: int  # já decididas ou reservadas por outro moderador
+    result: object = None  # ``ApplyResult`` da aprovação
+
+
+def _free(now):
+    return Q(claimed_until__isnull=True) | Q(claimed_until__lt=now)
+
+
+def _claimable(user, now):
+    return Q(status="pending") & (_free(now) | Q(claimed_by=user))
+
+
+def _queue(user, now):
+    """Sugestões pendentes reservadas por ``user`` (ordem da fila)."""
+    return Suggestion.objects.filter(status="pending", claimed_by=user, claimed_until__gte=now).order_by(
+        "created_at", "pk"
+    )
+
+
+def claim(user, batch_size: int = BATCH_SIZE) -> list[int]:
+    """Completa e renova o lote reservado por ``user``; devolve os ids na ordem da fila."""
+    now = timezone.now()
+    with transaction.atomic():
+        mine = list(_queue(user, now).values_list("pk", flat=True))
+        need = batch_size - len(mine)
+        if need > 0:
+            mine += list(
+                Suggestion.objects.filter(_free(now), status="pending")
+                .order_by("created_at", "pk")
+                .select_for_update(skip_locked=True)
+                .values_list("pk", flat=True)[:need]
+            )
+        if not mine:
+            return []
+        # condicional: em bancos sem FOR UPDATE outro moderador pode ter reservado antes
+        Suggestion.objects.filter(_claimable(user, now), pk__in=mine).update(
+            claimed_by=user, claimed_until=now + LEASE
+        )
+        return list(_queue(user, now).values_list("pk", flat=True))
+
+
+def load(pks) -> list:
+    """Carrega o lote de uma vez, com termo, autor e mídias (4 consultas)."""
+    by_pk = {
+        s.pk: s
+        for s in Suggestion.objects.filter(pk__in=pks)
+        .select_related("user", "termo", "claimed_by")
+        .prefetch_related(
+            Prefetch("imagens", queryset=SuggestionImage.objects.order_by("pk")),
+            Prefetch("links", queryset=SuggestionLink.objects.order_by("pk")),
+            Prefetch("videos", queryset=SuggestionVideo.objects.order_by("pk")),
+        )
+    }
+    return [by_pk[pk] for pk in pks if pk in by_pk]
+
+
+def next_batch(user, batch_size: int = BATCH_SIZE) -> list:
+    """O lote de ``user`` (reservando mais se preciso), já carregado."""
+    return load(claim(user, batch_size))
+
+
+def reserved(user) -> list:
+    """O lote que ``user`` já tem reservado, carregado, sem reservar nem renovar nada."""
+    return load(list(_queue(user, timezone.now()).values_list("pk", flat=True)))
+
+
+def take(user, pk: int) -> bool:
+    """Reserva uma sugestão específica (aberta pela listagem); False se outro a detém."""
+    now = timezone.now()
+    return bool(
+        Suggestion.objects.filter(_claimable(user, now), pk=pk).update(claimed_by=user, claimed_until=now + LEASE)
+    )
+
+
+def take_many(user, pks) -> list[int]:
+    """Reserva, dentre ``pks``, as pendentes livres (ou já de ``user``); devolve as reservadas."""
+    now = timezone.now()
+    Suggestion.objects.filter(_claimable(user, now), pk__in=pks).update(claimed_by=user, claimed_until=now + LEASE)
+    return list(
+        Suggestion.objects.filter(status="pending", claimed_by=user, pk__in=pks)
+        .order_by("created_at", "pk")
+        .values_list("pk", flat=True)
+    )
+
+
+def release(user, pks=None) -> int:
+    """Devolve à fila as reservas de ``user`` (todas ou só ``pks``)."""
+    qs = Suggestion.objects.filter(claimed_by=user)
+    if pks is not None:
+        qs = qs.filter(pk__in=pks)
+    return qs.update(claimed_by=None, claimed_until=None)
+
+
+def decide(user, pk: int, action: str) -> str:
+    """Aprova (e aplica) ou rejeita uma sugestão da fila.
+
+    Devolve ``"approved"``, ``"rejected"``, ``"no_target"`` (sem termo e sem
+    título: nada a aplicar) ou ``"unavailable"`` (já decidida ou reservada por
+    outro moderador).
+    """
+    from .suggestions import apply_suggestions
+
+    now = timezone.now()
+    with transaction.atomic():
+        if not take(user, pk):
+            return "unavailable"
+        if action == "approve":
+            result = apply_suggestions(Suggestion.objects.filter(pk=pk), approver=user, require_effect=False)
+            outcome = "approved" if result.applied else "no_target"
+        else:
+            Suggestion.objects.filter(pk=pk).update(status="rejected", updated_at=now)
+            outcome = "rejected"
+        release(user, [pk])
+    return outcome
+
+
+def decide_many(user, pks, action: str) -> Lote:
+    """``decide`` para uma seleção do admin: só as pendentes que ``user`` consegue reservar.
+
+    Na aprovação, as sugestões sem efeito continuam pendentes (e voltam à fila).
+    """
+    from .suggestions import apply_suggestions
+
+    pks = list(pks)
+    with transaction.atomic():
+        taken = take_many(user, pks)
+        if action == "approve":
+            selecionadas = Suggestion.objects.filter(pk__in=taken).order_by("created_at", "pk")
+            result = apply_suggestions(selecionadas, approver=user)
+            decided = len(result.applied)
+        else:
+            result = None
+            decided = Suggestion.objects.filter(pk__in=taken, status="pending").update(
+                status="rejected", updated_at=timezone.now()
+            )
+        release(user, taken)
+    return Lote(decided, len(pks) - len(taken), result)
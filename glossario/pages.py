@@ -0,0 +1,132 @@
+"""Cache das páginas de termo (``detalhes_termo``).
+
+A parte da página que depende do termo (título, metadados, conteúdo e
+relacionados) é renderizada uma vez e guardada no cache compartilhado; o
+layout (menu do usuário, mensagens) continua sendo renderizado a cada request.
+Numa página em cache o banco não é consultado.
+
+A chave inclui uma versão por termo (pelo slug), incrementada após o commit
+de qualquer escrita no termo ou nos seus filhos (ver ``glossario.signals``),
+e uma versão global, para escritas que não sabem quais termos mudaram. Os
+relacionados vêm de ``TermoRelacionado`` (ver ``glossario.related``): quem
+regrava a lista de um termo invalida a página dele, e renomear ou apagar um
+termo invalida as páginas que o listam. Enquanto um termo não tem lista
+calculada (termo novo, banco recém-migrado), a página mostra os termos da
+mesma letra inicial.
+"""
+
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Prefetch
+from django.shortcuts import get_object_or_404
+from django.template.defaultfilters import truncatewords
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .models import Termo, TermoLink, TermoRelacionado, TermoSinonimo, TermoVideo
+from .versioning import bump_version
+
+VERSION_KEY = "glossario:pagina_termo:version"
+CACHE_TIMEOUT = 60 * 60 * 24
+RELACIONADOS = 6
+
+
+def _termo_key(slug: str) -> str:
+    return f"glossario:pagina_termo:termo:{slug}"
+
+
+def invalidate(slugs=None) -> None:
+    """Invalida as páginas de ``slugs`` (todas, se None)."""
+    if slugs is None:
+        bump_version(VERSION_KEY)
+        return
+    for slug in set(slugs):
+        bump_version(_termo_key(slug))
+
+
+def invalidate_termo(termo_id: int) -> None:
+    slug = Termo.objects.filter(pk=termo_id).values_list("slug", flat=True).first()
+    if slug is not None:  # termo apagado: o post_delete dele já invalidou
+        invalidate([slug])
+
+
+def slugs_que_listam(termo_id: int) -> list[str]:
+    """Slugs dos termos que têm ``termo_id`` entre os relacionados."""
+    return list(
+        TermoRelacionado.objects.filter(relacionado_id=termo_id).values_list("termo__slug", flat=True).distinct()
+    )
+
+
+RELACOES = ("imagens", "sinonimos", "videos", "links_relacionados")
+
+
+def termo_queryset(relacoes=RELACOES):
+    """Termos com os filhos usados na página (e na API): 1 consulta + 1 por relação."""
+    lookups = {
+        "imagens": "imagens",  # ordem do Meta (ordem, id)
+        "sinonimos": Prefetch("sinonimos", queryset=TermoSinonimo.objects.order_by("pk")),
+        "videos": Prefetch("videos", queryset=TermoVideo.objects.order_by("pk")),
+        "links_relacionados": Prefetch("links_relacionados", queryset=TermoLink.objects.order_by("pk")),
+    }
+    return Termo.objects.prefetch_related(*(lookups[r] for r in relacoes))
+
+
+def load_termo(slug: str) -> Termo:
+    """O termo de ``slug`` com o grafo completo da página já carregado (5 consultas)."""
+    return get_object_or_404(termo_queryset(), slug=slug)
+
+
+def listar_relacionados(termo: Termo) -> list[Termo]:
+    """Vizinhos pré-calculados; termo ainda sem lista: os da mesma letra inicial."""
+    vizinhos = [
+        v.relacionado
+        for v in TermoRelacionado.objects.filter(termo=termo)
+        .select_related("relacionado")
+        .only("relacionado__titulo", "relacionado__slug")
+        .order_by("posicao")[:RELACIONADOS]
+    ]
+    if vizinhos:
+        return vizinhos
+    return list(
+        Termo.objects.filter(inicial=termo.inicial)
+        .exclude(pk=termo.pk)
+        .only("titulo", "slug")
+        .order_by("titulo")[:RELACIONADOS]
+    )
+
+
+def _render(request, slug: str) -> dict:
+    termo = load_termo(slug)
+    relacionados = listar_relacionados(termo)
+    context = {"termo": termo, "relacionados": relacionados, "termo_url": request.build_absolute_uri(request.path)}
+    page = {
+        "titulo": termo.titulo,
+        "descricao": truncatewords(termo.explicacao or termo.decod_pt or termo.decod_en, 28),
+        "head": render_to_string("glossario/detalhe_head.html", context, request),
+        "conteudo": render_to_string("glossario/detalhe_conteudo.html", context, request),
+    }
+    # resumo do que foi renderizado: base do ETag da página (ver views.detalhes_termo)
+    page["digest"] = hashlib.md5("\x1f".join(page.values()).encode("utf-8")).hexdigest()
+    return page
+
+
+def get_page(request, slug: str) -> dict:
+    """Partes da página de ``slug`` para ``detalhe.html`` (404 se o termo não existir)."""
+    versions = cache.get_many([VERSION_KEY, _termo_key(slug)])
+    # a URL absoluta entra no JSON-LD: uma entrada por host
+    host = hashlib.md5(f"{request.scheme}://{request.get_host()}".encode()).hexdigest()[:12]
+    key = "glossario:pagina_termo:{}:{}:{}:{}".format(
+        versions.get(VERSION_KEY, 0), versions.get(_termo_key(slug), 0), host, slug
+    )
+    page = cache.get(key)
+    if page is None:
+        page = _render(request, slug)
+        cache.set(key, page, CACHE_TIMEOUT)
+    return {
+        "titulo": page["titulo"],
+        "descricao": page["descricao"],
+        "head": mark_safe(page["head"]),
+        "conteudo": mark_safe(page["conteudo"]),
+        "digest": page["digest"],
+    }
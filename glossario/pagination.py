@@ -0,0 +1,100 @@
+"""Paginação por chave (keyset) da API de termos.
+
+A página seguinte começa depois do último ``(titulo, id)`` entregue, então
+cada página custa o mesmo (índice ``termo_titulo_id_idx``), sem ``OFFSET``
+nem ``COUNT`` sobre a tabela inteira, e inserções ou remoções entre dois
+requests não duplicam nem pulam termos.
+
+Buscas (``?q=``) vêm ranqueadas do backend de ``glossario.search``
+(anotação ``search_rank``): aí a chave é ``(search_rank, titulo, id)``, com o
+rank decrescente, e a ordem por relevância se mantém entre as páginas. O rank
+depende do corpus, então uma edição no meio da paginação pode reordenar os
+termos seguintes.
+"""
+
+import base64
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class TituloCursorPagination(BasePagination):
+    page_size = 50
+    max_page_size = 200
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def encode_cursor(self, termo) -> str:
+        key = [termo.titulo, termo.pk]
+        if self.ranked:
+            key.insert(0, termo.search_rank)
+        raw = json.dumps(key, ensure_ascii=False).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            if self.ranked:
+                rank, titulo, pk = key
+                return float(rank), str(titulo), int(pk)
+            titulo, pk = key
+            return str(titulo), int(pk)
+        except (TypeError, ValueError):
+            raise NotFound("Cursor inválido.")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        size = self.get_page_size(request)
+        self.ranked = "search_rank" in queryset.query.annotations
+        cursor = self.decode_cursor(request)
+        if self.ranked:
+            queryset = queryset.order_by("-search_rank", "titulo", "pk")
+            if cursor is not None:
+                rank, titulo, pk = cursor
+                queryset = queryset.filter(
+                    Q(search_rank__lt=rank)
+                    | Q(search_rank=rank, titulo__gt=titulo)
+                    | Q(search_rank=rank, titulo=titulo, pk__gt=pk)
+                )
+        else:
+            queryset = queryset.order_by("titulo", "pk")
+            if cursor is not None:
+                titulo, pk = cursor
+                queryset = queryset.filter(Q(titulo__gt=titulo) | Q(titulo=titulo, pk__gt=pk))
+        page = list(queryset[: size + 1])  # um a mais: diz se há próxima página
+        self.has_next = len(page) > size
+        self.page = page[:size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
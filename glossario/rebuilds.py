@@ -0,0 +1,92 @@
+"""Fila (em banco) para recalcular dados derivados dos termos.
+
+Os hooks de mudança (``glossario.signals``) chamam ``enqueue`` após o commit;
+o comando ``process_rebuild_jobs`` reivindica os jobs e roda o recálculo
+correspondente (``related.build`` incremental, ``client_index.build``). Só
+existe um job pendente por tipo: mudanças em sequência se juntam num
+recálculo só, que começa ``DELAY`` depois do primeiro pedido.
+"""
+
+import logging
+import traceback
+from datetime import timedelta
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import RebuildJob
+
+logger = logging.getLogger(__name__)
+
+DELAY = timedelta(seconds=5)
+# job "running" há mais tempo que isso é considerado abandonado (worker caiu)
+STALE_AFTER = timedelta(minutes=30)
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 30
+
+
+def _related():
+    from . import related
+
+    return related.build()
+
+
+def _search_index():
+    from . import client_index
+
+    return client_index.build()
+
+
+RUNNERS = {
+    "related": _related,
+    "search_index": _search_index,
+}
+
+
+def enqueue(kind: str):
+    """Pede um recálculo de ``kind`` (nada a fazer se já houver um pendente)."""
+    if RebuildJob.objects.filter(kind=kind, status="pending").exists():
+        return None
+    return RebuildJob.objects.create(kind=kind, run_after=timezone.now() + DELAY)
+
+
+def claim(limit: int = 10) -> list:
+    """Reivindica jobs prontos (UPDATE condicional por job, como ``jobs.claim_jobs``)."""
+    now = timezone.now()
+    ready = Q(status="pending", run_after__lte=now) | Q(status="running", locked_at__lt=now - STALE_AFTER)
+    claimed = []
+    for pk, status in RebuildJob.objects.filter(ready).order_by("run_after", "pk").values_list("pk", "status")[:limit]:
+        updated = RebuildJob.objects.filter(pk=pk, status=status).filter(ready).update(
+            status="running", locked_at=now, attempts=F("attempts") + 1, updated_at=now
+        )
+        if updated:
+            claimed.append(pk)
+    return list(RebuildJob.objects.filter(pk__in=claimed).order_by("run_after", "pk"))
+
+
+def run(job) -> None:
+    now = timezone.now()
+    try:
+        RUNNERS[job.kind]()
+    except Exception as exc:
+        message = "".join(traceback.format_exception_only(type(exc), exc)).strip()
+        logger.exception("Recálculo %s (job %s) falhou", job.kind, job.pk)
+        if job.attempts >= MAX_ATTEMPTS:
+            RebuildJob.objects.filter(pk=job.pk).update(
+                status="failed", locked_at=None, last_error=message, updated_at=now
+            )
+            return
+        delay = timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (job.attempts - 1))
+        RebuildJob.objects.filter(pk=job.pk).update(
+            status="pending", locked_at=None, last_error=message, run_after=now + delay, updated_at=now
+        )
+        return
+    RebuildJob.objects.filter(pk=job.pk).update(status="done", locked_at=None, last_error="", updated_at=now)
+
+
+def run_pending(limit: int = 10) -> int:
+    """Roda os jobs prontos; devolve quantos foram reivindicados."""
+    jobs = claim(limit)
+    for job in jobs:
+        run(job)
+    return len(jobs)
@@ -0,0 +1,252 @@
+"""Termos relacionados por similaridade de texto (TF-IDF + cosseno).
+
+Calculados fora do request e gravados em ``TermoRelacionado``: as mudanças
+nos termos enfileiram um recálculo incremental (``glossario.rebuilds``), e o
+comando ``build_related_terms`` roda um à mão (``--full`` refaz tudo). A
+página do termo só lê os vizinhos (uma consulta pelo índice
+``(termo, posicao)``).
+
+Cada termo vira um vetor TF-IDF esparso (tf sublinear, idf suavizado, norma
+L2) sobre título, decodificações e sinônimos, com peso ``PESO_TITULO``, e a
+explicação. Palavras presentes em mais de ``MAX_DF`` dos termos não entram
+no vocabulário: pouco dizem sobre o assunto e deixariam as listas invertidas
+longas.
+
+A similaridade é calculada em blocos de linhas: as listas invertidas das
+palavras do bloco são expandidas e somadas com ``np.bincount`` numa matriz
+bloco × N, de onde saem os ``top`` maiores de cada linha. O custo é
+proporcional às sobreposições reais entre termos (não a N²) e a memória fica
+limitada pelo tamanho do bloco, o que comporta centenas de milhares de
+termos.
+
+Atualização incremental: recalcula só os termos alterados desde o último
+cálculo (``Termo.relacionados_em``) e os termos cuja lista eles podem mudar,
+isto é, os que já tinham um alterado como vizinho e aqueles para os quais um
+alterado passou a superar o último vizinho. O idf é o do corpus atual, então
+listas que não foram recalculadas podem ficar levemente defasadas; um
+``--full`` de tempos em tempos recalcula tudo.
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+from typing import NamedTuple
+
+import numpy as np
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import pages
+from .models import Termo, TermoRelacionado, TermoSinonimo, normalizar_busca
+
+TOP = 10
+BLOCK_SIZE = 128
+# pares (linha do bloco, termo) expandidos de uma vez; blocos maiores são divididos
+MAX_PAIRS = 8_000_000
+MAX_DF = 0.05
+MIN_DF_CAP = 50  # em corpus pequenos nenhuma palavra é descartada por frequência
+MIN_SCORE = 0.05
+PESO_TITULO = 2
+WRITE_BATCH = 500
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a o as os e ou de da do das dos em no na nos nas um uma uns umas por pelo pela para com sem que se ao aos "
+    "the of and or to in on for with by an is are be at from as it its".split()
+)
+
+
+class Matriz(NamedTuple):
+    """Vetores dos termos em CSR (linhas) e CSC (listas invertidas)."""
+
+    n: int
+    indptr: np.ndarray
+    indices: np.ndarray
+    data: np.ndarray
+    col_ptr: np.ndarray
+    col_rows: np.ndarray
+    col_data: np.ndarray
+
+
+def tokens(texto: str) -> list[str]:
+    return [t for t in TOKEN_RE.findall(normalizar_busca(texto)) if len(t) > 1 and t not in STOPWORDS]
+
+
+def documentos() -> tuple[list[int], list[Counter]]:
+    """``(pks, contagem de palavras por termo)`` de todos os termos (2 consultas)."""
+    sinonimos = defaultdict(list)
+    for termo_id, nome in TermoSinonimo.objects.values_list("termo_id", "nome").iterator(chunk_size=5000):
+        sinonimos[termo_id].append(nome)
+    pks, docs = [], []
+    campos = ("pk", "titulo", "decod_en", "decod_pt", "explicacao")
+    for pk, titulo, decod_en, decod_pt, explicacao in (
+        Termo.objects.order_by("pk").values_list(*campos).iterator(chunk_size=5000)
+    ):
+        doc = Counter()
+        for t in tokens(" ".join([titulo, decod_en, decod_pt, *sinonimos[pk]])):
+            doc[t] += PESO_TITULO
+        doc.update(tokens(explicacao))
+        pks.append(pk)
+        docs.append(doc)
+    return pks, docs
+
+
+def vetorizar(docs: list[Counter], max_df: float = MAX_DF) -> Matriz:
+    n = len(docs)
+    df = Counter()
+    for doc in docs:
+        df.update(doc.keys())
+    limite = max(max_df * n, MIN_DF_CAP)
+    vocab = {t: i for i, t in enumerate(t for t, f in df.items() if f <= limite)}
+    idf = {t: math.log((1 + n) / (1 + df[t])) + 1 for t in vocab}
+
+    indptr = [0]
+    indices: list[int] = []
+    data: list[float] = []
+    for doc in docs:
+        termos = [t for t in doc if t in vocab]
+        pesos = np.array([(1 + math.log(doc[t])) * idf[t] for t in termos], dtype=np.float64)
+        norma = np.sqrt((pesos**2).sum())
+        if norma:
+            pesos /= norma
+        indices.extend(vocab[t] for t in termos)
+        data.extend(pesos.tolist())
+        indptr.append(len(indices))
+
+    indptr = np.array(indptr, dtype=np.int64)
+    indices = np.array(indices, dtype=np.int64)
+    data = np.array(data, dtype=np.float32)
+    linhas = np.repeat(np.arange(n, dtype=np.int64), np.diff(indptr))
+    ordem = np.argsort(indices, kind="stable")
+    col_ptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(indices, minlength=len(vocab)), out=col_ptr[1:])
+    return Matriz(n, indptr, indices, data, col_ptr, linhas[ordem], data[ordem])
+
+
+def _ranges(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Concatenação de ``range(s, s + l)`` para cada par, sem laço em Python."""
+    total = int(lengths.sum())
+    if not total:
+        return np.zeros(0, dtype=np.int64)
+    return np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+
+
+def similaridades(m: Matriz, rows: np.ndarray) -> np.ndarray:
+    """Cosseno de cada termo em ``rows`` com todos os termos (matriz ``len(rows)`` × N)."""
+    pos = _ranges(m.indptr[rows], m.indptr[rows + 1] - m.indptr[rows])
+    dono = np.repeat(np.arange(len(rows)), m.indptr[rows + 1] - m.indptr[rows])
+    feats = m.indices[pos]
+    tamanhos = m.col_ptr[feats + 1] - m.col_ptr[feats]
+    if len(rows) > 1 and tamanhos.sum() > MAX_PAIRS:
+        meio = len(rows) // 2
+        return np.vstack([similaridades(m, rows[:meio]), similaridades(m, rows[meio:])])
+    post = _ranges(m.col_ptr[feats], tamanhos)
+    alvo = np.repeat(dono, tamanhos) * m.n + m.col_rows[post]
+    pesos = np.repeat(m.data[pos], tamanhos) * m.col_data[post]
+    return np.bincount(alvo, weights=pesos, minlength=len(rows) * m.n).reshape(len(rows), m.n)
+
+
+def vizinhos(m: Matriz, rows, top: int = TOP, block_size: int = BLOCK_SIZE):
+    """Para cada linha de ``rows`` (em blocos): ``(linha, índices, scores)`` em ordem decrescente."""
+    rows = np.asarray(rows, dtype=np.int64)
+    k = min(top, m.n - 1)
+    for start in range(0, len(rows), block_size):
+        bloco = rows[start : start + block_size]
+        sims = similaridades(m, bloco)
+        sims[np.arange(len(bloco)), bloco] = 0  # o próprio termo
+        if k <= 0:
+            cand = np.zeros((len(bloco), 0), dtype=np.int64)
+        else:
+            cand = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        for r, row in enumerate(bloco):
+            idx = cand[r][np.argsort(-sims[r, cand[r]], kind="stable")]
+            idx = idx[sims[r, idx] >= MIN_SCORE]
+            yield int(row), idx, sims[r, idx]
+
+
+def _afetados(m: Matriz, pks: list[int], sujos: np.ndarray, top: int, block_size: int) -> set[int]:
+    """Linhas cujas listas podem mudar por causa dos termos ``sujos``."""
+    row_of = {pk: i for i, pk in enumerate(pks)}
+    sujos_pks = {pks[r] for r in sujos}
+    contagem = np.zeros(m.n, dtype=np.int64)
+    ultimo = np.zeros(m.n)
+    afetados = set()
+    for termo_id, relacionado_id, score in TermoRelacionado.objects.order_by("termo_id", "posicao").values_list(
+        "termo_id", "relacionado_id", "score"
+    ).iterator(chunk_size=5000):
+        r = row_of.get(termo_id)
+        if r is None:
+            continue
+        contagem[r] += 1
+        ultimo[r] = score
+        if relacionado_id in sujos_pks:
+            afetados.add(r)
+    # listas incompletas aceitam qualquer vizinho acima do mínimo
+    limiar = np.where(contagem >= top, ultimo, MIN_SCORE)
+    for start in range(0, len(sujos), block_size):
+        bloco = sujos[start : start + block_size]
+        sims = similaridades(m, bloco)
+        sims[np.arange(len(bloco)), bloco] = 0
+        afetados.update(np.nonzero((sims > limiar).any(axis=0))[0].tolist())
+    return afetados
+
+
+def pendentes():
+    """Termos alterados desde o último cálculo dos relacionados (ou nunca calculados)."""
+    return Termo.objects.filter(Q(relacionados_em__isnull=True) | Q(updated_at__gt=F("relacionados_em")))
+
+
+def build(full: bool = False, top: int = TOP, block_size: int = BLOCK_SIZE) -> tuple[int, int]:
+    """Recalcula os relacionados (todos ou só os afetados por mudanças).
+
+    Devolve ``(termos recalculados, vizinhos gravados)``. As páginas dos termos
+    cujas listas foram regravadas são invalidadas após o commit.
+    """
+    inicio = timezone.now()  # o que mudar durante o cálculo fica para a próxima rodada
+    sujos = None if full else set(pendentes().values_list("pk", flat=True))
+    if sujos is not None and not sujos:
+        return 0, 0
+    pks, docs = documentos()
+    if full:
+        rows = np.arange(len(pks), dtype=np.int64)
+    else:
+        rows = np.array([i for i, pk in enumerate(pks) if pk in sujos], dtype=np.int64)
+    if not len(rows):
+        return 0, 0
+    m = vetorizar(docs)
+    del docs
+    if not full:
+        rows = np.array(sorted(set(rows.tolist()) | _afetados(m, pks, rows, top, block_size)), dtype=np.int64)
+
+    gravados = 0
+    slugs = []
+    with transaction.atomic():
+        if full:
+            TermoRelacionado.objects.all().delete()
+        lote, termos = [], []
+
+        def flush():
+            if not full:
+                TermoRelacionado.objects.filter(termo_id__in=termos).delete()
+            TermoRelacionado.objects.bulk_create(lote)
+            alterados = Termo.objects.filter(pk__in=termos)
+            alterados.update(relacionados_em=inicio)
+            if not full:
+                slugs.extend(alterados.values_list("slug", flat=True))
+
+        for row, idx, scores in vizinhos(m, rows, top, block_size):
+            termos.append(pks[row])
+            lote.extend(
+                TermoRelacionado(termo_id=pks[row], relacionado_id=pks[j], posicao=posicao, score=score)
+                for posicao, (j, score) in enumerate(zip(idx.tolist(), scores.tolist()))
+            )
+            if len(termos) >= WRITE_BATCH:
+                flush()
+                gravados += len(lote)
+                lote, termos = [], []
+        if termos:
+            flush()
+            gravados += len(lote)
+        transaction.on_commit(lambda: pages.invalidate(None if full else slugs))
+    return len(rows), gravados
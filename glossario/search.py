@@ -0,0 +1,369 @@
+"""Busca textual ranqueada do dicionário.
+
+Três implementações com a mesma interface (``search(queryset, busca)``):
+
+* ``PostgresSearchBackend`` — coluna ``search_vector`` (tsvector com pesos)
+  mantida por trigger, índice GIN e ordenação por ``ts_rank``;
+* ``SQLiteSearchBackend`` — tabela FTS5 ``glossario_termo_fts`` mantida por
+  triggers, ordenação por ``bm25``;
+* ``IcontainsSearchBackend`` — filtro por substring nas chaves normalizadas,
+  usado quando o banco não oferece nenhuma das anteriores (ex.: MySQL,
+  SQLite sem FTS5).
+
+O texto completo casa cada palavra como prefixo; siglas são buscadas também
+no meio ("fr" acha IFR e VFR). Por isso os dois backends ranqueados aceitam
+ainda a substring no título e nos sinônimos (``titulo_busca``/``nome_busca``,
+com índices trigram no Postgres), com rank 0: esses resultados vêm depois dos
+que casaram pelo texto completo.
+
+No Postgres o esquema auxiliar é criado pelas migrations ``0016_fulltext_search``
+e ``0017_search_keys`` (cada uma com a cópia do SQL da sua versão) e
+reinstalado com o SQL atual em ``post_migrate``.
+No SQLite ele é (re)instalado em ``post_migrate`` e os triggers são removidos
+em ``pre_migrate``: o SQLite recria tabelas em muitas migrations e triggers
+pendurados nelas quebram essa operação.
+"""
+
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from .models import TermoSinonimo, normalizar_busca
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokens(busca: str) -> list[str]:
+    return TOKEN_RE.findall(normalizar_busca(busca))[:12]
+
+
+def contem(busca: str) -> Q:
+    """Substring da busca no título ou num sinônimo (chaves normalizadas)."""
+    chave = normalizar_busca(busca)
+    return Q(titulo_busca__contains=chave) | Q(
+        pk__in=TermoSinonimo.objects.filter(nome_busca__contains=chave).values("termo_id")
+    )
+
+
+class IcontainsSearchBackend:
+    name = "icontains"
+
+    def search(self, queryset, busca: str):
+        # compara com as chaves já normalizadas: sem UPPER() por linha
+        chave = normalizar_busca(busca)
+        return queryset.filter(
+            Q(titulo_busca__contains=chave)
+            | Q(decod_en_busca__contains=chave)
+            | Q(decod_pt_busca__contains=chave)
+            | Q(sinonimos__nome_busca__contains=chave)
+        ).distinct()
+
+    def install(self, conn, rebuild=False):
+        pass
+
+    def uninstall(self, conn):
+        pass
+
+    def before_migrate(self, conn):
+        pass
+
+    def after_migrate(self, conn):
+        pass
+
+
+PG_INSTALL = [
+    "ALTER TABLE glossario_termo ADD COLUMN IF NOT EXISTS search_vector tsvector;",
+    "CREATE INDEX IF NOT EXISTS glossario_termo_search_vector ON glossario_termo USING gin (search_vector);",
+    # mesma dobra de acentos de normalizar_busca(), sem depender da extensão unaccent
+    """
+    CREATE OR REPLACE FUNCTION glossario_fold(texto text) RETURNS text AS $$
+      SELECT translate(lower(coalesce(texto, '')),
+        'áàâãäåéèêëíìîïóòôõöúùûüçñý', 'aaaaaaeeeeiiiiooooouuuucny');
+    $$ LANGUAGE sql IMMUTABLE;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION glossario_termo_search_vector() RETURNS trigger AS $$
+    BEGIN
+      NEW.search_vector :=
+        setweight(to_tsvector('simple', glossario_fold(NEW.titulo)), 'A') ||
+        setweight(to_tsvector('simple', glossario_fold(
+          (SELECT string_agg(nome, ' ') FROM glossario_termosinonimo WHERE termo_id = NEW.id))), 'A') ||
+        setweight(to_tsvector('simple', glossario_fold(NEW.decod_en || ' ' || NEW.decod_pt)), 'B') ||
+        setweight(to_tsvector('simple', glossario_fold(NEW.explicacao)), 'C');
+      RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION glossario_sinonimo_touch_termo() RETURNS trigger AS $$
+    BEGIN
+      IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE glossario_termo SET titulo = titulo WHERE id = OLD.termo_id;
+      END IF;
+      IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE glossario_termo SET titulo = titulo WHERE id = NEW.termo_id;
+      END IF;
+      RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql;
+    """,
+    "DROP TRIGGER IF EXISTS glossario_termo_search_vector_trg ON glossario_termo;",
+    """
+    CREATE TRIGGER glossario_termo_search_vector_trg
+      BEFORE INSERT OR UPDATE OF titulo, decod_en, decod_pt, explicacao ON glossario_termo
+      FOR EACH ROW EXECUTE FUNCTION glossario_termo_search_vector();
+    """,
+    "DROP TRIGGER IF EXISTS glossario_sinonimo_search_vector_trg ON glossario_termosinonimo;",
+    """
+    CREATE TRIGGER glossario_sinonimo_search_vector_trg
+      AFTER INSERT OR UPDATE OR DELETE ON glossario_termosinonimo
+      FOR EACH ROW EXECUTE FUNCTION glossario_sinonimo_touch_termo();
+    """,
+]
+
+PG_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS glossario_sinonimo_search_vector_trg ON glossario_termosinonimo;",
+    "DROP TRIGGER IF EXISTS glossario_termo_search_vector_trg ON glossario_termo;",
+    "DROP FUNCTION IF EXISTS glossario_sinonimo_touch_termo();",
+    "DROP FUNCTION IF EXISTS glossario_termo_search_vector();",
+    "DROP FUNCTION IF EXISTS glossario_fold(text);",
+    "DROP INDEX IF EXISTS glossario_termo_search_vector;",
+    "ALTER TABLE glossario_termo DROP COLUMN IF EXISTS search_vector;",
+]
+
+
+class PostgresSearchBackend:
+    name = "postgres"
+
+    def search(self, queryset, busca: str):
+        terms = tokens(busca)
+        if not terms:
+            return queryset.none()
+        tsquery = " & ".join(f"{t}:*" for t in terms)
+        match = "glossario_termo.search_vector @@ to_tsquery('simple', %s)"
+        return (
+            queryset.filter(Q(RawSQL(match, [tsquery], output_field=BooleanField())) | contem(busca))
+            .annotate(
+                search_rank=RawSQL(
+                    f"CASE WHEN {match} "
+                    "THEN ts_rank(glossario_termo.search_vector, to_tsquery('simple', %s)) ELSE 0 END",
+                    [tsquery, tsquery],
+                    output_field=FloatField(),
+                )
+            )
+            .order_by("-search_rank", "titulo")
+        )
+
+    def install(self, conn, rebuild=False):
+        with conn.cursor() as cursor:
+            for sql in PG_INSTALL:
+                cursor.execute(sql)
+            if rebuild:
+                # dispara o trigger para preencher o vetor das linhas existentes
+                cursor.execute("UPDATE glossario_termo SET titulo = titulo;")
+
+    def uninstall(self, conn):
+        with conn.cursor() as cursor:
+            for sql in PG_UNINSTALL:
+                cursor.execute(sql)
+
+    def before_migrate(self, conn):
+        pass
+
+    def after_migrate(self, conn):
+        self.install(conn)
+
+
+FTS_SINONIMOS = "(SELECT group_concat(nome, ' ') FROM glossario_termosinonimo WHERE termo_id = {ref})"
+FTS_INSERT = (
+    "INSERT INTO glossario_termo_fts(rowid, titulo, sinonimos, decod_en, decod_pt, explicacao) "
+    "VALUES (new.id, new.titulo, " + FTS_SINONIMOS.format(ref="new.id") + ", new.decod_en, new.decod_pt, new.explicacao);"
+)
+FTS_SYNC_SINONIMOS = (
+    "UPDATE glossario_termo_fts SET sinonimos = " + FTS_SINONIMOS.format(ref="{row}.termo_id")
+    + " WHERE rowid = {row}.termo_id;"
+)
+SQLITE_INSTALL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS glossario_termo_fts USING fts5(
+      titulo, sinonimos, decod_en, decod_pt, explicacao,
+      tokenize = 'unicode61 remove_diacritics 2'
+    );
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS glossario_termo_fts_ai AFTER INSERT ON glossario_termo BEGIN
+      {FTS_INSERT}
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS glossario_termo_fts_au
+      AFTER UPDATE OF titulo, decod_en, decod_pt, explicacao ON glossario_termo BEGIN
+      DELETE FROM glossario_termo_fts WHERE rowid = old.id;
+      {FTS_INSERT}
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS glossario_termo_fts_ad AFTER DELETE ON glossario_termo BEGIN
+      DELETE FROM glossario_termo_fts WHERE rowid = old.id;
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS glossario_sinonimo_fts_ai AFTER INSERT ON glossario_termosinonimo BEGIN
+      {FTS_SYNC_SINONIMOS.format(row="new")}
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS glossario_sinonimo_fts_au AFTER UPDATE ON glossario_termosinonimo BEGIN
+      {FTS_SYNC_SINONIMOS.format(row="old")}
+      {FTS_SYNC_SINONIMOS.format(row="new")}
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS glossario_sinonimo_fts_ad AFTER DELETE ON glossario_termosinonimo BEGIN
+      {FTS_SYNC_SINONIMOS.format(row="old")}
+    END;
+    """,
+]
+SQLITE_REBUILD = [
+    "DELETE FROM glossario_termo_fts;",
+    "INSERT INTO glossario_termo_fts(rowid, titulo, sinonimos, decod_en, decod_pt, explicacao) "
+    "SELECT t.id, t.titulo, " + FTS_SINONIMOS.format(ref="t.id") + ", t.decod_en, t.decod_pt, t.explicacao "
+    "FROM glossario_termo t;",
+]
+SQLITE_DROP_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS glossario_termo_fts_ai;",
+    "DROP TRIGGER IF EXISTS glossario_termo_fts_au;",
+    "DROP TRIGGER IF EXISTS glossario_termo_fts_ad;",
+    "DROP TRIGGER IF EXISTS glossario_sinonimo_fts_ai;",
+    "DROP TRIGGER IF EXISTS glossario_sinonimo_fts_au;",
+    "DROP TRIGGER IF EXISTS glossario_sinonimo_fts_ad;",
+]
+# pesos do bm25 na ordem das colunas: titulo, sinonimos, decod_en, decod_pt, explicacao
+BM25 = "bm25(glossario_termo_fts, 10.0, 10.0, 4.0, 4.0, 1.0)"
+
+
+class SQLiteSearchBackend:
+    name = "sqlite"
+
+    def search(self, queryset, busca: str):
+        terms = tokens(busca)
+        if not terms:
+            return queryset.none()
+        match = " ".join(f'"{t}"*' for t in terms)
+        return (
+            queryset.filter(
+                Q(
+                    pk__in=RawSQL(
+                        "SELECT rowid FROM glossario_termo_fts WHERE glossario_termo_fts MATCH %s",
+                        [match],
+                    )
+                )
+                | contem(busca)
+            )
+            .annotate(
+                search_rank=RawSQL(
+                    f"COALESCE((SELECT -{BM25} FROM glossario_termo_fts "
+                    "WHERE glossario_termo_fts MATCH %s AND rowid = glossario_termo.id), 0)",
+                    [match],
+                    output_field=FloatField(),
+                )
+            )
+            .order_by("-search_rank", "titulo")
+        )
+
+    def install(self, conn, rebuild=False):
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'glossario_termo_fts'")
+            existed = cursor.fetchone() is not None
+            for sql in SQLITE_INSTALL:
+                cursor.execute(sql)
+            if rebuild or not existed:
+                for sql in SQLITE_REBUILD:
+                    cursor.execute(sql)
+
+    def uninstall(self, conn):
+        self.before_migrate(conn)
+        with conn.cursor() as cursor:
+            cursor.execute("DROP TABLE IF EXISTS glossario_termo_fts;")
+
+    def before_migrate(self, conn):
+        # Ao recriar uma tabela, o SQLite recusa o RENAME se algum trigger
+        # ainda apontar para ela; por isso os triggers saem durante o migrate.
+        with conn.cursor() as cursor:
+            for sql in SQLITE_DROP_TRIGGERS:
+                cursor.execute(sql)
+
+    def after_migrate(self, conn):
+        # sem triggers durante o migrate, a tabela FTS pode ter ficado defasada
+        self.install(conn, rebuild=True)
+
+
+BACKENDS = {
+    "postgres": PostgresSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+    "icontains": IcontainsSearchBackend,
+}
+_backend = None
+
+
+def _sqlite_has_fts5(conn) -> bool:
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp.glossario_fts5_probe USING fts5(x)")
+            cursor.execute("DROP TABLE temp.glossario_fts5_probe")
+        return True
+    except Exception:
+        return False
+
+
+def backend_for(conn):
+    name = getattr(settings, "GLOSSARIO_SEARCH_BACKEND", None)
+    if not name:
+        if conn.vendor == "postgresql":
+            name = "postgres"
+        elif conn.vendor == "sqlite" and _sqlite_has_fts5(conn):
+            name = "sqlite"
+        else:
+            name = "icontains"
+    return BACKENDS[name]()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = backend_for(connection)
+    return _backend
+
+
+def search(queryset, busca: str):
+    """Filtra ``queryset`` pela busca e ordena pela relevância."""
+    return get_backend().search(queryset, busca)
+
+
+def install(conn, rebuild=False):
+    backend_for(conn).install(conn, rebuild=rebuild)
+
+
+def uninstall(conn):
+    backend_for(conn).uninstall(conn)
+
+
+def prepare_migrate(sender, using, **kwargs):
+    """Handler de ``pre_migrate``."""
+    from django.db import connections
+
+    conn = connections[using]
+    backend_for(conn).before_migrate(conn)
+
+
+def ensure_installed(sender, using, **kwargs):
+    """Handler de ``post_migrate``: (re)instala o esquema auxiliar de busca."""
+    from django.db import connections
+
+    conn = connections[using]
+    if "glossario_termo" not in conn.introspection.table_names():
+        return
+    backend_for(conn).after_migrate(conn)
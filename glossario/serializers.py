@@ -1,8 +1,55 @@
 from rest_framework import serializers
-from .models import Termo
+from .models import Termo, TermoImage, TermoLink, TermoVideo
+
+
+class TermoImageSerializer(serializers.ModelSerializer):
+    url = serializers.SerializerMethodField()
+    variants = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TermoImage
+        fields = ["id", "url", "alt_text", "title", "caption", "ordem", "variants"]
+
+    def get_url(self, obj):
+        return obj.imagem.url if obj.imagem else None
+
+    def get_variants(self, obj):
+        # só o manifesto gravado pelo worker: nenhuma chamada ao storage
+        return [{"width": v["width"], "format": v["format"], "url": v["url"], "bytes": v["bytes"]} for v in obj.variants]
+
+
+class TermoLinkSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TermoLink
+        fields = ["url", "rotulo"]
+
+
+class TermoVideoSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TermoVideo
+        fields = ["youtube_url", "youtube_id"]
 
 
 class TermoSerializer(serializers.ModelSerializer):
+    """Termo com imagens, sinônimos, links e vídeos.
+
+    Os filhos vêm dos prefetches de ``pages.termo_queryset``; ``fields``
+    limita a saída (e ``RELACOES`` diz quais prefetches cada campo precisa).
+    """
+
+    imagens = TermoImageSerializer(many=True, read_only=True)
+    sinonimos = serializers.SlugRelatedField(many=True, read_only=True, slug_field="nome")
+    links = TermoLinkSerializer(many=True, read_only=True, source="links_relacionados")
+    videos = TermoVideoSerializer(many=True, read_only=True)
+
+    # campo -> relação a pré-carregar
+    RELACOES = {
+        "imagens": "imagens",
+        "sinonimos": "sinonimos",
+        "links": "links_relacionados",
+        "videos": "videos",
+    }
+
     class Meta:
         model = Termo
         fields = [
@@ -12,11 +59,30 @@ class TermoSerializer(serializers.ModelSerializer):
             "decod_en",
             "decod_pt",
             "explicacao",
-            "fotos",
-            "videos",
+            "updated_at",
+            "imagens",
+            "sinonimos",
             "links",
+            "videos",
         ]
-        extra_kwargs = {
-            "fotos": {"required": False},
-            "videos": {"required": False},
-        }
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def parse_fields(cls, raw):
+        """``?fields=a,b`` -> lista de campos (None: todos); campo desconhecido é erro 400."""
+        if not raw:
+            return None
+        fields = [f.strip() for f in raw.split(",") if f.strip()]
+        invalid = sorted(set(fields) - set(cls.Meta.fields))
+        if invalid:
+            raise serializers.ValidationError({"fields": f"Campos inválidos: {', '.join(invalid)}."})
+        return fields
+
+    @classmethod
+    def relacoes(cls, fields=None) -> list[str]:
+        return [rel for name, rel in cls.RELACOES.items() if fields is None or name in fields]
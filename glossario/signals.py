@@ -0,0 +1,129 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import changes, facets, pages, rebuilds
+from .autocomplete import index as autocomplete_index
+from .models import CSVImportJob, Termo, TermoImage, TermoLink, TermoSinonimo, TermoVideo
+
+
+def termos_alterados(slugs=None):
+    """Invalida os caches derivados após escritas em lote (que não disparam signals).
+
+    ``slugs``: termos criados ou alterados, para invalidar só as páginas deles
+    (None: todas as páginas; usado por escritas que não mudam o conteúdo
+    publicado). As páginas que listam um termo renomeado em lote são refeitas
+    quando o job de recálculo dos relacionados (enfileirado aqui) regrava as
+    listas. O feed de mudanças não passa por aqui: quem escreve em lote chama
+    ``changes.record`` dentro da própria transação.
+    """
+    autocomplete_index.invalidate()
+    rebuilds.enqueue("search_index")
+    facets.invalidate()
+    pages.invalidate(slugs)
+    if slugs is not None:
+        rebuilds.enqueue("related")
+
+
+@receiver(pre_save, sender=Termo)
+@receiver(pre_delete, sender=Termo)
+@receiver(pre_save, sender=TermoImage)
+@receiver(pre_delete, sender=TermoImage)
+@receiver(pre_save, sender=TermoLink)
+@receiver(pre_delete, sender=TermoLink)
+@receiver(pre_save, sender=TermoVideo)
+@receiver(pre_delete, sender=TermoVideo)
+@receiver(pre_save, sender=TermoSinonimo)
+@receiver(pre_delete, sender=TermoSinonimo)
+def travar_feed(sender, instance, **kwargs):
+    # o contador do feed é travado antes da linha do termo (ver changes.py)
+    changes.lock()
+
+
+# Caches derivados (autocomplete, facetas): só aplicamos a mudança após o commit,
+# para não refletir dados de uma transação que pode ser desfeita.
+@receiver(post_save, sender=Termo)
+def termo_saved(sender, instance, created=False, **kwargs):
+    transaction.on_commit(lambda: autocomplete_index.update_termo(instance))
+    transaction.on_commit(lambda: rebuilds.enqueue("search_index"))
+    transaction.on_commit(facets.invalidate)
+    slug, titulo = getattr(instance, "_original", (None, None))
+    slugs = {instance.slug, slug} - {None}
+    if not created and (slug, titulo) != (instance.slug, instance.titulo):
+        # o link e o título aparecem nos relacionados de outras páginas
+        slugs.update(pages.slugs_que_listam(instance.pk))
+    instance._original = (instance.slug, instance.titulo)
+    transaction.on_commit(lambda: pages.invalidate(slugs))
+    transaction.on_commit(lambda: rebuilds.enqueue("related"))
+    # o feed é gravado na própria transação: some junto se ela for desfeita
+    changes.record([instance.pk])
+
+
+@receiver(pre_delete, sender=Termo)
+def termo_deleting(sender, instance, **kwargs):
+    # depois do delete as linhas de TermoRelacionado já se foram (cascade)
+    instance._listado_em = pages.slugs_que_listam(instance.pk)
+
+
+@receiver(post_delete, sender=Termo)
+def termo_deleted(sender, instance, **kwargs):
+    pk, slug = instance.pk, instance.slug
+    slugs = [slug, *getattr(instance, "_listado_em", ())]
+    transaction.on_commit(lambda: autocomplete_index.remove_termo(pk))
+    transaction.on_commit(lambda: rebuilds.enqueue("search_index"))
+    transaction.on_commit(facets.invalidate)
+    transaction.on_commit(lambda: pages.invalidate(slugs))
+    changes.tombstone(pk, slug)
+
+
+@receiver(post_save, sender=TermoSinonimo)
+@receiver(post_delete, sender=TermoSinonimo)
+def sinonimo_changed(sender, instance, **kwargs):
+    termo_id = instance.termo_id
+    transaction.on_commit(lambda: autocomplete_index.update_sinonimos(termo_id))
+    transaction.on_commit(lambda: rebuilds.enqueue("search_index"))
+    # a busca também casa sinônimos, então as contagens filtradas mudam
+    transaction.on_commit(facets.invalidate)
+    # e eles entram no texto comparado pelos relacionados
+    transaction.on_commit(lambda: rebuilds.enqueue("related"))
+
+
+@receiver(post_save, sender=TermoImage)
+@receiver(post_delete, sender=TermoImage)
+@receiver(post_save, sender=TermoLink)
+@receiver(post_delete, sender=TermoLink)
+@receiver(post_save, sender=TermoVideo)
+@receiver(post_delete, sender=TermoVideo)
+@receiver(post_save, sender=TermoSinonimo)
+@receiver(post_delete, sender=TermoSinonimo)
+def filho_alterado(sender, instance, **kwargs):
+    fields = {"updated_at": timezone.now()}
+    if sender is not TermoImage:
+        # a impressão digital da importação cobre links, vídeos e sinônimos
+        fields["content_hash"] = ""
+    Termo.objects.filter(pk=instance.termo_id).update(**fields)
+    # termo apagado em cascata: a lápide gravada depois prevalece
+    changes.record([instance.termo_id])
+
+
+@receiver(post_save, sender=TermoImage)
+@receiver(post_delete, sender=TermoImage)
+@receiver(post_save, sender=TermoLink)
+@receiver(post_delete, sender=TermoLink)
+@receiver(post_save, sender=TermoVideo)
+@receiver(post_delete, sender=TermoVideo)
+@receiver(post_save, sender=TermoSinonimo)
+@receiver(post_delete, sender=TermoSinonimo)
+def pagina_filho_alterada(sender, instance, **kwargs):
+    # inclui o manifesto de variantes gravado pelo worker de imagens
+    termo_id = instance.termo_id
+    transaction.on_commit(lambda: pages.invalidate_termo(termo_id))
+
+
+@receiver(post_delete, sender=CSVImportJob)
+def importacao_apagada(sender, instance, **kwargs):
+    # CSV de uma importação que ainda tinha blocos a reprocessar
+    if instance.arquivo:
+        storage, name = instance.arquivo.storage, instance.arquivo.name
+        transaction.on_commit(lambda: storage.delete(name))
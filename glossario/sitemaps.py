@@ -1,5 +1,6 @@
 from django.contrib.sitemaps import Sitemap
 from django.urls import reverse
+from . import conditional
 from .models import Termo
 
 
@@ -8,11 +9,22 @@ class TermoSitemap(Sitemap):
     priority = 0.7
 
     def items(self):
-        return Termo.objects.all()
+        return Termo.objects.only("slug", "updated_at")
 
     def location(self, obj):
         return reverse("glossario:detalhes_termo", args=[obj.slug])
 
+    def lastmod(self, obj):
+        return obj.updated_at
+
+
+# Validador do sitemap.xml (usado com ``condition`` em config/urls.py): o XML
+# só é gerado de novo quando algum termo foi criado, alterado ou removido. Só
+# ETag: remover um termo não avança o Last-Modified.
+def sitemap_etag(request, **kwargs):
+    total, ultimo = conditional.collection_state(Termo.objects.all())
+    return conditional.make_etag(request.build_absolute_uri(), total, ultimo and ultimo.isoformat()).strip('"')
+
 
 class StaticSitemap(Sitemap):
     changefreq = "monthly"
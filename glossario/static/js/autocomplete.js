@@ -1,3 +1,65 @@
+// Índice local (glossario.client_index): baixado uma vez e ranqueado aqui,
+// com as mesmas regras de glossario/autocomplete.py. Sem índice, usa a API.
+const acScript = document.currentScript;
+const acIndexUrl = acScript && acScript.dataset.index;
+const AC_MAX_KEY_LEN = 24;
+let acDocs = null;
+let acLoading = null;
+
+const acNormalize = (s) => s.normalize('NFKD').replace(/\p{Mn}/gu, '').toLowerCase().split(/\s+/).filter(Boolean).join(' ');
+
+function acLoadIndex() {
+  if (acLoading || !acIndexUrl || typeof DecompressionStream === 'undefined') return;
+  acLoading = fetch(acIndexUrl)
+    .then((res) => {
+      if (!res.ok) throw new Error(`HTTP ${res.status}`);
+      return res.arrayBuffer();
+    })
+    .then((buf) => {
+      const bytes = new Uint8Array(buf);
+      // o proxy pode já ter descompactado (Content-Encoding: gzip)
+      if (bytes[0] !== 0x1f || bytes[1] !== 0x8b) return new Response(buf).json();
+      return new Response(new Blob([buf]).stream().pipeThrough(new DecompressionStream('gzip'))).json();
+    })
+    .then(acSetIndex)
+    .catch(() => { acDocs = null; });
+}
+
+function acSetIndex(data) {
+  if (data.format !== 1) return;
+  const col = Object.fromEntries(data.fields.map((f, i) => [f, i]));
+  acDocs = data.termos.map((t) => ({
+    pk: t[col.pk], titulo: t[col.titulo], slug: t[col.slug], decod: t[col.decod] || '',
+    tk: t[col.title_key], ek: t[col.en_key], ptk: t[col.pt_key],
+    syns: t[col.syn_keys], sk: t[col.syn_keys].join(' '),
+  }));
+}
+
+function acRank(ql, d) {
+  let score = 0;
+  if (d.tk.startsWith(ql)) score -= 100;
+  if (d.tk.includes(ql)) score -= 50;
+  if (d.sk.startsWith(ql)) score -= 40;
+  if (d.sk.includes(ql)) score -= 30;
+  if (d.ek.startsWith(ql) || d.ptk.startsWith(ql)) score -= 20;
+  if (d.ek.includes(ql) || d.ptk.includes(ql)) score -= 10;
+  return score;
+}
+
+function acSearchLocal(q, limit = 8) {
+  const ql = acNormalize(q);
+  if (!ql) return [];
+  const p = ql.slice(0, AC_MAX_KEY_LEN);
+  const scored = [];
+  for (const d of acDocs) {
+    if (!(d.tk.includes(p) || d.syns.some((s) => s.includes(p)) || d.ek.includes(p) || d.ptk.includes(p))) continue;
+    const score = acRank(ql, d);
+    if (score !== 0) scored.push([score, d]);
+  }
+  scored.sort((a, b) => a[0] - b[0] || (a[1].titulo < b[1].titulo ? -1 : a[1].titulo > b[1].titulo ? 1 : 0) || a[1].pk - b[1].pk);
+  return scored.slice(0, limit).map(([, d]) => ({ label: d.titulo, slug: d.slug, decod: d.decod }));
+}
+
 document.addEventListener('DOMContentLoaded', () => {
   const inputs = document.querySelectorAll('input[name="q"]');
   inputs.forEach((input) => {
@@ -42,6 +104,12 @@ document.addEventListener('DOMContentLoaded', () => {
     async function search() {
       const q = input.value.trim();
       if (q.length < 2) { items = []; render(); return; }
+      if (acDocs) {
+        if (controller) controller.abort();
+        items = acSearchLocal(q);
+        cursor = -1; render();
+        return;
+      }
       try {
         if (controller) controller.abort();
         controller = new AbortController();
@@ -52,6 +120,7 @@ document.addEventListener('DOMContentLoaded', () => {
       } catch (e) {/* ignore */}
     }
 
+    input.addEventListener('focus', acLoadIndex, { once: true });
     input.addEventListener('input', search);
     input.setAttribute('aria-controls','ac-listbox');
     input.addEventListener('keydown', (e) => {
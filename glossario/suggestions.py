@@ -0,0 +1,298 @@
+"""Aplicação de sugestões aos termos, em lote.
+
+Usado pela fila de moderação (``glossario.moderation``: ``decide`` e
+``decide_many``, chamadas pelo admin), que só entrega sugestões pendentes e
+reservadas pelo moderador. As sugestões são
+carregadas com seus links, vídeos e imagens de uma vez, agrupadas pelo termo
+de destino e aplicadas em memória, na ordem recebida (a última sugestão de um
+mesmo termo prevalece nos textos). Depois tudo é gravado com operações em
+lote numa única transação, então o número de consultas não depende de
+quantas sugestões foram selecionadas.
+
+Regras (as mesmas da aplicação individual de antes):
+
+- textos (sem HTML) só sobrescrevem quando não vazios e diferentes;
+- sugestão sem termo cria/usa o termo com o ``slugify`` do título;
+- links (comparados sem diferenciar maiúsculas), vídeos (pelo ID do YouTube)
+  e imagens (pelo nome do arquivo) só entram se o termo ainda não os tiver;
+- imagens migradas deixam de existir na sugestão; o arquivo e as variantes já
+  geradas são promovidos sem cópia quando o storage permite
+  (``variants.promote``).
+"""
+
+import os
+import re
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+from django.utils.html import strip_tags
+from django.utils.text import slugify
+
+from . import changes, variants
+from .bulk import bulk_update
+from .models import (
+    YOUTUBE_REGEX,
+    ImageVariantJob,
+    Suggestion,
+    SuggestionApplicationLog,
+    SuggestionImage,
+    SuggestionLink,
+    SuggestionVideo,
+    Termo,
+    TermoImage,
+    TermoLink,
+    TermoVideo,
+)
+
+TEXT_FIELDS = ("decod_en", "decod_pt", "explicacao")
+TERMO_UPDATE_FIELDS = TEXT_FIELDS + tuple(
+    d for f in TEXT_FIELDS for d in Termo.DERIVED_FIELDS.get(f, ())
+) + ("content_hash", "updated_at")
+
+
+@dataclass
+class ApplyResult:
+    applied: list = field(default_factory=list)  # sugestões aprovadas
+    no_effect: list = field(default_factory=list)  # nada a mudar (e exigia efeito)
+    no_target: list = field(default_factory=list)  # sem termo e sem título
+
+
+def clean_text(value: str) -> str:
+    return strip_tags(value).strip() if value else ""
+
+
+def normalize_url(u: str) -> str:
+    if not u:
+        return ""
+    if not re.match(r"^https?://", u, re.I):
+        return "https://" + u
+    return u
+
+
+def youtube_id(url: str):
+    m = YOUTUBE_REGEX.search(url or "")
+    return m.group(1) if m else None
+
+
+class _TermoState:
+    """O termo de destino e o que ele já tem (para deduplicar em memória)."""
+
+    def __init__(self, termo, is_new=False):
+        self.termo = termo
+        self.is_new = is_new
+        self.text_changed = False
+        self.claimed = False  # alguma sugestão aprovada já usa este termo
+        self.links: set[str] = set()
+        self.videos: set[str] = set()
+        self.images: set[str] = set()
+
+
+def load(queryset):
+    """Sugestões com termo e filhos já carregados (4 consultas)."""
+    return list(
+        queryset.select_related("termo").prefetch_related(
+            Prefetch("imagens", queryset=SuggestionImage.objects.order_by("pk")),
+            Prefetch("links", queryset=SuggestionLink.objects.order_by("pk")),
+            Prefetch("videos", queryset=SuggestionVideo.objects.order_by("pk")),
+        )
+    )
+
+
+def apply_suggestions(suggestions, approver=None, require_effect=True) -> ApplyResult:
+    """Aplica as sugestões; com ``require_effect``, as sem efeito ficam como estão.
+
+    ``suggestions`` pode ser um queryset (será carregado com ``load``) ou uma
+    lista já carregada.
+    """
+    if not isinstance(suggestions, list):
+        suggestions = load(suggestions)
+    result = ApplyResult()
+    states = _target_states(suggestions)
+
+    new_images, new_links, new_videos, logs, approved = [], [], [], [], []
+    images_to_remove = []
+    for s in suggestions:
+        state = states.get(s.pk)
+        if state is None:
+            result.no_target.append(s)
+            continue
+        termo = state.termo
+        # criar o termo já é efeito (só para a primeira sugestão que o cria)
+        applied = state.is_new and not state.claimed
+        changed_fields = []
+        for name in TEXT_FIELDS:
+            value = clean_text(getattr(s, name))
+            if value and value != (getattr(termo, name) or ""):
+                setattr(termo, name, value)
+                changed_fields.append(name)
+        if changed_fields:
+            state.text_changed = applied = True
+
+        media_added = links_added = videos_added = 0
+        for img in s.imagens.all():
+            basename = os.path.basename(img.imagem.name)
+            if basename in state.images:
+                continue
+            state.images.add(basename)
+            new_images.append((termo, img, basename))
+            images_to_remove.append(img)
+            media_added += 1
+        for link in s.links.all():
+            url = normalize_url(link.url)
+            if url.lower() in state.links:
+                continue
+            state.links.add(url.lower())
+            new_links.append(TermoLink(termo=termo, url=url, rotulo=link.rotulo))
+            links_added += 1
+        for video in s.videos.all():
+            vid = youtube_id(video.youtube_url)
+            if not vid or vid in state.videos:
+                continue
+            state.videos.add(vid)
+            new_videos.append(TermoVideo(termo=termo, youtube_url=video.youtube_url, youtube_id=vid))
+            videos_added += 1
+        applied = applied or bool(media_added or links_added or videos_added)
+
+        if not applied and require_effect:
+            result.no_effect.append(s)
+            continue
+        state.claimed = True
+        s.status = "approved"
+        s.termo = termo
+        approved.append(s)
+        logs.append(
+            SuggestionApplicationLog(
+                suggestion=s,
+                termo=termo,
+                approver=approver,
+                fields_changed=changed_fields,
+                media_added=media_added,
+                links_added=links_added,
+                videos_added=videos_added,
+                notes=s.justification or "",
+            )
+        )
+        result.applied.append(s)
+
+    if approved:
+        _write(states, approved, new_images, images_to_remove, new_links, new_videos, logs)
+    return result
+
+
+def _target_states(suggestions) -> dict:
+    """Resolve o termo de destino de cada sugestão (id da sugestão -> estado do termo)."""
+    by_pk: dict[int, _TermoState] = {}
+    by_slug: dict[str, _TermoState] = {}
+    pending_slugs = {}
+    for s in suggestions:
+        if s.termo_id:
+            by_pk.setdefault(s.termo_id, _TermoState(s.termo))
+        elif s.titulo:
+            pending_slugs.setdefault(slugify(s.titulo), s.titulo)
+    for termo in Termo.objects.filter(slug__in=pending_slugs):
+        state = by_pk.setdefault(termo.pk, _TermoState(termo))
+        by_slug[termo.slug] = state
+    for slug, titulo in pending_slugs.items():
+        if slug not in by_slug:
+            by_slug[slug] = _TermoState(Termo(slug=slug, titulo=titulo), is_new=True)
+
+    # o que os termos existentes já têm: 3 consultas para todos
+    existing = {pk: state for pk, state in by_pk.items()}
+    for termo_id, url in TermoLink.objects.filter(termo_id__in=existing).values_list("termo_id", "url"):
+        existing[termo_id].links.add(url.lower())
+    for termo_id, vid in TermoVideo.objects.filter(termo_id__in=existing).values_list("termo_id", "youtube_id"):
+        existing[termo_id].videos.add(vid)
+    for termo_id, name in TermoImage.objects.filter(termo_id__in=existing).values_list("termo_id", "imagem"):
+        existing[termo_id].images.add(os.path.basename(name))
+
+    states = {}
+    for s in suggestions:
+        if s.termo_id:
+            states[s.pk] = by_pk[s.termo_id]
+        elif s.titulo:
+            states[s.pk] = by_slug[slugify(s.titulo)]
+    return states
+
+
+def _write(states, approved, new_images, images_to_remove, new_links, new_videos, logs) -> None:
+    touched = [st for st in {id(st): st for st in states.values()}.values() if st.claimed]
+    copied = []
+    try:
+        with transaction.atomic():
+            changes.lock()
+            created = [st.termo for st in touched if st.is_new]
+            for termo in created:
+                termo.refresh_derived_fields()
+            Termo.objects.bulk_create(created)
+            # termos existentes com texto novo ou só com mídias/links/vídeos novos
+            changed = [st.termo for st in touched if not st.is_new]
+            now = timezone.now()
+            for termo in changed:
+                termo.refresh_derived_fields()
+                termo.content_hash = ""  # editado fora da importação de CSV
+                termo.updated_at = now
+            if changed:
+                bulk_update(Termo, changed, TERMO_UPDATE_FIELDS)
+
+            termo_images = []
+            termo_spec = TermoImage.variant_spec()
+            for termo, img, basename in new_images:
+                termo_img = TermoImage(termo=termo, alt_text=img.alt_text, title=img.title, caption=img.caption)
+                field = termo_img.imagem.field
+                # hard link no FileSystemStorage (cópia nos demais), com as variantes já geradas
+                name, manifest = variants.promote(
+                    img.imagem.storage,
+                    img.imagem.name,
+                    field.storage,
+                    field.generate_filename(termo_img, basename),
+                    variants=variants.compatible(img.variants, img.variant_spec(), termo_spec),
+                    max_length=field.max_length,
+                )
+                termo_img.imagem.name = name
+                termo_img.variants = manifest
+                copied += [(field.storage, n) for n in [name, *(v["name"] for v in manifest)]]
+                termo_images.append(termo_img)
+            TermoImage.objects.bulk_create(termo_images)
+            TermoLink.objects.bulk_create(new_links)
+            TermoVideo.objects.bulk_create(new_videos)
+
+            for s in approved:
+                s.termo_id = s.termo.pk  # termos novos só ganharam pk no bulk_create
+                s.updated_at = now
+            bulk_update(Suggestion, approved, ("status", "termo", "updated_at"))
+            SuggestionApplicationLog.objects.bulk_create(logs)
+
+            # o original da sugestão e as variantes dela (que antes ficavam órfãs)
+            removed = [
+                (img.imagem.storage, n)
+                for img in images_to_remove
+                for n in [img.imagem.name, *(v["name"] for v in img.variants)]
+            ]
+            if images_to_remove:
+                ids = [img.pk for img in images_to_remove]
+                # jobs de variantes ainda na fila falhariam com VariantSourceMissing
+                ImageVariantJob.objects.filter(kind=SuggestionImage.VARIANT_JOB_KIND, object_id__in=ids).delete()
+                SuggestionImage.objects.filter(pk__in=ids).delete()
+            changes.record(st.termo.pk for st in touched)
+            slugs = [st.termo.slug for st in touched]
+            transaction.on_commit(lambda: _after_commit(termo_images, removed, slugs))
+    except Exception:
+        # a transação foi desfeita: apaga as cópias órfãs
+        for storage, name in copied:
+            storage.delete(name)
+        raise
+
+
+def _after_commit(termo_images, removed, slugs) -> None:
+    from .signals import termos_alterados
+
+    # bulk_create não passa pelo save(): enfileira as variantes aqui (o job só
+    # renderiza as que não vieram prontas da sugestão)
+    ImageVariantJob.objects.bulk_create(
+        ImageVariantJob(kind=TermoImage.VARIANT_JOB_KIND, object_id=img.pk) for img in termo_images
+    )
+    for storage, name in removed:
+        storage.delete(name)
+    termos_alterados(slugs)
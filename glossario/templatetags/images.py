@@ -1,24 +1,24 @@
 from django import template
-import os
+from django.db.models.fields.files import FieldFile
 
 register = template.Library()
 
 
+def _variants(image) -> list:
+    # aceita a instância (TermoImage/SuggestionImage) ou o próprio FieldFile
+    if isinstance(image, FieldFile):
+        if not image:
+            return []
+        image = image.instance
+    return getattr(image, "variants", None) or []
+
+
 @register.simple_tag
-def image_srcset(image_field):
-    if not image_field:
-        return ""
-    storage = image_field.storage
-    name = image_field.name
-    root, ext = os.path.splitext(name)
-    parts = []
-    for w in (320, 640, 1280):
-        variant = f"{root}_w{w}.webp"
-        if storage.exists(variant):
-            try:
-                url = storage.url(variant)
-                parts.append(f"{url} {w}w")
-            except Exception:
-                continue
+def image_srcset(image, fmt="webp"):
+    """Monta o ``srcset`` a partir do manifesto salvo pelo worker (sem I/O no storage)."""
+    parts = [
+        f"{v['url']} {v['width']}w"
+        for v in _variants(image)
+        if v.get("format") == fmt and v.get("url")
+    ]
     return ", ".join(parts)
-
@@ -1,3 +1,912 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import autocomplete, checks, client_index, csv_export, csv_import, facets, import_jobs, jobs, moderation, related, search, suggestions
+from .models import (
+    CSVImportJob,
+    ImageVariantJob,
+    RebuildJob,
+    SiteSetting,
+    Suggestion,
+    SuggestionImage,
+    SuggestionLink,
+    SuggestionVideo,
+    Termo,
+    TermoImage,
+    TermoLink,
+    TermoRelacionado,
+    TermoSinonimo,
+    TermoVideo,
+)
+
+
+@override_settings(ALLOWED_HOSTS=["*"])
+class SuggestionChangelistQueriesTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser("admin", "admin@example.com", "x")
+        self.client.force_login(self.admin)
+        self.url = reverse("admin:glossario_suggestion_changelist")
+
+    def _add(self, n):
+        for i in range(n):
+            termo = Termo.objects.create(titulo=f"Termo {Termo.objects.count()}", slug=f"termo-{Termo.objects.count()}")
+            s = Suggestion.objects.create(user=self.admin, termo=termo if i % 2 else None, titulo="Novo", decod_en=f"en {i}")
+            if i % 3 == 0:
+                SuggestionLink.objects.create(suggestion=s, url="https://example.com")
+            if i % 4 == 0:
+                SuggestionVideo.objects.create(suggestion=s, youtube_url="https://youtu.be/abcdefghijk")
+
+    def _queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self._add(3)
+        small = self._queries()
+        self._add(60)
+        self.assertEqual(self._queries(), small)
+
+    def test_impacto_from_annotations(self):
+        self._add(4)
+        response = self.client.get(self.url)
+        self.assertContains(response, "Novo termo")
+        self.assertContains(response, "Conteúdo + mídia")
+
+
+class ApplySuggestionsTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_settings = override_settings(MEDIA_ROOT=media.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.user = User.objects.create_user("autor", "autor@example.com", "x")
+        self.termo = Termo.objects.create(titulo="Alfa", slug="alfa")
+
+    def _suggestion(self, image=None, **fields):
+        fields.setdefault("termo", self.termo)
+        s = Suggestion.objects.create(user=self.user, **fields)
+        if image:
+            with self.captureOnCommitCallbacks(execute=True):
+                SuggestionImage.objects.create(suggestion=s, imagem=ContentFile(b"jpeg", name=image))
+        return s
+
+    def test_promoted_image_leaves_no_variant_job_behind(self):
+        s = self._suggestion(image="foto.jpg")
+        img = s.imagens.get()
+        self.assertTrue(ImageVariantJob.objects.filter(kind="suggestion", object_id=img.pk).exists())
+        with self.captureOnCommitCallbacks(execute=True):
+            result = suggestions.apply_suggestions(Suggestion.objects.filter(pk=s.pk))
+        self.assertEqual(result.applied, [s])
+        self.assertFalse(ImageVariantJob.objects.filter(kind="suggestion").exists())
+        self.assertEqual(ImageVariantJob.objects.filter(kind="termo", status="pending").count(), 1)
+
+    def _full_suggestions(self, n):
+        pks = []
+        for i in range(n):
+            termo = Termo.objects.create(titulo=f"Termo {i}", slug=f"termo-{i}-{Termo.objects.count()}")
+            s = self._suggestion(image=f"foto-{i}.jpg", termo=termo, decod_en=f"en {i}")
+            SuggestionLink.objects.create(suggestion=s, url=f"example.com/{i}")
+            SuggestionVideo.objects.create(suggestion=s, youtube_url="https://youtu.be/abcdefghijk")
+            pks.append(s.pk)
+        return Suggestion.objects.filter(pk__in=pks)
+
+    def test_query_count_does_not_grow_with_suggestions(self):
+        one = self._full_suggestions(1)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(len(suggestions.apply_suggestions(one).applied), 1)
+        many = self._full_suggestions(6)
+        with self.assertNumQueries(len(ctx)):
+            self.assertEqual(len(suggestions.apply_suggestions(many).applied), 6)
+        self.assertEqual(TermoImage.objects.count(), 7)
+        self.assertEqual(TermoVideo.objects.count(), 7)
+
+    def _files(self):
+        return sorted(os.path.relpath(os.path.join(d, f), settings.MEDIA_ROOT) for d, _, fs in os.walk(settings.MEDIA_ROOT) for f in fs)
+
+    def test_failed_write_removes_the_copied_files(self):
+        s = self._suggestion(image="foto.jpg", decod_en="Novo")
+        before = self._files()
+        falha = mock.patch.object(suggestions.SuggestionApplicationLog.objects, "bulk_create", side_effect=RuntimeError)
+        with falha, self.assertRaises(RuntimeError):
+            suggestions.apply_suggestions(Suggestion.objects.filter(pk=s.pk))
+        self.assertEqual(self._files(), before)
+        self.assertFalse(TermoImage.objects.exists())
+        s.refresh_from_db()
+        self.assertEqual((s.status, s.imagens.count()), ("pending", 1))
+
+
+@override_settings(ALLOWED_HOSTS=["*"])
+class ModerationQueueTests(TestCase):
+    def setUp(self):
+        self.ana = User.objects.create_superuser("ana", "ana@example.com", "x")
+        self.bia = User.objects.create_superuser("bia", "bia@example.com", "x")
+        termo = Termo.objects.create(titulo="Alfa", slug="alfa")
+        self.pks = [Suggestion.objects.create(user=self.ana, termo=termo, decod_en=f"en {i}").pk for i in range(12)]
+        self.url = reverse("admin:glossario_suggestion_moderar")
+
+    def test_concurrent_claims_get_disjoint_batches(self):
+        claim = moderation._claimable
+        corrida = []
+
+        def ana_first(user, now):
+            # a Ana reserva entre a escolha dos candidatos da Bia e o UPDATE dela
+            if user == self.bia and not corrida:
+                corrida.append(moderation.claim(self.ana, batch_size=5))
+            return claim(user, now)
+
+        with mock.patch.object(moderation, "_claimable", ana_first):
+            bia = moderation.claim(self.bia, batch_size=5)
+        self.assertEqual(corrida, [self.pks[:5]])
+        self.assertEqual(bia, [])
+        self.assertEqual(moderation.claim(self.bia, batch_size=5), self.pks[5:10])
+        self.assertEqual(moderation.claim(self.ana, batch_size=5), self.pks[:5])
+
+    def test_decision_by_non_holder_is_refused(self):
+        pk = moderation.claim(self.ana, batch_size=1)[0]
+        self.assertEqual(moderation.decide(self.bia, pk, "reject"), "unavailable")
+        self.client.force_login(self.bia)
+        self.client.post(self.url, {"action": "approve", "id": pk})
+        s = Suggestion.objects.get(pk=pk)
+        self.assertEqual((s.status, s.claimed_by), ("pending", self.ana))
+        self.assertEqual(moderation.decide(self.ana, pk, "reject"), "rejected")
+
+    def test_opening_one_suggestion_does_not_claim_a_batch(self):
+        self.client.force_login(self.bia)
+        response = self.client.get(self.url, {"id": self.pks[3]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(Suggestion.objects.filter(claimed_by=self.bia).values_list("pk", flat=True)), [self.pks[3]])
+        self.client.get(self.url, {"id": self.pks[3]})
+        self.assertEqual(Suggestion.objects.filter(claimed_by=self.bia).count(), 1)
+
+        self.client.get(self.url)
+        self.assertEqual(Suggestion.objects.filter(claimed_by=self.bia).count(), moderation.BATCH_SIZE)
+
+
+@override_settings(ALLOWED_HOSTS=["*"])
+class TermoDetailQueriesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.termo = Termo.objects.create(titulo="Alfa", slug="alfa", explicacao="Primeira letra")
+        azul = Termo.objects.create(titulo="Azul", slug="azul")
+        TermoRelacionado.objects.create(termo=self.termo, relacionado=azul, posicao=0, score=0.5)
+        self.url = reverse("glossario:detalhes_termo", args=["alfa"])
+
+    def _add_children(self, n):
+        start = self.termo.links_relacionados.count()
+        for i in range(start, start + n):
+            TermoLink.objects.create(termo=self.termo, url=f"https://example.com/{i}", rotulo=f"Ref {i}")
+            TermoVideo.objects.create(termo=self.termo, youtube_url=f"https://youtu.be/abcdefghi{i:02d}")
+            TermoSinonimo.objects.create(termo=self.termo, nome=f"Sinônimo {i}")
+            TermoImage.objects.bulk_create([TermoImage(termo=self.termo, imagem=f"termos/alfa/{i}.jpg")])
+
+    def test_detail_page_query_count_is_constant(self):
+        self._add_children(2)
+        cache.clear()
+        # termo + imagens, sinônimos, vídeos, links + relacionados
+        with self.assertNumQueries(6):
+            response = self.client.get(self.url)
+        self.assertContains(response, "Sinônimo 1")
+        self.assertContains(response, "Ref 1")
+
+        self._add_children(10)
+        cache.clear()
+        with self.assertNumQueries(6):
+            response = self.client.get(self.url)
+        self.assertContains(response, "Ref 11")
+
+    def test_cached_detail_page_skips_the_database(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertContains(response, "Azul")
+
+
+@override_settings(ALLOWED_HOSTS=["*"])
+class RelatedTermsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for slug, titulo, explicacao in [
+            ("vento-de-cauda", "Vento de cauda", "vento que sopra na cauda da aeronave durante a decolagem"),
+            ("vento-cruzado", "Vento cruzado", "vento que sopra de lado em relação à pista durante a decolagem"),
+            ("altimetro", "Altímetro", "instrumento que mede a altitude da aeronave"),
+            ("altitude", "Altitude", "distância vertical medida pelo altímetro"),
+            ("aileron", "Aileron", "superfície de comando de rolagem"),
+        ]:
+            Termo.objects.create(titulo=titulo, slug=slug, explicacao=explicacao)
+
+    def _vizinhos(self, slug):
+        return list(
+            TermoRelacionado.objects.filter(termo__slug=slug).order_by("posicao").values_list("relacionado__slug", flat=True)
+        )
+
+    def test_build_ranks_similar_terms(self):
+        related.build(full=True)
+        self.assertEqual(self._vizinhos("vento-de-cauda")[0], "vento-cruzado")
+        self.assertEqual(self._vizinhos("altimetro")[0], "altitude")
+        self.assertNotIn("altimetro", self._vizinhos("vento-cruzado"))
+        self.assertFalse(related.pendentes().exists())
+
+    def test_page_without_list_shows_same_letter(self):
+        response = self.client.get(reverse("glossario:detalhes_termo", args=["altimetro"]))
+        self.assertContains(response, reverse("glossario:detalhes_termo", args=["aileron"]))
+        self.assertNotContains(response, reverse("glossario:detalhes_termo", args=["vento-cruzado"]))
+
+    def test_change_enqueues_incremental_rebuild(self):
+        related.build(full=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            TermoSinonimo.objects.create(termo=Termo.objects.get(slug="aileron"), nome="Altitude de rolagem")
+            Termo.objects.create(titulo="Vento de proa", slug="vento-de-proa", explicacao="vento contra a aeronave")
+        # as duas mudanças viram um único job
+        job = RebuildJob.objects.get(status="pending", kind="related")
+        RebuildJob.objects.filter(pk=job.pk).update(run_after=job.created_at)
+        call_command("process_rebuild_jobs", "--once", stdout=io.StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, "done")
+        self.assertIn("vento-de-cauda", self._vizinhos("vento-de-proa"))
+        self.assertFalse(related.pendentes().exists())
+
+
+class VariantManifestTests(TestCase):
+    def test_new_file_drops_the_old_manifest(self):
+        termo = Termo.objects.create(titulo="Alfa", slug="alfa")
+        TermoImage.objects.bulk_create([TermoImage(termo=termo, imagem="termos/alfa/a.jpg")])
+        manifest = [{"name": "termos/alfa/a-320.webp", "format": "webp", "width": 320, "bytes": 10}]
+        TermoImage.objects.update(variants=manifest)
+
+        img = TermoImage.objects.get()
+        img.alt_text = "Mesmo arquivo"
+        img.save()
+        img.refresh_from_db()
+        self.assertEqual(img.variants, manifest)
+
+        img.imagem = "termos/alfa/b.jpg"
+        with self.captureOnCommitCallbacks(execute=True):
+            img.save(update_fields=["imagem"])
+        img.refresh_from_db()
+        self.assertEqual(img.variants, [])
+        self.assertTrue(ImageVariantJob.objects.filter(object_id=img.pk, status="pending").exists())
+
+
+class PageInvalidationAcrossProcessesTests(TestCase):
+    """A versão incrementada por outro processo (outro worker, um comando) vale aqui."""
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        cache_settings = override_settings(
+            ALLOWED_HOSTS=["*"],
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": self.cache_dir.name,
+                }
+            },
+        )
+        cache_settings.enable()
+        self.addCleanup(cache_settings.disable)
+        Termo.objects.create(titulo="Alfa", slug="alfa", explicacao="Texto antigo")
+        self.url = reverse("glossario:detalhes_termo", args=["alfa"])
+
+    def _invalidate_elsewhere(self):
+        code = "import django; django.setup(); from glossario import pages; pages.invalidate(['alfa'])"
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": "config.settings", "CACHE_URL": f"file://{self.cache_dir.name}"}
+        subprocess.run([sys.executable, "-c", code], cwd=settings.BASE_DIR, env=env, check=True)
+
+    def test_version_bumped_by_another_process_refreshes_the_page(self):
+        self.assertContains(self.client.get(self.url), "Texto antigo")
+        # escrita sem signals: este processo não fica sabendo
+        Termo.objects.filter(slug="alfa").update(explicacao="Texto novo")
+        self.assertContains(self.client.get(self.url), "Texto antigo")
+
+        self._invalidate_elsewhere()
+        self.assertContains(self.client.get(self.url), "Texto novo")
+
+
+class AutocompleteIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.ifr = Termo.objects.create(titulo="IFR", slug="ifr", decod_en="Instrument Flight Rules")
+        Termo.objects.create(titulo="Frequência", slug="frequencia", decod_pt="Faixa de rádio")
+        Termo.objects.create(titulo="MEL", slug="mel", decod_en="Minimum Equipment List", decod_pt="Lista multimotor")
+        teto = Termo.objects.create(titulo="Teto", slug="teto")
+        TermoSinonimo.objects.create(termo=teto, nome="Ceiling")
+        self.index = autocomplete.AutocompleteIndex()
+        self.index.rebuild()
+
+    def _slugs(self, q):
+        return [item["slug"] for item in self.index.search(q)]
+
+    def test_decodings_match_inside_words(self):
+        self.assertEqual(self._slugs("nstrum"), ["ifr"])
+        self.assertEqual(self._slugs("ULTI"), ["mel"])
+        self.assertEqual(self._slugs("eili"), ["teto"])
+        self.assertEqual(self._slugs("xyz"), [])
+
+    def test_ranking_prefers_title_then_synonyms_then_decodings(self):
+        Termo.objects.create(titulo="Altímetro", slug="altimetro")
+        Termo.objects.create(titulo="Salto", slug="salto")
+        TermoSinonimo.objects.create(termo=Termo.objects.create(titulo="Elevação", slug="elevacao"), nome="Altura")
+        Termo.objects.create(titulo="QNH", slug="qnh", decod_en="Altimeter setting")
+        Termo.objects.create(titulo="MSL", slug="msl", decod_en="Mean sea level altitude")
+        self.index.rebuild()
+        # início do título, sinônimo, meio do título, início e meio da decodificação
+        self.assertEqual(self._slugs("ALT"), ["altimetro", "elevacao", "salto", "qnh", "msl"])
+
+    def test_signal_updates_are_incremental(self):
+        with mock.patch.object(autocomplete, "index", self.index), mock.patch.object(autocomplete, "MERGE_MIN", 0):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.ifr.decod_en = "Instrument Flight Regulations"
+                self.ifr.save()
+            self.assertEqual(self._slugs("gulat"), ["ifr"])
+            self.assertEqual(self._slugs("flight rules"), [])
+            with self.captureOnCommitCallbacks(execute=True):
+                Termo.objects.get(slug="mel").delete()
+            self.assertEqual(self._slugs("ulti"), [])
+            # a versão compartilhada acompanhou: nada foi reconstruído do zero
+            self.assertEqual(self.index._version, autocomplete.current_version())
+
+    def test_change_in_another_worker_rebuilds_the_index(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        caches = {"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": cache_dir.name}}
+        with override_settings(CACHES=caches):
+            self.index.rebuild()
+            # escrita sem signals: este processo não fica sabendo
+            Termo.objects.filter(slug="ifr").update(decod_en="Instrument Flying", decod_en_busca="instrument flying")
+            self.assertEqual(self._slugs("flying"), [])
+            code = "import django; django.setup(); from glossario import autocomplete; autocomplete.bump_version()"
+            env = {**os.environ, "DJANGO_SETTINGS_MODULE": "config.settings", "CACHE_URL": f"file://{cache_dir.name}"}
+            subprocess.run([sys.executable, "-c", code], cwd=settings.BASE_DIR, env=env, check=True)
+            self.assertEqual(self._slugs("flying"), ["ifr"])
+
+
+class ClientIndexTests(TestCase):
+    # o autocomplete.js carregado fora do navegador (só as funções de busca)
+    NODE_RUNNER = """
+const fs = require('fs');
+const vm = require('vm');
+const [script, index, queries] = JSON.parse(fs.readFileSync(0, 'utf8'));
+const ctx = vm.createContext({ document: { currentScript: null, addEventListener() {} } });
+vm.runInContext(script, ctx);
+ctx.index = index;
+ctx.queries = queries;
+process.stdout.write(vm.runInContext('acSetIndex(index); JSON.stringify(queries.map((q) => acSearchLocal(q)))', ctx));
+"""
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_settings = override_settings(MEDIA_ROOT=media.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.media_root = media.name
+        cache.clear()
+        Termo.objects.create(titulo="IFR", slug="ifr", decod_en="Instrument Flight Rules", decod_pt="Regras de voo por instrumentos")
+        Termo.objects.create(titulo="Altímetro", slug="altimetro", decod_en="Altimeter")
+        Termo.objects.create(titulo="Salto", slug="salto", explicacao="não entra no índice")
+        elevacao = Termo.objects.create(titulo="Elevação", slug="elevacao")
+        TermoSinonimo.objects.create(termo=elevacao, nome="Altura")
+        TermoSinonimo.objects.create(termo=elevacao, nome="Cota")
+
+    def _load(self, manifest):
+        with default_storage.open(manifest["name"]) as f:
+            return json.loads(gzip.decompress(f.read()))
+
+    def _pointer(self):
+        with open(os.path.join(self.media_root, client_index.POINTER)) as f:
+            return json.load(f)
+
+    def test_build_publishes_index_and_pointer(self):
+        manifest = client_index.build()
+        data = self._load(manifest)
+        self.assertEqual(data["fields"], list(client_index.FIELDS))
+        self.assertEqual(sorted(t[2] for t in data["termos"]), ["altimetro", "elevacao", "ifr", "salto"])
+        self.assertEqual(self._pointer(), manifest)
+        self.assertEqual(manifest["seq"], client_index.latest_seq())
+        # nada mudou: não gera de novo
+        self.assertIsNone(client_index.build())
+
+        Termo.objects.create(titulo="VFR", slug="vfr")
+        novo = client_index.build()
+        self.assertNotEqual(novo["name"], manifest["name"])
+        self.assertEqual(self._pointer(), novo)
+        self.assertEqual(client_index.current(), novo)
+
+    def test_pointer_swap_is_atomic(self):
+        manifest = client_index.build()
+        Termo.objects.create(titulo="VFR", slug="vfr")
+        with mock.patch("glossario.client_index.os.replace", side_effect=OSError("disco cheio")):
+            with self.assertRaises(OSError):
+                client_index.build()
+        # o ponteiro antigo continua inteiro e o temporário foi apagado
+        self.assertEqual(self._pointer(), manifest)
+        directory = os.path.join(self.media_root, client_index.DIRECTORY)
+        self.assertEqual([f for f in os.listdir(directory) if f.startswith(".atual-")], [])
+
+    def test_change_enqueues_index_rebuild(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Termo.objects.create(titulo="VFR", slug="vfr")
+        job = RebuildJob.objects.get(kind="search_index", status="pending")
+        RebuildJob.objects.filter(kind="search_index").update(run_after=job.created_at)
+        call_command("process_rebuild_jobs", "--once", stdout=io.StringIO())
+        self.assertIn("vfr", [t[2] for t in self._load(self._pointer())["termos"]])
+
+    @skipUnless(shutil.which("node"), "node não instalado")
+    def test_browser_ranking_matches_server(self):
+        queries = ["alt", "ALT", "nstrum", "voo", "cota", "ura", "Elevação", "fr", "ifr", "rules", "xyz"]
+        index = autocomplete.AutocompleteIndex()
+        index.rebuild()
+        expected = [index.search(q) for q in queries]
+        script = (settings.BASE_DIR / "glossario" / "static" / "js" / "autocomplete.js").read_text()
+        data = self._load(client_index.build())
+        result = subprocess.run(
+            ["node", "-e", self.NODE_RUNNER], input=json.dumps([script, data, queries]),
+            capture_output=True, text=True, check=True,
+        )
+        self.assertEqual(json.loads(result.stdout), expected)
+        self.assertTrue(all(expected[:-1]))
+
+
+@override_settings(ALLOWED_HOSTS=["*"])
+class TermoListPaginationTests(TestCase):
+    def setUp(self):
+        # "vento" no título pesa mais que na explicação: o rank não segue o alfabeto
+        for i, (titulo, explicacao) in enumerate(
+            [
+                ("Alfa", "sem relação"),
+                ("Bravo", "fala do vento de través"),
+                ("Charlie", "vento"),
+                ("Vento de cauda", "tailwind"),
+                ("Vento cruzado", "crosswind"),
+                ("Delta", "vento e mais vento"),
+                ("Echo", "nada"),
+            ]
+        ):
+            Termo.objects.create(titulo=titulo, slug=f"t{i}", explicacao=explicacao)
+        self.url = reverse("glossario:api_lista_termos")
+
+    def _all_pages(self, **params):
+        titulos, url, params = [], self.url, {**params, "page_size": 2, "fields": "titulo"}
+        while url:
+            data = self.client.get(url, params).json()
+            titulos += [t["titulo"] for t in data["results"]]
+            url, params = data["next"], {}
+        return titulos
+
+    def test_without_query_pages_follow_titulo(self):
+        self.assertEqual(self._all_pages(), sorted(Termo.objects.values_list("titulo", flat=True)))
+
+    def test_search_pages_keep_rank_order(self):
+        ranked = list(search.search(Termo.objects.all(), "vento").values_list("titulo", flat=True))
+        paged = self._all_pages(q="vento")
+        self.assertEqual(paged, ranked)
+        self.assertEqual(len(paged), 5)
+        if search.get_backend().name != "icontains":
+            self.assertEqual(set(paged[:2]), {"Vento cruzado", "Vento de cauda"})
+            self.assertNotEqual(paged, sorted(paged))
+
+
+@override_settings(ALLOWED_HOSTS=["*"])
+class SearchInfixTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Termo.objects.create(titulo="IFR", slug="ifr", decod_en="Instrument Flight Rules")
+        Termo.objects.create(titulo="VFR", slug="vfr", decod_en="Visual Flight Rules")
+        Termo.objects.create(titulo="Frequência", slug="frequencia", explicacao="faixa de rádio")
+        sinonimo = Termo.objects.create(titulo="Teto", slug="teto")
+        TermoSinonimo.objects.create(termo=sinonimo, nome="Ceiling AFR")
+
+    def test_acronym_found_by_infix_on_list_page(self):
+        response = self.client.get(reverse("glossario:lista_termos"), {"q": "fr"})
+        self.assertContains(response, reverse("glossario:detalhes_termo", args=["ifr"]))
+        self.assertContains(response, reverse("glossario:detalhes_termo", args=["vfr"]))
+
+    def test_acronym_found_by_infix_on_api(self):
+        data = self.client.get(reverse("glossario:api_lista_termos"), {"q": "fr", "fields": "titulo"}).json()
+        titulos = [t["titulo"] for t in data["results"]]
+        self.assertEqual(set(titulos), {"IFR", "VFR", "Frequência", "Teto"})
+        if search.get_backend().name != "icontains":
+            # o casamento pelo texto completo vem antes da substring
+            self.assertEqual(titulos[0], "Frequência")
+
+
+@override_settings(ALLOWED_HOSTS=["*"])
+class TermoChangesFeedTests(TestCase):
+    def setUp(self):
+        self.url = reverse("glossario:api_mudancas_termos")
+        self.termos = [Termo.objects.create(titulo=t, slug=t.lower()) for t in ("Alfa", "Bravo", "Charlie")]
+
+    def _feed(self, since=0, **params):
+        return self.client.get(self.url, {"since": since, "fields": "titulo", **params}).json()
+
+    def test_changes_come_in_seq_order_once_per_termo(self):
+        alfa, bravo, charlie = self.termos
+        alfa.explicacao = "editado"
+        alfa.save()
+        TermoLink.objects.create(termo=bravo, url="https://example.com")
+        results = self._feed()["results"]
+        self.assertEqual([r["slug"] for r in results], ["charlie", "alfa", "bravo"])
+        seqs = [r["seq"] for r in results]
+        self.assertEqual(seqs, sorted(seqs))
+
+    def test_change_is_written_with_the_transaction(self):
+        # gravado na própria transação (sem depender do on_commit)
+        with self.captureOnCommitCallbacks(execute=False):
+            Termo.objects.create(titulo="Delta", slug="delta")
+        self.assertEqual(self._feed()["results"][-1]["slug"], "delta")
+
+    def test_delete_leaves_a_tombstone(self):
+        bravo = self.termos[1]
+        pk = bravo.pk
+        since = self._feed()["cursor"]
+        bravo.delete()
+        results = self._feed(since)["results"]
+        self.assertEqual(results, [{"seq": since + 1, "id": pk, "slug": "bravo", "deleted": True}])
+
+    def test_since_pages_through_the_feed(self):
+        for termo in reversed(self.termos):
+            termo.save()
+        slugs, since = [], 0
+        while True:
+            data = self._feed(since, page_size=2)
+            slugs += [r["slug"] for r in data["results"]]
+            since = data["cursor"]
+            if not data["next"]:
+                break
+        self.assertEqual(slugs, ["charlie", "bravo", "alfa"])
+        self.assertEqual(self._feed(since)["results"], [])
+
+
+@override_settings(ALLOWED_HOSTS=["*"])
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.termo = Termo.objects.create(titulo="Alfa", slug="alfa", explicacao="Primeira letra")
+            self.azul = Termo.objects.create(titulo="Azul", slug="azul")
+            TermoRelacionado.objects.create(termo=self.termo, relacionado=self.azul, posicao=0, score=0.5)
+
+    def _revalidate(self, url, **headers):
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        return first, self.client.get(url, headers={"if-none-match": first["ETag"], **headers})
+
+    def test_detail_page(self):
+        url = reverse("glossario:detalhes_termo", args=["alfa"])
+        first, again = self._revalidate(url)
+        self.assertEqual(again.status_code, 304)
+        self.assertNotIn("Last-Modified", first)
+        # o corpo muda sem avançar o updated_at de "alfa": só o ETag percebe
+        future = "Wed, 21 Oct 2099 07:28:00 GMT"
+        self.assertEqual(self.client.get(url, headers={"if-modified-since": future}).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.azul.titulo = "Azul-celeste"
+            self.azul.save()
+        response = self.client.get(url, headers={"if-none-match": first["ETag"]})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Azul-celeste")
+
+    def test_detail_api(self):
+        url = reverse("glossario:api_detalhes_termo", args=["alfa"])
+        first, again = self._revalidate(url)
+        self.assertEqual(again.status_code, 304)
+        since = self.client.get(url, headers={"if-modified-since": first["Last-Modified"]})
+        self.assertEqual(since.status_code, 304)
+        TermoLink.objects.create(termo=self.termo, url="https://example.com", rotulo="Ref")
+        self.assertEqual(self.client.get(url, headers={"if-none-match": first["ETag"]}).status_code, 200)
+
+    def test_list_api(self):
+        url = reverse("glossario:api_lista_termos")
+        first, again = self._revalidate(url)
+        self.assertEqual(again.status_code, 304)
+        self.azul.delete()
+        self.assertEqual(self.client.get(url, headers={"if-none-match": first["ETag"]}).status_code, 200)
+
+    def test_sitemap(self):
+        url = reverse("sitemap")
+        first, again = self._revalidate(url)
+        self.assertEqual(again.status_code, 304)
+        self.azul.delete()
+        response = self.client.get(url, headers={"if-none-match": first["ETag"]})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, "/azul/")
+
+
+class CSVRoundTripTests(TestCase):
+    LINKS = [
+        "https://example.com/a,b;c",
+        "https://example.com/busca?q=1,2;3",
+        "https://example.com/fim,",
+        "https://example.com/com espaço",
+        "https://example.com/simples",
+    ]
+    VIDEOS = ["https://www.youtube.com/watch?v=abcdefghijk&t=1,5", "https://youtu.be/bcdefghijkl"]
+
+    SINONIMOS = ["Alfa; Bravo", "Charlie, Delta", "Eco"]
+
+    def _round_trip(self, termo):
+        buf = io.StringIO()
+        csv_export.write_csv(buf)
+        termo.delete()
+        csv_import.import_csv(io.StringIO(buf.getvalue()))
+        return Termo.objects.get(slug=termo.slug)
+
+    def test_links_videos_and_synonyms_survive_export_and_import(self):
+        termo = Termo.objects.create(titulo="Alfa", slug="alfa")
+        for url in self.LINKS:
+            TermoLink.objects.create(termo=termo, url=url)
+        for url in self.VIDEOS:
+            TermoVideo.objects.create(termo=termo, youtube_url=url, youtube_id=url.split("/")[-1][-11:])
+        for nome in self.SINONIMOS:
+            TermoSinonimo.objects.create(termo=termo, nome=nome)
+
+        termo = self._round_trip(termo)
+        self.assertEqual(list(termo.links_relacionados.order_by("pk").values_list("url", flat=True)), self.LINKS)
+        self.assertEqual(list(termo.videos.order_by("pk").values_list("youtube_url", flat=True)), self.VIDEOS)
+        self.assertEqual(list(termo.sinonimos.order_by("pk").values_list("nome", flat=True)), self.SINONIMOS)
+
+    def test_single_values_with_separators_survive_export_and_import(self):
+        termo = Termo.objects.create(titulo="Beta", slug="beta")
+        TermoLink.objects.create(termo=termo, url=self.LINKS[2])
+        TermoSinonimo.objects.create(termo=termo, nome=self.SINONIMOS[0])
+
+        termo = self._round_trip(termo)
+        self.assertEqual(list(termo.links_relacionados.values_list("url", flat=True)), [self.LINKS[2]])
+        self.assertEqual(list(termo.sinonimos.values_list("nome", flat=True)), [self.SINONIMOS[0]])
+
+    def test_import_still_splits_hand_written_lists(self):
+        self.assertEqual(
+            csv_import.split_multi("a.com; b.com,c.com , https://d.com/x,y"),
+            ["a.com", "b.com", "c.com", "https://d.com/x,y"],
+        )
+
+
+class ImportJobTests(TestCase):
+    CSV = "SIGLA OU PALAVRA,EXPLICAÇÃO\nAlfa,primeiro\nBeta,segundo\nGama,terceiro\n"
+
+    def setUp(self):
+        for setting in ("MEDIA_ROOT", "GLOSSARIO_IMPORT_ROOT"):
+            root = tempfile.TemporaryDirectory()
+            self.addCleanup(root.cleanup)
+            override = override_settings(**{setting: root.name})
+            override.enable()
+            self.addCleanup(override.disable)
+        self.job = CSVImportJob.objects.create(arquivo=ContentFile(self.CSV.encode(), name="termos.csv"), chunk_size=1)
+        self.path = self.job.arquivo.path
+
+    def test_file_is_private_and_deleted_when_the_job_is_done(self):
+        self.assertTrue(self.path.startswith(settings.GLOSSARIO_IMPORT_ROOT))
+        self.assertFalse(os.listdir(settings.MEDIA_ROOT))
+        with self.assertRaises(ValueError):
+            self.job.arquivo.url
+
+        self.assertEqual(import_jobs.run_pending(), 1)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, "done")
+        self.assertEqual((self.job.total_rows, self.job.report["created"], self.job.report["rows"]), (3, 3, 3))
+        self.assertEqual(self.job.chunks.filter(status="done").count(), 3)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_retry_reruns_only_the_failed_chunk(self):
+        apply = csv_import.TermoImporter._apply
+        calls = []
+
+        def flaky(importer, pending, report):
+            calls.append(pending[0][0].slug)
+            if calls == ["alfa", "beta"]:
+                raise RuntimeError("falha simulada")
+            return apply(importer, pending, report)
+
+        with mock.patch.object(csv_import.TermoImporter, "_apply", flaky):
+            with self.assertLogs("glossario.import_jobs", "ERROR"):
+                import_jobs.run_pending()
+            self.job.refresh_from_db()
+            self.assertEqual((self.job.status, self.job.failed_chunks), ("failed", 1))
+            self.assertEqual(self.job.chunks.get(status="failed").index, 1)
+            self.assertTrue(os.path.exists(self.path))  # guardado para o reprocessamento
+
+            self.assertTrue(import_jobs.retry(self.job))
+            import_jobs.run_pending()
+        self.assertEqual(calls, ["alfa", "beta", "gama", "beta"])
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.status, self.job.failed_chunks, self.job.report["created"]), ("done", 0, 3))
+        self.assertEqual(self.job.chunks.get(index=1).attempts, 2)
+        self.assertEqual(Termo.objects.count(), 3)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_chunk_is_rolled_back_when_another_worker_took_the_job(self):
+        job = import_jobs.claim_job()
+        apply = csv_import.TermoImporter._apply
+
+        def reclaimed(importer, pending, report):
+            # outro worker reivindicou o job dado como abandonado
+            CSVImportJob.objects.filter(pk=job.pk).update(locked_at=job.locked_at - timedelta(minutes=1))
+            return apply(importer, pending, report)
+
+        with mock.patch.object(csv_import.TermoImporter, "_apply", reclaimed), self.assertLogs("glossario.import_jobs", "WARNING"):
+            import_jobs.run_job(job)
+        self.assertFalse(Termo.objects.exists())
+        self.assertFalse(job.chunks.exists())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.finished_at), ("running", None))
+        self.assertTrue(os.path.exists(self.path))
+
+
+class CSVReimportTests(TestCase):
+    CSV = (
+        "SIGLA OU PALAVRA,EXPLICAÇÃO,SINÔNIMOS,LINKS,VÍDEOS\n"
+        "Alfa,primeiro,Primeiro,https://example.com/a,https://youtu.be/abcdefghijk\n"
+        "Beta,segundo,,,\n"
+    )
+
+    def setUp(self):
+        csv_import.import_csv(io.StringIO(self.CSV))
+        self.alfa = Termo.objects.get(slug="alfa")
+
+    def _hash(self):
+        return Termo.objects.values_list("content_hash", flat=True).get(pk=self.alfa.pk)
+
+    def test_unchanged_reimport_writes_nothing(self):
+        with CaptureQueriesContext(connection) as ctx:
+            report = csv_import.import_csv(io.StringIO(self.CSV))
+        self.assertEqual((report.unchanged, report.changed, report.created), (2, 0, 0))
+        writes = [q["sql"] for q in ctx.captured_queries if q["sql"].split()[0].upper() in {"INSERT", "UPDATE", "DELETE"}]
+        self.assertEqual(writes, [])
+
+    def test_editing_a_child_clears_content_hash(self):
+        edits = {
+            "link": lambda: self.alfa.links_relacionados.get().save(),
+            "vídeo": lambda: TermoVideo.objects.create(termo=self.alfa, youtube_url="https://youtu.be/bcdefghijkl", youtube_id="bcdefghijkl"),
+            "sinônimo": lambda: self.alfa.sinonimos.get().delete(),
+        }
+        for name, edit in edits.items():
+            with self.subTest(name):
+                self.assertNotEqual(self._hash(), "")
+                edit()
+                self.assertEqual(self._hash(), "")
+                # a reimportação confere a linha de novo e volta a gravar a impressão digital
+                csv_import.import_csv(io.StringIO(self.CSV))
+                self.assertNotEqual(self._hash(), "")
+        self.assertEqual(list(self.alfa.sinonimos.values_list("nome", flat=True)), ["Primeiro"])
+
+
+class LetterFacetsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for titulo in ("Alfa", "Avião", "Beta"):
+            Termo.objects.create(titulo=titulo, slug=titulo.lower())
+
+    def test_counts_come_from_one_grouped_query_and_the_cache(self):
+        with self.assertNumQueries(1):
+            counts = facets.letter_counts()
+        self.assertEqual(list(counts), facets.ALFABETO)
+        self.assertEqual((counts["A"], counts["B"], counts["C"]), (2, 1, 0))
+        with self.assertNumQueries(0):
+            self.assertEqual(facets.letter_counts(), counts)
+
+    def test_each_search_has_its_own_entry(self):
+        facets.letter_counts()
+        beta = facets.letter_counts(Termo.objects.filter(titulo__icontains="beta"), "Beta")
+        self.assertEqual((beta["A"], beta["B"]), (0, 1))
+        with self.assertNumQueries(0):
+            self.assertEqual(facets.letter_counts(Termo.objects.none(), " beta "), beta)
+            self.assertEqual(facets.letter_counts()["A"], 2)
+
+    def test_save_and_delete_bump_the_version(self):
+        self.assertEqual(facets.letter_counts()["G"], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            gama = Termo.objects.create(titulo="Gama", slug="gama")
+        self.assertEqual(facets.letter_counts()["G"], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            gama.delete()
+        self.assertEqual(facets.letter_counts()["G"], 0)
+
+
+class SiteSettingCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        SiteSetting._solo = None
+        self.addCleanup(setattr, SiteSetting, "_solo", None)
+
+    def test_save_reaches_a_copy_cached_by_another_worker(self):
+        copia = SiteSetting.get_solo()  # a cópia em memória de outro worker
+        outra = SiteSetting.objects.get(pk=copia.pk)
+        outra.site_name = "Novo nome"
+        with self.captureOnCommitCallbacks(execute=True):
+            outra.save()
+        SiteSetting._solo = copia  # o outro worker não passou pelo invalidate_solo
+        self.assertEqual(SiteSetting.get_solo().site_name, "Aerodicionário")  # dentro do intervalo
+
+        SiteSetting._solo_checked_at -= SiteSetting.SOLO_CHECK_INTERVAL
+        self.assertEqual(SiteSetting.get_solo().site_name, "Novo nome")
+
+    def test_process_local_cache_is_a_warning_outside_deploy(self):
+        locmem = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        with override_settings(CACHES=locmem, GLOSSARIO_SINGLE_PROCESS=False):
+            self.assertEqual([w.id for w in checks.shared_cache_warning(None)], ["glossario.W001"])
+            self.assertEqual([e.id for e in checks.shared_cache_check(None)], ["glossario.E001"])
+        with override_settings(CACHES=locmem, GLOSSARIO_SINGLE_PROCESS=True):
+            self.assertEqual(checks.shared_cache_warning(None), [])
+
+
+class ImageJobQueueTests(TestCase):
+    def _run(self, generate=None):
+        out = io.StringIO()
+        with mock.patch.object(jobs, "generate_variants", generate or mock.Mock()) as generate:
+            call_command("process_image_jobs", "--workers", "0", "--once", stdout=out)
+        return generate, out.getvalue()
+
+    def _job(self, **fields):
+        return ImageVariantJob.objects.create(kind="termo", object_id=1, **fields)
+
+    def test_worker_claims_and_finishes_ready_jobs(self):
+        ready = self._job()
+        later = self._job(run_after=timezone.now() + timedelta(minutes=1))
+        generate, out = self._run()
+        generate.assert_called_once_with("termo", 1)
+        self.assertIn("1 job(s)", out)
+        ready.refresh_from_db()
+        later.refresh_from_db()
+        self.assertEqual((ready.status, ready.attempts, ready.locked_at), ("done", 1, None))
+        self.assertEqual((later.status, later.attempts), ("pending", 0))
+
+    def test_failure_is_retried_with_backoff_until_max_attempts(self):
+        job = self._job(max_attempts=3)
+        falha = mock.Mock(side_effect=RuntimeError("sem memória"))
+        for attempt, delay in ((1, 30), (2, 60)):
+            antes = timezone.now()
+            self._run(falha)
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), ("pending", attempt))
+            self.assertIn("RuntimeError: sem memória", job.last_error)
+            self.assertGreaterEqual(job.run_after, antes + timedelta(seconds=delay))
+            self.assertLess(job.run_after, antes + timedelta(seconds=delay + 5))
+            self._run(falha)  # ainda no backoff: nada é reivindicado
+            self.assertEqual(ImageVariantJob.objects.get(pk=job.pk).attempts, attempt)
+            ImageVariantJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        with self.assertLogs("glossario.jobs", "ERROR"):
+            self._run(falha)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, falha.call_count), ("failed", 3, 3))
+
+    def test_missing_image_fails_without_retry(self):
+        job = self._job()
+        with self.assertLogs("glossario.jobs", "ERROR"):
+            call_command("process_image_jobs", "--workers", "0", "--once", stdout=io.StringIO())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("failed", 1))
+        self.assertIn("VariantSourceMissing", job.last_error)
+
+    def test_stale_running_job_is_reclaimed(self):
+        agora = timezone.now()
+        stale = self._job(status="running", attempts=1, locked_at=agora - jobs.STALE_AFTER - timedelta(seconds=1))
+        busy = self._job(status="running", attempts=1, locked_at=agora - timedelta(minutes=1))
+        generate, _ = self._run()
+        self.assertEqual(generate.call_count, 1)
+        stale.refresh_from_db()
+        busy.refresh_from_db()
+        self.assertEqual((stale.status, stale.attempts), ("done", 2))
+        self.assertEqual(busy.status, "running")
@@ -13,6 +13,9 @@ urlpatterns = [
     path("accounts/signup/", views.signup, name="signup"),
     path("conta/", views.perfil, name="perfil"),
     path("api/termos/", views.TermoListAPI.as_view(), name="api_lista_termos"),
+    path("api/termos.ndjson", views.dump_termos, name="api_dump_termos"),
+    # antes do detalhe: "changes" seria lido como slug
+    path("api/termos/changes/", views.TermoChangesAPI.as_view(), name="api_mudancas_termos"),
     path("api/termos/<slug:slug>/", views.TermoDetailAPI.as_view(), name="api_detalhes_termo"),
     path("api/autocomplete/", views.AutocompleteAPI.as_view(), name="api_autocomplete"),
 ]
@@ -0,0 +1,177 @@
+"""Geração das variantes responsivas das imagens (WebP e, opcionalmente, AVIF).
+
+A imagem é decodificada uma única vez: JPEGs são lidos em modo *draft* (o
+próprio decodificador reduz 1/2, 1/4 ou 1/8) e cada largura é obtida a partir
+da anterior (1280 → 640 → 320), nunca do original em resolução cheia.
+
+Este módulo não depende do Django configurado (só do Pillow e do storage
+recebido), para poder ser usado também pelo ``benchmark_variants``.
+"""
+
+import logging
+import os
+from io import BytesIO
+from typing import NamedTuple
+
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import FileSystemStorage
+from PIL import Image, features
+
+logger = logging.getLogger(__name__)
+
+# Limite de pixels *decodificados* (depois do draft). Acima disso o job falha
+# de vez em vez de alocar centenas de MB.
+MAX_PIXELS = 40_000_000
+DEFAULT_QUALITY = {"webp": 85, "avif": 60}
+PIL_FORMATS = {"webp": "WEBP", "avif": "AVIF"}
+
+
+class ImageTooLarge(ValueError):
+    """A imagem excede ``VariantSpec.max_pixels``."""
+
+
+class VariantSpec(NamedTuple):
+    widths: tuple = (320, 640, 1280)
+    formats: tuple = ("webp",)
+    quality: dict | None = None
+    max_pixels: int = MAX_PIXELS
+
+    def quality_for(self, fmt: str) -> int:
+        return (self.quality or {}).get(fmt, DEFAULT_QUALITY[fmt])
+
+
+def supported_formats(formats) -> tuple:
+    """Descarta formatos que o Pillow instalado não sabe gravar."""
+    ok = []
+    for fmt in formats:
+        if fmt in PIL_FORMATS and features.check(fmt):
+            ok.append(fmt)
+        else:
+            logger.warning("Formato de variante %r indisponível neste Pillow; ignorado.", fmt)
+    return tuple(ok)
+
+
+def variant_name(source_name: str, width: int, fmt: str = "webp") -> str:
+    root, _ext = os.path.splitext(source_name)
+    return f"{root}_w{width}.{fmt}"
+
+
+def render(fp, spec: VariantSpec, skip=frozenset()):
+    """Gera ``(largura, formato, bytes)`` para cada variante pedida.
+
+    ``skip`` contém os pares ``(largura, formato)`` que já existem; larguras
+    maiores que a do original são ignoradas (sem ampliar).
+    """
+    with Image.open(fp) as img:
+        w, h = img.size
+        todo = [
+            t for t in sorted(set(spec.widths), reverse=True)
+            if t <= w and any((t, fmt) not in skip for fmt in spec.formats)
+        ]
+        if not todo:
+            return
+        largest = todo[0]
+        # JPEG: decodifica já reduzido, mantendo pelo menos a maior largura pedida
+        img.draft("RGB", (largest, max(1, h * largest // w)))
+        if img.size[0] * img.size[1] > spec.max_pixels:
+            raise ImageTooLarge(
+                f"{img.size[0]}x{img.size[1]} excede o limite de {spec.max_pixels} pixels."
+            )
+        current = img if img.mode == "RGB" else img.convert("RGB")
+        for target in todo:
+            resized = current.resize(
+                (target, max(1, round(h * target / w))), Image.LANCZOS, reducing_gap=3.0
+            )
+            if current is not img:
+                current.close()
+            current = resized
+            for fmt in spec.formats:
+                if (target, fmt) in skip:
+                    continue
+                buffer = BytesIO()
+                current.save(buffer, format=PIL_FORMATS[fmt], quality=spec.quality_for(fmt))
+                yield target, fmt, buffer.getvalue()
+        current.close()
+
+
+def manifest_entry(storage, name: str, width: int, fmt: str) -> dict:
+    return {
+        "width": width,
+        "format": fmt,
+        "name": name,
+        "url": storage.url(name),
+        "bytes": storage.size(name),
+    }
+
+
+def generate(storage, source_name: str, spec: VariantSpec) -> list[dict]:
+    """Gera as variantes que faltam no ``storage`` e devolve o manifesto completo."""
+    spec = spec._replace(formats=supported_formats(spec.formats))
+    names = {
+        (width, fmt): variant_name(source_name, width, fmt)
+        for width in spec.widths
+        for fmt in spec.formats
+    }
+    existing = {key for key, name in names.items() if storage.exists(name)}
+    with storage.open(source_name, "rb") as fp:
+        for width, fmt, data in render(fp, spec, skip=existing):
+            names[(width, fmt)] = storage.save(names[(width, fmt)], ContentFile(data))
+            existing.add((width, fmt))
+    return [manifest_entry(storage, names[key], *key) for key in sorted(existing)]
+
+
+def compatible(variants, source: VariantSpec, target: VariantSpec) -> list[dict]:
+    """Entradas do manifesto de ``source`` que ``target`` teria gerado iguais."""
+    return [
+        v for v in variants
+        if v["width"] in target.widths
+        and v["format"] in target.formats
+        and source.quality_for(v["format"]) == target.quality_for(v["format"])
+    ]
+
+
+def _link_or_copy(src_storage, src_name: str, dest_storage, dest_name: str, max_length=None) -> str:
+    """Põe ``src_name`` em ``dest_name`` sem copiar bytes quando dá; devolve o nome gravado.
+
+    Entre ``FileSystemStorage`` cria um hard link (a origem continua intacta,
+    então desfazer é só apagar o destino). Em outros backends, ou entre
+    volumes diferentes, copia em blocos pelo próprio storage.
+    """
+    if isinstance(src_storage, FileSystemStorage) and isinstance(dest_storage, FileSystemStorage):
+        src = src_storage.path(src_name)
+        while True:
+            name = dest_storage.get_available_name(dest_name, max_length=max_length)
+            path = dest_storage.path(name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                os.link(src, path)
+                return name
+            except FileExistsError:
+                continue  # outro upload pegou o nome entre a checagem e o link
+            except FileNotFoundError:
+                raise
+            except OSError:
+                break  # outro volume ou FS sem hard link
+    with src_storage.open(src_name, "rb") as fh:
+        return dest_storage.save(dest_name, File(fh), max_length=max_length)
+
+
+def promote(src_storage, src_name: str, dest_storage, dest_name: str, variants=(), max_length=None):
+    """Leva a imagem e as ``variants`` já geradas para ``dest_name``.
+
+    As variantes ganham os nomes que ``generate`` procuraria para o novo
+    original, então o job do destino só renderiza as que faltarem. Devolve
+    ``(nome gravado, manifesto das variantes promovidas)``.
+    """
+    name = _link_or_copy(src_storage, src_name, dest_storage, dest_name, max_length)
+    manifest = []
+    for v in variants:
+        target = variant_name(name, v["width"], v["format"])
+        if dest_storage.exists(target):
+            continue
+        try:
+            saved = _link_or_copy(src_storage, v["name"], dest_storage, target)
+        except FileNotFoundError:
+            continue  # manifesto desatualizado: o job do destino gera de novo
+        manifest.append(manifest_entry(dest_storage, saved, v["width"], v["format"]))
+    return name, manifest
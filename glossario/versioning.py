@@ -0,0 +1,24 @@
+"""Contadores de geração no cache compartilhado.
+
+Usados para invalidar caches derivados (índices, facetas, páginas) em todos
+os workers de uma vez: quem grava incrementa o contador e quem lê compara
+com a versão que tem em mãos.
+"""
+
+from django.core.cache import cache
+
+
+def get_version(key: str) -> int:
+    return cache.get(key, 0)
+
+
+def bump_version(key: str) -> int:
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        try:
+            return cache.incr(key)
+        except ValueError:  # pragma: no cover - backend sem incr atômico
+            cache.set(key, 1, None)
+            return 1
@@ -1,11 +1,20 @@
-from django.db.models import Q
+import re
+
 from django.shortcuts import get_object_or_404, render
 from rest_framework import generics
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.views import APIView
 from django.core.cache import cache
-
-from .models import Termo, TermoSinonimo, SiteSetting
+from django.http import Http404, StreamingHttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import require_GET
+
+from . import conditional, dump, facets, pages, search
+from .autocomplete import index as autocomplete_index
+from .models import Termo, TermoChange, TermoSinonimo, SiteSetting
+from .pagination import TituloCursorPagination
 from .serializers import TermoSerializer
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect
@@ -18,6 +27,9 @@ from .models import Suggestion, SuggestionImage, SuggestionLink, SuggestionVideo
 from django.core.paginator import Paginator
 
 
+ACCEPTS_GZIP = re.compile(r"\bgzip\b")
+
+
 def home(request):
     """Landing page for the project."""
     return render(request, "home.html")
@@ -26,24 +38,19 @@ def home(request):
 def lista_termos(request):
     busca = request.GET.get("q", "").strip()
     letra = request.GET.get("letra", "").upper().strip()
-    alfabeto = [chr(c) for c in range(ord("A"), ord("Z") + 1)]
+    alfabeto = facets.ALFABETO
 
     termos = Termo.objects.all()
 
     if busca:
-        termos = termos.filter(
-            Q(titulo__icontains=busca)
-            | Q(decod_en__icontains=busca)
-            | Q(decod_pt__icontains=busca)
-            | Q(sinonimos__nome__icontains=busca)
-        ).distinct()
+        termos = search.search(termos, busca)
+
+    # contadores por letra (respeitam a busca ativa, não a letra)
+    letter_counts = facets.letter_counts(termos, busca)
 
     if letra:
         if letra in alfabeto:
-            termos = termos.filter(titulo__istartswith=letra)
-
-    # contadores por letra
-    letter_counts = {l: Termo.objects.filter(titulo__istartswith=l).count() for l in alfabeto}
+            termos = termos.filter(inicial=letra)
 
     per_page = SiteSetting.get_solo().items_per_page or 12
     paginator = Paginator(termos, per_page)
@@ -63,9 +70,26 @@ def lista_termos(request):
 
 
 def detalhes_termo(request, slug):
-    termo = get_object_or_404(Termo, slug=slug)
-    relacionados = Termo.objects.filter(titulo__istartswith=termo.titulo[:1]).exclude(pk=termo.pk)[:6]
-    return render(request, "glossario/detalhe.html", {"termo": termo, "relacionados": relacionados})
+    # o miolo da página vem do cache por termo (ver glossario.pages)
+    pagina = pages.get_page(request, slug)
+    if len(messages.get_messages(request)):
+        # mensagens pendentes aparecem uma vez só: sem validadores
+        return render(request, "glossario/detalhe.html", {"pagina": pagina})
+    user = request.user
+    etag = conditional.make_etag(
+        pagina["digest"],
+        request.build_absolute_uri(),
+        user.pk if user.is_authenticated else "",
+        user.is_staff,
+        conditional.site_settings_digest(),
+    )
+    # só pelo ETag: o corpo depende também dos relacionados, das configurações
+    # e do usuário, que não avançam o updated_at do termo
+    response = conditional.not_modified(request, etag)
+    if response is None:
+        response = render(request, "glossario/detalhe.html", {"pagina": pagina})
+        conditional.add_validators(response, etag)
+    return response
 
 
 @login_required
@@ -75,7 +99,8 @@ def sugerir(request, slug=None):
         termo = get_object_or_404(Termo, slug=slug)
     # rate limit simples para POST
     if request.method == "POST":
-        if not SiteSetting.get_solo().suggestions_enabled:
+        config = SiteSetting.get_solo()
+        if not config.suggestions_enabled:
             messages.error(request, "As sugestões estão temporariamente desativadas.")
             return redirect("glossario:lista_termos")
         ip = request.META.get("REMOTE_ADDR", "")
@@ -83,7 +108,7 @@ def sugerir(request, slug=None):
         if cache.get(key):
             messages.error(request, "Você está enviando sugestões muito rápido. Tente novamente em instantes.")
             return redirect("glossario:sugerir" if not termo else "glossario:sugerir_para_termo", slug=termo.slug if termo else None)
-        cache.set(key, True, SiteSetting.get_solo().suggestion_rate_limit_seconds or 5)
+        cache.set(key, True, config.suggestion_rate_limit_seconds or 5)
         form = SuggestionForm(request.POST, request.FILES)
         if form.is_valid():
             suggestion: Suggestion = form.save(commit=False)
@@ -199,62 +224,138 @@ def perfil(request):
     )
 
 
-class TermoListAPI(generics.ListAPIView):
+class CamposMixin:
+    """``?fields=`` (campos da resposta) e prefetch só das relações pedidas."""
+
+    def get_fields(self):
+        if not hasattr(self, "_fields"):
+            self._fields = TermoSerializer.parse_fields(self.request.query_params.get("fields"))
+        return self._fields
+
+    def termo_queryset(self):
+        return pages.termo_queryset(TermoSerializer.relacoes(self.get_fields()))
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs["fields"] = self.get_fields()
+        return super().get_serializer(*args, **kwargs)
+
+
+class TermoListAPI(CamposMixin, generics.ListAPIView):
     serializer_class = TermoSerializer
+    pagination_class = TituloCursorPagination
 
     def get_queryset(self):
         busca = self.request.query_params.get("q", "")
         qs = Termo.objects.all()
         if busca:
-            qs = qs.filter(
-                Q(titulo__icontains=busca)
-                | Q(decod_en__icontains=busca)
-                | Q(decod_pt__icontains=busca)
-            )
+            qs = search.search(qs, busca)
         return qs
 
-
-class TermoDetailAPI(generics.RetrieveAPIView):
-    queryset = Termo.objects.all()
+    def list(self, request, *args, **kwargs):
+        self.get_fields()  # campo inválido: 400 antes de consultar
+        # primeiro só as chaves da página; o ETag muda com qualquer criação,
+        # edição ou remoção dentro dela (e com o surgimento de uma próxima)
+        chaves = self.paginate_queryset(self.get_queryset().only("pk", "titulo", "updated_at"))
+        ultimo = max((t.updated_at for t in chaves), default=None)
+        etag = conditional.make_etag(
+            request.get_full_path(), self.paginator.has_next, *(f"{t.pk}:{t.updated_at.isoformat()}" for t in chaves)
+        )
+        # sem If-Modified-Since: remover um termo da página não avança o Last-Modified
+        response = conditional.not_modified(request, etag)
+        if response is not None:
+            return response
+        por_pk = self.termo_queryset().in_bulk([t.pk for t in chaves])
+        serializer = self.get_serializer([por_pk[t.pk] for t in chaves if t.pk in por_pk], many=True)
+        return conditional.add_validators(self.get_paginated_response(serializer.data), etag, ultimo)
+
+
+class TermoDetailAPI(CamposMixin, generics.RetrieveAPIView):
     serializer_class = TermoSerializer
     lookup_field = "slug"
 
+    def get_queryset(self):
+        return self.termo_queryset()
+
+    def retrieve(self, request, *args, **kwargs):
+        self.get_fields()
+        state = Termo.objects.filter(slug=kwargs["slug"]).values("pk", "updated_at").first()
+        if state is None:
+            raise Http404
+        etag = conditional.make_etag(request.get_full_path(), state["pk"], state["updated_at"].isoformat())
+        response = conditional.not_modified(request, etag, state["updated_at"])
+        if response is not None:
+            return response
+        return conditional.add_validators(super().retrieve(request, *args, **kwargs), etag, state["updated_at"])
+
+
+class TermoChangesAPI(CamposMixin, generics.GenericAPIView):
+    """Termos alterados ou removidos depois de ``?since=<seq>`` (ver ``glossario.changes``)."""
+
+    serializer_class = TermoSerializer
+    page_size = 100
+    max_page_size = 500
+
+    @staticmethod
+    def _inteiro(request, name: str, default: int) -> int:
+        try:
+            return int(request.query_params.get(name, default))
+        except ValueError:
+            raise ValidationError({name: "Informe um número inteiro."})
+
+    def get(self, request, *args, **kwargs):
+        since = max(self._inteiro(request, "since", 0), 0)
+        size = min(max(self._inteiro(request, "page_size", self.page_size), 1), self.max_page_size)
+        rows = list(TermoChange.objects.filter(seq__gt=since).order_by("seq")[: size + 1])
+        has_more = len(rows) > size
+        rows = rows[:size]
+        por_pk = self.termo_queryset().in_bulk([r.termo_pk for r in rows if not r.deleted])
+        termos = [por_pk[r.termo_pk] for r in rows if r.termo_pk in por_pk]
+        dados = dict(zip((t.pk for t in termos), self.get_serializer(termos, many=True).data))
+        results = []
+        for r in rows:
+            # removido depois de registrado: a lápide dele vem mais adiante no feed
+            item = {"seq": r.seq, "id": r.termo_pk, "slug": r.slug, "deleted": r.termo_pk not in dados}
+            if not item["deleted"]:
+                item["slug"] = por_pk[r.termo_pk].slug
+                item["termo"] = dados[r.termo_pk]
+            results.append(item)
+        cursor = rows[-1].seq if rows else since
+        next_url = None
+        if has_more:
+            next_url = replace_query_param(request.build_absolute_uri(), "since", cursor)
+        return Response({"results": results, "cursor": cursor, "next": next_url})
+
+
+@require_GET
+def dump_termos(request):
+    """Todos os termos em NDJSON (gzip se o cliente aceitar), em streaming."""
+    total, ultimo = dump.state()
+    encoding = "gzip" if ACCEPTS_GZIP.search(request.headers.get("Accept-Encoding", "")) else "identity"
+    etag = dump.etag(total, ultimo, encoding)
+    # só pelo ETag: remover um termo não avança o Last-Modified
+    response = conditional.not_modified(request, etag)
+    if response is None:
+        chunks = dump.buffered(dump.iter_lines())
+        if encoding == "gzip":
+            chunks = dump.gzip_stream(chunks)
+        response = StreamingHttpResponse(chunks, content_type="application/x-ndjson; charset=utf-8")
+        if encoding == "gzip":
+            response.headers["Content-Encoding"] = "gzip"
+        conditional.add_validators(response, etag, ultimo)
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
 
 class AutocompleteAPI(APIView):
+    # resposta igual para todos: sem sessão, sem "Vary: Cookie"
+    authentication_classes = ()
+
     def get(self, request):
         q = (request.GET.get("q") or "").strip()
-        # rate limit simples por IP+q usando configuração
-        throttle_ms = SiteSetting.get_solo().autocomplete_throttle_ms or 1000
-        ttl = max(1, int(throttle_ms / 1000))
-        key = f"ac_rl:{request.META.get('REMOTE_ADDR')}:{q.lower()}:{ttl}"
-        if cache.get(key):
-            return Response({"results": []})
-        cache.set(key, True, ttl)
-        items = []
-        if q:
-            base = (
-                Termo.objects.filter(
-                    Q(titulo__icontains=q)
-                    | Q(decod_en__icontains=q)
-                    | Q(decod_pt__icontains=q)
-                    | Q(sinonimos__nome__icontains=q)
-                ).distinct().order_by("titulo")[:30]
-            )
-            def rank(t: Termo):
-                ql = q.lower()
-                title = (t.titulo or '').lower()
-                en = (t.decod_en or '').lower()
-                pt = (t.decod_pt or '').lower()
-                syns = ' '.join(s.nome for s in getattr(t, 'sinonimos').all()) if hasattr(t, 'sinonimos') else ''
-                syns = syns.lower()
-                score = 0
-                if title.startswith(ql): score -= 100
-                if ql in title: score -= 50
-                if syns.startswith(ql): score -= 40
-                if ql in syns: score -= 30
-                if en.startswith(ql) or pt.startswith(ql): score -= 20
-                if ql in en or ql in pt: score -= 10
-                return (score, t.titulo)
-            items_sorted = sorted(list(base), key=rank)[:8]
-            items = [{"label": t.titulo, "slug": t.slug, "decod": t.decod_pt or t.decod_en or ""} for t in items_sorted]
-        return Response({"results": items})
+        items = autocomplete_index.cached_search(q) if q else []
+        response = Response({"results": items})
+        # o navegador repete a mesma busca do próprio cache (com resultados de
+        # verdade) durante o intervalo configurado; proxies/CDN também podem servir
+        max_age = max(1, SiteSetting.get_solo().autocomplete_cache_seconds)
+        patch_cache_control(response, public=True, max_age=max_age)
+        return response